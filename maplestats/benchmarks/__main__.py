@@ -0,0 +1,51 @@
+"""Command line for the benchmark suite.
+
+    python -m maplestats.benchmarks run --scale 1k --output baseline.json
+    python -m maplestats.benchmarks compare baseline.json current.json
+"""
+import argparse
+import sys
+
+from maplestats.benchmarks.generators import SCALES
+from maplestats.benchmarks.suite import (
+    DEFAULT_THRESHOLD, compare, load_report, run_suite, save_report)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m maplestats.benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmarks')
+    run.add_argument('--scale', choices=list(SCALES), default='1k')
+    run.add_argument('--repeats', type=int, default=3)
+    run.add_argument('--output', help='Write the results to this JSON file')
+
+    comp = commands.add_parser(
+        'compare', help='Flag regressions of a run against a baseline')
+    comp.add_argument('baseline')
+    comp.add_argument('current')
+    comp.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                      help='Relative slowdown to flag, e.g. 0.2 for 20%%')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        report = run_suite(args.scale, args.repeats)
+        for name, result in report['results'].items():
+            print(f'{name:20} {result["seconds_per_op"] * 1e6:12.2f} us/op '
+                  f'({result["ops"]} ops)')
+        if args.output:
+            save_report(report, args.output)
+        return 0
+
+    regressions = compare(load_report(args.baseline),
+                          load_report(args.current), args.threshold)
+    for regression in regressions:
+        print(f'REGRESSION {regression.name}: {regression.baseline:.3g}s -> '
+              f'{regression.current:.3g}s per op ({regression.ratio:.2f}x)')
+    if not regressions:
+        print('No regressions')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Deterministic synthetic characters and inventories for benchmarks."""
+import random
+from typing import Iterator, List
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.link_skills import CLASS_TO_LINK
+
+SCALES = {'1': 1, '1k': 1_000, '100k': 100_000}
+"""Number of characters generated at every scale."""
+
+EQUIP_POOL_SIZE = 5_000
+"""Distinct equips shared by the generated characters, which keeps 100k
+characters in memory."""
+
+_GEAR_SLOTS = [
+    equip_type for equip_type in EquipType
+    if not equip_type.name.startswith(('TOTEM', 'PET', 'CASH'))]
+_BASE_STATS = [Stat.STR, Stat.DEX, Stat.INT, Stat.LUK, Stat.ATT, Stat.MATT]
+_LINE_STATS = [Stat.PCT_STR, Stat.PCT_DEX, Stat.PCT_ALL, Stat.PCT_ATT,
+               Stat.BOSS, Stat.IED, Stat.CRIT_DMG, Stat.DMG]
+_CLASSES = [char_class for char_class in Class
+            if char_class != Class.BEGINNER]
+
+
+def _line(rng: random.Random) -> tuple:
+    stat = rng.choice(_LINE_STATS)
+    if stat == Stat.IED:
+        return stat, rng.choice([0.3, 0.35, 0.4])
+    if stat == Stat.CRIT_DMG:
+        return stat, 8.0
+    return stat, rng.choice([6, 9, 10, 12, 13])
+
+
+def generate_equip(rng: random.Random, equip_type: EquipType) -> Equip:
+    """A random equip with a few base and scroll stats and full lines."""
+    return Equip(
+        f'{equip_type.name.title()} {rng.randrange(20)}', equip_type,
+        base_stats={stat: rng.randrange(5, 150)
+                    for stat in rng.sample(_BASE_STATS, 3)},
+        scroll_stats={stat: rng.randrange(0, 120)
+                      for stat in rng.sample(_BASE_STATS, 2)},
+        potential=[_line(rng) for _ in range(3)],
+        bonus_potential=[_line(rng) for _ in range(rng.randrange(4))],
+        bonus_stats=[_line(rng) for _ in range(rng.randrange(5))])
+
+
+def generate_equips(count: int, seed: int = 0) -> List[Equip]:
+    rng = random.Random(seed)
+    return [generate_equip(rng, rng.choice(_GEAR_SLOTS))
+            for _ in range(count)]
+
+
+def generate_characters(count: int, seed: int = 0) -> Iterator[Character]:
+    """Characters with random links and one equip in every gear slot, drawn
+    from a shared pool of `EQUIP_POOL_SIZE` equips per slot family.
+    """
+    rng = random.Random(seed)
+    pool_size = max(1, min(count, EQUIP_POOL_SIZE // len(_GEAR_SLOTS)))
+    pool = {slot: [generate_equip(rng, slot) for _ in range(pool_size)]
+            for slot in _GEAR_SLOTS}
+    link_classes = sorted(CLASS_TO_LINK, key=lambda cls: cls.value)
+
+    for idx in range(count):
+        yield Character(
+            f'Char{idx}', level=rng.randrange(200, 276),
+            character_class=rng.choice(_CLASSES),
+            world=rng.choice(list(World)),
+            link_skills={char_class: rng.randint(1, 2)
+                         for char_class in rng.sample(link_classes, 6)},
+            equips={slot: rng.choice(equips) for slot, equips in pool.items()})
@@ -0,0 +1,133 @@
+"""Timed benchmarks of the hot paths, and comparison against a baseline.
+
+Every benchmark reports the best time of several repeats, divided by the number
+of operations it performs, so results of different scales stay comparable.
+"""
+import json
+import os
+import platform
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from maplestats.benchmarks.generators import (
+    SCALES, generate_characters, generate_equips)
+from maplestats.character import Character
+from maplestats.equipment import Equip
+from maplestats.session_utils import measure_startup
+from maplestats.utils import combine_stats, parse_json
+
+FILE_SAMPLE_SIZE = 1_000
+"""Characters saved and loaded per repeat, since files are slow at scale."""
+
+DEFAULT_THRESHOLD = 0.2
+"""Relative slowdown reported as a regression."""
+
+
+def _best_time(func: Callable[[], Any], repeats: int,
+               setup: Optional[Callable[[], Any]] = None) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(scale: str = '1k', repeats: int = 3) -> Dict[str, Any]:
+    """Run every benchmark at `scale` (a key of `SCALES`).
+
+    Returns a JSON-compatible report with the seconds per operation of every
+    benchmark.
+    """
+    count = SCALES[scale]
+    characters = list(generate_characters(count))
+    equip_kwargs = [equip.to_json() for equip in generate_equips(count)]
+    json_reprs = [char.to_json() for char in characters]
+    stat_sources = [[equip.stats for equip in char.equips.values() if equip]
+                    for char in characters]
+    sample = characters[:FILE_SAMPLE_SIZE]
+
+    def _reset_aggregates() -> None:
+        for char in characters:
+            char.equips = char.equips
+
+    results: Dict[str, Dict[str, float]] = {}
+
+    def _record(name: str, ops: int, seconds: float) -> None:
+        results[name] = {'ops': ops, 'seconds_per_op': seconds / ops}
+
+    _record('equip_construction', len(equip_kwargs), _best_time(
+        lambda: [Equip(**kwargs) for kwargs in equip_kwargs], repeats))
+    _record('combine_stats', len(stat_sources), _best_time(
+        lambda: [combine_stats(sources) for sources in stat_sources],
+        repeats))
+    # Character.to_json is jsonify over the character and its equips.
+    _record('jsonify', len(characters), _best_time(
+        lambda: [char.to_json() for char in characters], repeats))
+    _record('parse_json', len(json_reprs), _best_time(
+        lambda: [parse_json(json_repr['equips'], value_class=Equip)
+                 for json_repr in json_reprs], repeats))
+    _record('stats_from_equips', len(characters), _best_time(
+        lambda: [char.stats_from_equips for char in characters], repeats,
+        setup=_reset_aggregates))
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # save() also writes the last modified file in the working directory.
+        os.chdir(temp_dir)
+        try:
+            _record('save', len(sample), _best_time(
+                lambda: [char.save() for char in sample], repeats))
+            _record('from_file', len(sample), _best_time(
+                lambda: [Character.from_file(f'{char.name}.json')
+                         for char in sample], repeats))
+            # Imports the session and loads the last saved character.
+            _record('session_startup', 1, measure_startup(repeats))
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'scale': scale,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Benchmarks of `current` slower than `baseline` by more than
+    `threshold` (0.2 means 20%). Benchmarks missing from either are skipped.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or base['seconds_per_op'] <= 0:
+            continue
+        regression = Regression(
+            name, base['seconds_per_op'], result['seconds_per_op'])
+        if regression.ratio > 1 + threshold:
+            regressions.append(regression)
+    return regressions
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,211 @@
+"""Compact, versioned binary format for characters and equips.
+
+Layout (little endian):
+    header:       b'MSTB', version (u8), kind (u8)
+    string table: count (u32), then every string as length (u16) + UTF-8
+    records:      count (u32), then every character or equip
+
+Enums are stored by their value, so members may only ever be appended. Names are
+stored once in the string table and referenced by index. Stat lines are packed
+as the stat (u8) followed by an i32, or a f64 for `FLOAT_VALUED_STATS`.
+"""
+import struct
+from typing import (
+    Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union)
+
+from maplestats.character import Character
+from maplestats.enums import (
+    Class, EquipType, Stat, World, FLOAT_VALUED_STATS)
+from maplestats.equipment import Equip
+
+MAGIC = b'MSTB'
+VERSION = 1
+
+_CHARACTERS = 0
+_EQUIPS = 1
+
+_HEADER = struct.Struct('<4sBB')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_INT_LINE = struct.Struct('<Bi')
+_FLOAT_LINE = struct.Struct('<Bd')
+_CHARACTER = struct.Struct('<IHBBB')
+"""Name, level, class, world (0 if none) and number of link skills."""
+_LINK_SKILL = struct.Struct('<BB')
+_EQUIP = struct.Struct('<BIB')
+"""Slot, name and equip type."""
+
+_STAT_BY_VALUE: Dict[int, Stat] = {stat.value: stat for stat in Stat}
+_FLOAT_STAT_VALUES = frozenset(stat.value for stat in FLOAT_VALUED_STATS)
+_STAT_VALUES: Dict[Any, int] = {
+    **{stat: stat.value for stat in Stat},
+    **{stat.name: stat.value for stat in Stat},
+}
+
+_STAT_SOURCES = ('base_stats', 'scroll_stats')
+_LINE_KINDS = ('potential', 'bonus_potential', 'bonus_stats')
+
+
+def _stat_value(stat: Union[Stat, str]) -> int:
+    try:
+        return _STAT_VALUES[stat]
+    except KeyError:
+        return Stat.maybe_parse(stat).value
+
+
+class _Writer:
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._strings: Dict[str, int] = {}
+
+    def string(self, value: str) -> int:
+        try:
+            return self._strings[value]
+        except KeyError:
+            idx = self._strings[value] = len(self._strings)
+            return idx
+
+    def lines(self, lines: Sequence[Tuple[Any, Any]]) -> None:
+        self._parts.append(_U8.pack(len(lines)))
+        for stat, value in lines:
+            code = _stat_value(stat)
+            if code in _FLOAT_STAT_VALUES:
+                self._parts.append(_FLOAT_LINE.pack(code, value))
+            else:
+                self._parts.append(_INT_LINE.pack(code, int(value)))
+
+    def equip(self, slot: EquipType, equip: Equip) -> None:
+        self._parts.append(_EQUIP.pack(
+            slot.value, self.string(equip.name), equip.equip_type.value))
+        for source in _STAT_SOURCES:
+            self.lines(list(getattr(equip, source).items()))
+        for kind in _LINE_KINDS:
+            self.lines(getattr(equip, kind))
+
+    def character(self, character: Character) -> None:
+        link_skills = character.link_skills
+        self._parts.append(_CHARACTER.pack(
+            self.string(character.name), character.level,
+            character.char_class.value,
+            character.world.value if character.world else 0,
+            len(link_skills)))
+        for char_class, level in link_skills.items():
+            self._parts.append(_LINK_SKILL.pack(char_class.value, level))
+
+        equips = [(slot, equip) for slot, equip in character.equips.items()
+                  if equip is not None]
+        self._parts.append(_U8.pack(len(equips)))
+        for slot, equip in equips:
+            self.equip(slot, equip)
+
+    def getvalue(self, kind: int, count: int) -> bytes:
+        header = [_HEADER.pack(MAGIC, VERSION, kind),
+                  _U32.pack(len(self._strings))]
+        for value in self._strings:
+            encoded = value.encode('utf-8')
+            header.append(_U16.pack(len(encoded)))
+            header.append(encoded)
+        header.append(_U32.pack(count))
+        return b''.join(header + self._parts)
+
+
+class _Reader:
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._pos = 0
+
+        magic, version, self.kind = self._unpack(_HEADER)
+        assert magic == MAGIC, 'Not a MapleStats binary file'
+        assert version <= VERSION, f'Unsupported version {version}'
+
+        self._strings: List[str] = []
+        for _ in range(self._unpack(_U32)[0]):
+            length = self._unpack(_U16)[0]
+            self._strings.append(
+                bytes(self._data[self._pos:self._pos + length]).decode('utf-8'))
+            self._pos += length
+        self.count = self._unpack(_U32)[0]
+
+    def _unpack(self, fmt: struct.Struct) -> Tuple[Any, ...]:
+        values = fmt.unpack_from(self._data, self._pos)
+        self._pos += fmt.size
+        return values
+
+    def lines(self) -> List[Tuple[Stat, Any]]:
+        lines = []
+        for _ in range(self._unpack(_U8)[0]):
+            code = self._data[self._pos]
+            fmt = _FLOAT_LINE if code in _FLOAT_STAT_VALUES else _INT_LINE
+            _, value = self._unpack(fmt)
+            lines.append((_STAT_BY_VALUE[code], value))
+        return lines
+
+    def equip(self) -> Tuple[EquipType, Equip]:
+        slot, name, equip_type = self._unpack(_EQUIP)
+        stats = {source: dict(self.lines()) for source in _STAT_SOURCES}
+        lines = {kind: self.lines() for kind in _LINE_KINDS}
+        return EquipType(slot), Equip(
+            self._strings[name], EquipType(equip_type), **stats, **lines)
+
+    def character(self) -> Character:
+        name, level, char_class, world, num_links = self._unpack(_CHARACTER)
+        link_skills = {}
+        for _ in range(num_links):
+            link_class, link_level = self._unpack(_LINK_SKILL)
+            link_skills[Class(link_class)] = link_level
+        equips = dict(self.equip() for _ in range(self._unpack(_U8)[0]))
+        return Character(
+            self._strings[name], level=level,
+            character_class=Class(char_class),
+            world=World(world) if world else None,
+            link_skills=link_skills, equips=equips)
+
+
+def dumps_many(characters: Iterable[Character]) -> bytes:
+    """Serialize characters, sharing one string table between them."""
+    writer = _Writer()
+    count = 0
+    for character in characters:
+        writer.character(character)
+        count += 1
+    return writer.getvalue(_CHARACTERS, count)
+
+
+def loads_many(data: bytes) -> List[Character]:
+    reader = _Reader(data)
+    assert reader.kind == _CHARACTERS, 'Data does not hold characters'
+    return [reader.character() for _ in range(reader.count)]
+
+
+def dumps(character: Character) -> bytes:
+    return dumps_many([character])
+
+
+def loads(data: bytes) -> Character:
+    characters = loads_many(data)
+    assert len(characters) == 1, 'Data does not hold exactly one character'
+    return characters[0]
+
+
+def dumps_equips(equips: Iterable[Equip]) -> bytes:
+    """Serialize equips. Their own equip types are stored as their slots."""
+    writer = _Writer()
+    count = 0
+    for equip in equips:
+        writer.equip(equip.equip_type, equip)
+        count += 1
+    return writer.getvalue(_EQUIPS, count)
+
+
+def loads_equips(data: bytes) -> List[Equip]:
+    reader = _Reader(data)
+    assert reader.kind == _EQUIPS, 'Data does not hold equips'
+    return [reader.equip()[1] for _ in range(reader.count)]
+
+
+def is_binary(data: Optional[bytes]) -> bool:
+    """Whether `data` starts like this format."""
+    return bool(data) and data[:len(MAGIC)] == MAGIC
@@ -0,0 +1,164 @@
+"""LRU cache of stat and damage results, keyed by character content.
+
+Results are stored under `Character.fingerprint`, a hash of everything which
+affects stats and damage, so identical characters (the same character loaded
+twice, or characters built from a shared preset) hit the same entries:
+
+    cache = ResultCache(maxsize=10_000, file_path='results.cache')
+    cache.evaluate(Character.from_file('Somi.json'))
+    cache.info()
+    cache.save()
+
+Fingerprints are computed once per character and per equip, and recomputed
+only after the character changes.
+"""
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from maplestats.character import Character
+from maplestats.enums import Stat
+from maplestats.evaluation import BuildEvaluation
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.instrumentation import count
+from maplestats.stat_vector import StatVector
+from maplestats.utils import atomic_write
+
+DEFAULT_MAXSIZE = 4096
+
+_CACHE_VERSION = 1
+"""Saved caches of another version are ignored."""
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ResultCache:
+    """Thread-safe LRU cache of results by key, with optional persistence."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE,
+                 file_path: Optional[str] = None):
+        """Create a cache, loaded from `file_path` if it exists.
+
+        Args:
+            maxsize: Entries kept. The least recently used are evicted first.
+            file_path: File the cache is loaded from, if it exists, and saved
+                to by `save`.
+        """
+        assert maxsize > 0, 'The cache needs room for at least one entry'
+        self.maxsize = maxsize
+        self.file_path = file_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        if file_path and os.path.exists(file_path):
+            self.load(file_path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize,
+                             len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """The cached result of `key`, computing and storing it on a miss.
+        Results are shared, so they must not be modified.
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count('ResultCache.hit')
+                return value
+        count('ResultCache.miss')
+
+        # Computed outside of the lock, so a slow computation does not block
+        # other threads. Two threads may compute the same result.
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stat_vector(self, character: Character) -> StatVector:
+        """`Character.stat_vector`. Read-only."""
+        values = self.get_or_compute(
+            (character.fingerprint, 'stat_vector'),
+            lambda: _read_only(character.stat_vector.values.copy()))
+        return StatVector(values)
+
+    def evaluate(self, character: Character,
+                 boss_pdr: float = DEFAULT_BOSS_PDR) -> BuildEvaluation:
+        """`Character.evaluate`. Evaluations of one character hold floats,
+        so the shared tuple cannot be modified.
+        """
+        return self.get_or_compute(
+            (character.fingerprint, 'evaluate', boss_pdr),
+            lambda: character.evaluate(boss_pdr))
+
+    def stat_equivalences(self, character: Character,
+                          boss_pdr: float = DEFAULT_BOSS_PDR,
+                          reference: Optional[Stat] = None
+                          ) -> Dict[Stat, float]:
+        """`Character.stat_equivalences`, as a copy of the cached dict."""
+        return dict(self.get_or_compute(
+            (character.fingerprint, 'stat_equivalences', boss_pdr, reference),
+            lambda: character.stat_equivalences(boss_pdr, reference)))
+
+    def save(self, file_path: Optional[str] = None) -> None:
+        """Write the entries, most recently used last, to `file_path` (the
+        cache's own file by default).
+        """
+        file_path = file_path if file_path else self.file_path
+        assert file_path, 'No file to save the cache to'
+        with self._lock:
+            entries = list(self._entries.items())
+        atomic_write(file_path, pickle.dumps(
+            (_CACHE_VERSION, entries), protocol=pickle.HIGHEST_PROTOCOL))
+
+    def load(self, file_path: str) -> None:
+        """Add the entries saved in `file_path`, as the least recently used.
+        Only load caches you saved yourself: they are pickles. Caches which
+        cannot be read, e.g. truncated ones, are ignored like caches of
+        another version.
+        """
+        with open(file_path, 'rb') as f:
+            try:
+                version, entries = pickle.load(f)
+            except Exception:  # Unpickling raises about any exception.
+                return
+        if version != _CACHE_VERSION:
+            return
+        with self._lock:
+            loaded = OrderedDict(entries[-self.maxsize:])
+            for key, value in self._entries.items():
+                loaded.pop(key, None)
+                loaded[key] = value
+            while len(loaded) > self.maxsize:
+                loaded.popitem(last=False)
+            self._entries = loaded
+
+
+def _read_only(values: Any) -> Any:
+    values.flags.writeable = False
+    return values
@@ -1,52 +1,144 @@
+import hashlib
 import json
-from typing import Any, Dict, Optional, Union
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Set, Union)
 
 from maplestats.enums import (
     World, Stat, JobBranch, Class, EquipType, EMPTY_INVENTORY)
 from maplestats.equipment import Equip
-from maplestats.utils import STATS_TYPING, combine_stats, jsonify, parse_json
+from maplestats.instrumentation import (
+    count, instrumented, is_enabled, timed)
+from maplestats.link_skills import (
+    check_link_level, link_skills_stat_vector, link_stat_vector)
+from maplestats.utils import STATS_TYPING, atomic_write, jsonify, parse_json
 
-JOB_ADVANCEMENT_LEVEL_REQUIREMENTS = [10, 30, 60, 100, 200]
+if TYPE_CHECKING:
+    from maplestats.evaluation import BuildEvaluation
+    from maplestats.stat_vector import StatVector
 
 LAST_MODIFIED_FILE_NAME = ".lastmodified"
 
+EQUIPS_TYPING = Dict[Union[EquipType, str], Optional[Union[Equip, Dict]]]
+
+_DERIVED_DEPENDENCIES: Dict[str, Set[str]] = {
+    'level': {'job', 'pure_main_stat', 'fingerprint'},
+    'char_class': {'fingerprint'},
+    'world': {'damage', 'fingerprint'},
+    'equips': {'stat_vector', 'damage', 'fingerprint'},
+    'link_skills': {'stat_vector', 'damage', 'fingerprint'},
+}
+"""Derived properties which must be recomputed when each input changes."""
+
+OBSERVER_TYPING = Callable[['Character', str, Any], None]
+"""Called with the character, the name of the change and its new value after
+every mutation. Changes are 'level', 'char_class', 'world' and 'equips' with
+the new value, 'link_skills' with the new link skills, 'link_skill' with a
+(class, level) pair and 'equip' with an (equip, slot) pair."""
+
+
+def _derived(func: Callable[['Character'], Any]) -> property:
+    """Property whose value is cached until one of its inputs changes."""
+    name = func.__name__
+    timer_name = f'Character.{name}'
+    counter_name = f'Character.{name}.cached'
+
+    def _get(self: 'Character') -> Any:
+        try:
+            value = self._derived[name]
+        except KeyError:
+            with timed(timer_name):
+                value = self._derived[name] = func(self)
+        else:
+            if is_enabled():
+                count(counter_name)
+        return value
+
+    _get.__doc__ = func.__doc__
+    return property(_get)
+
 
 class Character:
 
+    @instrumented()
     def __init__(
             self,
             name: str,
             level: int = 1,
             character_class: Union[Class, str] = Class.BEGINNER,
-            world: World = None,
+            world: Union[World, str] = None,
             link_skills: Dict[Union[Class, str], int] = None,
-            equips: Dict[Union[EquipType, str],
-                         Optional[Union[Equip, Dict]]] = None,
+            equips: Union[EQUIPS_TYPING, Callable[[], EQUIPS_TYPING]] = None,
             *args,
             **kwargs,
     ):
+        """Note: `equips` may also be a function returning the equips, which
+        is only called the first time the equips are needed.
+        """
         del args
         del kwargs
         assert 1 <= level <= 275, 'Level must be between 1 and 275'
 
         self.name = name
-        self.level = level
+        self._level = level
         self._character_class: Class = Class.maybe_parse(character_class)
-        self._world = world
-        self.link_skills = parse_json(link_skills, key_class=Class
-                                      ) if link_skills else {}
-        self.equips = parse_json(equips, key_class=EquipType, value_class=Equip
-                                 ) if equips else EMPTY_INVENTORY
+        self._world: Optional[World] = World.maybe_parse(
+            world) if world else None
+        self._link_skills: Dict[Class, int] = _parse_link_skills(link_skills)
+        self._equips: Optional[Dict[EquipType, Optional[Equip]]] = None
+        self._equips_loader: Optional[Callable[[], EQUIPS_TYPING]] = None
+        if callable(equips):
+            self._equips_loader = equips
+        else:
+            self._equips = _parse_equips(equips)
 
-        self._in_reboot = world.is_reboot if world else False
+        self._in_reboot = self._world.is_reboot if self._world else False
         self._main_stat: Stat = self._character_class.main_stat
         self._secondary_stat: Stat = self._character_class.secondary_stat
 
+        # Running aggregates, built on first use and then updated by delta.
+        self._equip_stats: Optional['StatVector'] = None
+        self._link_stats: Optional['StatVector'] = None
+        self._derived: Dict[str, Any] = {}
+        self._observers: List[OBSERVER_TYPING] = []
+
     @classmethod
     def from_file(cls, file_path: str) -> 'Character':
-        with open(file_path, 'r') as f:
-            json_repr = json.load(f)
-        return cls(**json_repr)
+        """Load a character saved as JSON or in the binary format."""
+        from maplestats import binary
+
+        with timed('Character.from_file.read'), open(file_path, 'rb') as f:
+            data = f.read()
+        if binary.is_binary(data):
+            return binary.loads(data)
+        return cls(**json.loads(data))
+
+    def _invalidate(self, changed: str) -> None:
+        for name in _DERIVED_DEPENDENCIES.get(changed, ()):
+            self._derived.pop(name, None)
+
+    def add_observer(self, observer: OBSERVER_TYPING) -> None:
+        """Call `observer` after every mutation of this character."""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: OBSERVER_TYPING) -> None:
+        self._observers.remove(observer)
+
+    def _notify(self, change: str, value: Any) -> None:
+        for observer in self._observers:
+            observer(self, change, value)
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @level.setter
+    def level(self, new_level: int):
+        assert 1 <= new_level <= 275, 'Level must be between 1 and 275'
+        self._level = new_level
+        self._invalidate('level')
+        if self._observers:
+            self._notify('level', new_level)
 
     @property
     def char_class(self) -> Class:
@@ -57,6 +149,9 @@ class Character:
         self._character_class: Class = Class.maybe_parse(new_class)
         self._main_stat = self._character_class.main_stat
         self._secondary_stat = self._character_class.secondary_stat
+        self._invalidate('char_class')
+        if self._observers:
+            self._notify('char_class', self._character_class)
 
     @property
     def world(self) -> World:
@@ -64,12 +159,79 @@ class Character:
 
     @world.setter
     def world(self, new_world: Optional[World]):
-        self.world = new_world
-        self._in_reboot = new_world.is_reboot if new_world else False
+        self._world = World.maybe_parse(new_world) if new_world else None
+        self._in_reboot = self._world.is_reboot if self._world else False
+        self._invalidate('world')
+        if self._observers:
+            self._notify('world', self._world)
 
     @property
+    def link_skills(self) -> Mapping[Class, int]:
+        """Read-only view of link skill levels by class. Use `set_link_skill`
+        or assign new link skills to edit.
+        """
+        return MappingProxyType(self._link_skills)
+
+    @link_skills.setter
+    def link_skills(self, new_link_skills: Dict[Union[Class, str], int]):
+        self._link_skills = _parse_link_skills(new_link_skills)
+        self._link_stats = None
+        self._invalidate('link_skills')
+        if self._observers:
+            self._notify('link_skills', self.link_skills)
+
+    def set_link_skill(self, char_class: Union[Class, str],
+                       level: Optional[int]) -> None:
+        """Set the level of a single link skill, or remove it if `level` is
+        None or 0.
+        """
+        char_class = Class.maybe_parse(char_class)
+        # Checks the level before anything is changed.
+        added = link_stat_vector(char_class, level) if level else None
+        old_level = self._link_skills.pop(char_class, None)
+        if level:
+            self._link_skills[char_class] = level
+
+        if self._link_stats is not None:
+            try:
+                if old_level:
+                    self._link_stats -= link_stat_vector(char_class, old_level)
+                if added is not None:
+                    self._link_stats += added
+            except ValueError:
+                # Rebuilt from the link skills on next use.
+                self._link_stats = None
+        self._invalidate('link_skills')
+        if self._observers:
+            self._notify('link_skill', (char_class, level))
+
+    def _load_equips(self) -> Dict[EquipType, Optional[Equip]]:
+        if self._equips is None:
+            self._equips = _parse_equips(self._equips_loader())
+            self._equips_loader = None
+        return self._equips
+
+    @property
+    def equips(self) -> Mapping[EquipType, Optional[Equip]]:
+        """Read-only view of equipped items by slot. Use `equip` or assign new
+        equips to edit.
+        """
+        return MappingProxyType(self._load_equips())
+
+    @equips.setter
+    def equips(self, new_equips: EQUIPS_TYPING):
+        self._equips = _parse_equips(new_equips)
+        self._equips_loader = None
+        self._equip_stats = None
+        self._invalidate('equips')
+        if self._observers:
+            self._notify('equips', self.equips)
+
+    @_derived
     def job(self) -> int:
         """Job of this character"""
+        from maplestats.formulas import JOB_ADVANCEMENT_LEVEL_REQUIREMENTS
+
         for idx, lvl_req in enumerate(JOB_ADVANCEMENT_LEVEL_REQUIREMENTS):
             if self.level < lvl_req:
                 return idx + 1
@@ -79,7 +241,7 @@ class Character:
     def class_branch(self) -> JobBranch:
         return self._character_class.branch
 
-    @property
+    @_derived
     def pure_main_stat(self) -> int:
         """Pure stat from leveling up"""
         stat = 5 * self.level + 4
@@ -93,22 +255,113 @@ class Character:
     def pure_secondary_stat(self) -> int:
         return 4
 
-    @property
+    @_derived
     def damage(self) -> int:
         dmg = 50 if self._in_reboot else 0
-        dmg += self.stats_from_equips[Stat.DMG]
+        dmg += self.stat_vector[Stat.DMG]
         return dmg
 
     @property
     def stats_from_equips(self) -> STATS_TYPING:
-        return combine_stats(equip.stats for equip in self.equips.values()
-                             if equip is not None)
-
-    def equip(self, equip: Equip) -> Optional[Equip]:
-        """Equip an item and return the unequipped item."""
-        equip_type = equip.equip_type
-        unequipped = self.equips[equip_type]
-        self.equips[equip_type] = equip
+        return self.stat_vector_from_equips.to_stats(sparse=False)
+
+    @property
+    def stat_vector_from_equips(self) -> 'StatVector':
+        if self._equip_stats is None:
+            from maplestats.stat_vector import StatVector
+
+            self._equip_stats = StatVector.sum(
+                equip.stat_vector for equip in self.equips.values()
+                if equip is not None)
+        return self._equip_stats
+
+    @property
+    def stat_vector_from_link_skills(self) -> 'StatVector':
+        if self._link_stats is None:
+            self._link_stats = link_skills_stat_vector(self._link_skills)
+        return self._link_stats
+
+    @_derived
+    def stat_vector(self) -> 'StatVector':
+        """Stats from all sources: equips and link skills."""
+        return self.stat_vector_from_equips + self.stat_vector_from_link_skills
+
+    @property
+    def stats(self) -> STATS_TYPING:
+        return self.stat_vector.to_stats(sparse=False)
+
+    @_derived
+    def fingerprint(self) -> str:
+        """Hash of everything which affects this character's stats and
+        damage: level, class, world, link skills and the fingerprint of every
+        equip. The name is left out, so identical characters share it.
+        """
+        content = [
+            self.level, self._character_class.name,
+            self._world.name if self._world else None,
+            sorted((char_class.name, level)
+                   for char_class, level in self._link_skills.items()),
+            [(slot.name, equip.fingerprint)
+             for slot, equip in self.equips.items() if equip is not None],
+        ]
+        return hashlib.blake2b(json.dumps(content).encode(),
+                               digest_size=16).hexdigest()
+
+    def evaluate(self, boss_pdr: Optional[float] = None
+                 ) -> 'BuildEvaluation':
+        """Stat range and boss damage of this character. `boss_pdr` defaults
+        to `formulas.DEFAULT_BOSS_PDR`.
+        """
+        from maplestats.evaluation import BuildEvaluation, evaluate_builds
+        from maplestats.formulas import DEFAULT_BOSS_PDR
+
+        evaluation = evaluate_builds(
+            self.stat_vector.values, self._character_class, self.level,
+            world=self._world,
+            boss_pdr=DEFAULT_BOSS_PDR if boss_pdr is None else boss_pdr)
+        return BuildEvaluation(*(float(values[0]) for values in evaluation))
+
+    def stat_equivalences(self, boss_pdr: Optional[float] = None,
+                          reference: Optional[Stat] = None
+                          ) -> Dict[Stat, float]:
+        """Value of one unit of every stat, in units of `reference` (% main
+        stat by default). E.g. `{Stat.BOSS: 1.2}` means 1% boss is worth 1.2%
+        main stat. `boss_pdr` defaults to `formulas.DEFAULT_BOSS_PDR`.
+        """
+        from maplestats.evaluation import stat_equivalences
+        from maplestats.formulas import DEFAULT_BOSS_PDR
+
+        return stat_equivalences(
+            self.stat_vector.values, self._character_class, self.level,
+            world=self._world,
+            boss_pdr=DEFAULT_BOSS_PDR if boss_pdr is None else boss_pdr,
+            reference=reference)
+
+    def equip(self, equip: Equip, slot: Optional[EquipType] = None
+              ) -> Optional[Equip]:
+        """Equip an item and return the unequipped item.
+
+        Args:
+            equip: Item to equip.
+            slot: Slot to equip the item in, e.g. RING_3. Defaults to the
+                item's own equip type.
+        """
+        equip_type = EquipType.maybe_parse(slot) if slot else equip.equip_type
+        equips = self._load_equips()
+        unequipped = equips.get(equip_type)
+        equips[equip_type] = equip
+
+        if self._equip_stats is not None:
+            try:
+                if unequipped is not None:
+                    self._equip_stats -= unequipped.stat_vector
+                self._equip_stats += equip.stat_vector
+            except ValueError:
+                # Rebuilt from the equips on next use.
+                self._equip_stats = None
+        self._invalidate('equips')
+        if self._observers:
+            self._notify('equip', (equip, equip_type))
         return unequipped
 
     def to_json(self, full: bool = False) -> Dict[str, Any]:
@@ -123,7 +376,7 @@ class Character:
             'level': self.level,
             'character_class': self._character_class,
             'world': self._world,
-            'link_skills': self.link_skills,
+            'link_skills': self._link_skills,
             'equips': self.equips,
         }
         if full:
@@ -135,15 +388,59 @@ class Character:
 
         return jsonify(json_repr)
 
-    def save(self, file_path: str = None) -> None:
-        file_path = file_path if file_path else f'{self.name}.json'
+    def save(self, file_path: str = None, binary: bool = False,
+             write_behind: bool = False) -> None:
+        """Save this character as JSON, or in the compact binary format of
+        `maplestats.binary` if `binary` is True. Files are replaced
+        atomically.
 
-        with open(file_path, 'w') as f:
-            json.dump(self.to_json(), f)
+        Args:
+            file_path: Defaults to the character's name.
+            binary: Whether to use the binary format.
+            write_behind: If True, only schedule the save on the default
+                `maplestats.persistence.WriteBehindSaver`, which coalesces
+                quick successive saves into one write.
+        """
+        extension = 'mstb' if binary else 'json'
+        file_path = file_path if file_path else f'{self.name}.{extension}'
+        if write_behind:
+            from maplestats import persistence
+            persistence.default_saver().schedule(self, file_path, binary)
+            return
 
+        data = self.serialize(binary)
+        with timed('Character.save.write'):
+            atomic_write(file_path, data)
         _write_last_modified(file_path)
 
+    def serialize(self, binary: bool = False) -> Union[bytes, str]:
+        """Contents of a saved file of this character."""
+        if binary:
+            from maplestats import binary as binary_format
+            return binary_format.dumps(self)
+        return json.dumps(self.to_json())
+
+
+def _parse_equips(equips: Optional[EQUIPS_TYPING]
+                  ) -> Dict[EquipType, Optional[Equip]]:
+    """A full inventory with every slot, filled with `equips`."""
+    inventory = dict(EMPTY_INVENTORY)
+    if equips:
+        inventory.update(parse_json(
+            equips, key_class=EquipType, value_class=Equip))
+    return inventory
+
+
+def _parse_link_skills(link_skills: Optional[Dict[Union[Class, str], int]]
+                       ) -> Dict[Class, int]:
+    """Link skill levels by class, each checked against its maximum level."""
+    parsed = parse_json(link_skills, key_class=Class) if link_skills else {}
+    for char_class, level in parsed.items():
+        check_link_level(char_class, level)
+    return parsed
+
 
-def _write_last_modified(file_path: str) -> None:
-    with open(LAST_MODIFIED_FILE_NAME, 'w') as f:
-        f.write(file_path)
+def _write_last_modified(file_path: str,
+                         last_modified_path: str = LAST_MODIFIED_FILE_NAME
+                         ) -> None:
+    atomic_write(last_modified_path, file_path)
@@ -1,19 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Set, Tuple, Type
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Type
 
-from maplestats.enums import Class, WeaponType
+from maplestats.enums import Class, Stat, WeaponType
+
+if TYPE_CHECKING:
+    from maplestats.dpm import Skill
 
 
 class CharacterClass(ABC):
 
     def __init__(self):
-        self._enum: Optional[Class] = Class.get(
+        self._enum: Optional[Class] = Class.__members__.get(
             self.__class__.__name__.upper())
 
     @abstractmethod
     def weapon(self) -> WeaponType:
         raise NotImplementedError
 
+    def rotation(self) -> List['Skill']:
+        """Skills used against bosses, by priority. See `maplestats.dpm`."""
+        return []
+
     @property
     def enum(self) -> Optional[Class]:
         return self._enum
@@ -30,6 +37,27 @@ class Buccaneer(Beginner):
     def weapon(self) -> WeaponType:
         return WeaponType.KNUCKLE
 
+    def rotation(self) -> List['Skill']:
+        """Approximate: skill values are rounded and only the skills which
+        matter most are included.
+        """
+        from maplestats.dpm import Buff, Skill
+
+        return [
+            Skill('Decent Sharp Eyes', 0, 0.9, cooldown=180, buff=Buff(
+                'Decent Sharp Eyes', 180,
+                {Stat.CRIT: 10, Stat.CRIT_DMG: 8})),
+            Skill('Epic Adventure', 0, 0.6, cooldown=120, buff=Buff(
+                'Epic Adventure', 60, {Stat.DMG: 10},
+                extended_by_buff_duration=False), burst=True),
+            Skill('Stimulating Conversation', 0, 0.9, cooldown=120,
+                  buff=Buff('Stimulating Conversation', 40,
+                            {Stat.DMG: 20, Stat.BOSS: 10}), burst=True),
+            Skill('Lightning Cannon', 7200, 3.0, cooldown=60, burst=True),
+            Skill('Nautilus Assault', 3600, 1.2, cooldown=30),
+            Skill('Octopunch', 1800, 0.6),
+        ]
+
 
 _CLASSES: Set[Type[CharacterClass]] = {
     Beginner,
@@ -40,7 +68,19 @@ _CLASSES: Set[Type[CharacterClass]] = {
 def _generate_enum_to_class(classes: Set[Type[CharacterClass]]
                             ) -> Dict[Class, Type[CharacterClass]]:
     """Generates a mapping from Class enum to CharacterClass."""
-    return {cls.enum: cls for cls in classes if cls.enum}
+    return {cls().enum: cls for cls in classes if cls().enum}
 
 
 ENUM_TO_CLASS = _generate_enum_to_class(_CLASSES)
+
+
+def weapon_type_of(char_class: Class) -> Optional[WeaponType]:
+    """Weapon used by a class, if the class is known."""
+    character_class = ENUM_TO_CLASS.get(char_class)
+    return character_class().weapon() if character_class else None
+
+
+def rotation_of(char_class: Class) -> List['Skill']:
+    """Boss rotation of a class, empty if the class is unknown."""
+    character_class = ENUM_TO_CLASS.get(char_class)
+    return character_class().rotation() if character_class else []
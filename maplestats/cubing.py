@@ -0,0 +1,269 @@
+"""Monte Carlo estimate of the cubes needed to reach target potential lines.
+
+Every cube rolls three lines independently of previous cubes, so the number of
+cubes until the target is hit follows a geometric distribution. Only the chance
+`p` of hitting the target with one cube is simulated, in large NumPy batches
+spread across processes. Expected cubes (1 / p) and cost quantiles follow from
+`p` exactly.
+
+The line tables below approximate legendary potential of level 160+ equips:
+line values are realistic but option weights are rough, so results are
+estimates. Every line past the first is prime with the rate of its cube.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from enum import auto
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from maplestats.enums import EquipType, MapleStatsEnum, Stat, WSE
+from maplestats.equipment import Equip
+
+
+class CubeType(MapleStatsEnum):
+    """Cubes which reroll potential (RED, BLACK) or bonus potential (BONUS)."""
+    RED = auto()
+    BLACK = auto()
+    BONUS = auto()
+
+
+CUBE_COSTS: Dict[CubeType, int] = {
+    CubeType.RED: 12_000_000,
+    CubeType.BLACK: 22_000_000,
+    CubeType.BONUS: 20_000_000,
+}
+"""Approximate meso cost of one cube."""
+
+PRIME_LINE_RATES: Dict[CubeType, Tuple[float, float, float]] = {
+    CubeType.RED: (1.0, 0.1, 0.01),
+    CubeType.BLACK: (1.0, 0.2, 0.05),
+    CubeType.BONUS: (1.0, 0.05, 0.05),
+}
+"""Chance of every line to roll at the prime (legendary) tier."""
+
+_LINE = Tuple[Optional[Stat], float, float, float]
+"""Stat (None for lines without tracked stats), prime value, non-prime value
+and relative weight."""
+
+_MAIN_STAT_LINES: List[_LINE] = [
+    (stat, 13, 10, 1.0)
+    for stat in (Stat.PCT_STR, Stat.PCT_DEX, Stat.PCT_INT, Stat.PCT_LUK)
+] + [(Stat.PCT_ALL, 10, 7, 1.0)]
+
+_WEAPON_LINES: List[_LINE] = [
+    (Stat.PCT_ATT, 13, 10, 1.0),
+    (Stat.PCT_MATT, 13, 10, 1.0),
+    (Stat.BOSS, 40, 30, 0.5),
+    (Stat.BOSS, 35, 30, 1.0),
+    (Stat.BOSS, 30, 30, 1.0),
+    (Stat.IED, 0.4, 0.3, 1.0),
+    (Stat.IED, 0.35, 0.3, 1.0),
+    (Stat.DMG, 12, 9, 1.0),
+    (None, 0, 0, 4.0),
+] + _MAIN_STAT_LINES
+
+_ARMOR_LINES: List[_LINE] = _MAIN_STAT_LINES + [(None, 0, 0, 6.0)]
+
+_GLOVE_LINES: List[_LINE] = _ARMOR_LINES + [(Stat.CRIT_DMG, 8, 0, 1.0)]
+
+_ACCESSORY_LINES: List[_LINE] = _MAIN_STAT_LINES + [
+    (Stat.DROP_RATE, 20, 0, 1.0),
+    (None, 0, 0, 6.0),
+]
+
+_BONUS_MAIN_STAT_LINES: List[_LINE] = [
+    (stat, 8, 6, 1.0)
+    for stat in (Stat.PCT_STR, Stat.PCT_DEX, Stat.PCT_INT, Stat.PCT_LUK)
+] + [(Stat.PCT_ALL, 6, 5, 1.0)]
+
+_BONUS_WEAPON_LINES: List[_LINE] = [
+    (Stat.PCT_ATT, 12, 9, 1.0),
+    (Stat.PCT_MATT, 12, 9, 1.0),
+    (Stat.BOSS, 18, 12, 1.0),
+    (Stat.IED, 0.1, 0.07, 1.0),
+    (Stat.DMG, 12, 9, 1.0),
+    (None, 0, 0, 6.0),
+] + _BONUS_MAIN_STAT_LINES
+
+_BONUS_LINES: List[_LINE] = _BONUS_MAIN_STAT_LINES + [(None, 0, 0, 10.0)]
+
+_RESTRICTED_STATS = (Stat.BOSS, Stat.IED)
+"""At most two lines of a potential may roll each of these stats."""
+
+_MAIN_STATS = (Stat.PCT_STR, Stat.PCT_DEX, Stat.PCT_INT, Stat.PCT_LUK)
+
+
+def _line_table(equip_type: EquipType, cube_type: CubeType) -> List[_LINE]:
+    if cube_type == CubeType.BONUS:
+        return _BONUS_WEAPON_LINES if equip_type in WSE else _BONUS_LINES
+    if equip_type in WSE:
+        return _WEAPON_LINES
+    if equip_type == EquipType.GLOVE:
+        return _GLOVE_LINES
+    if equip_type in (EquipType.HAT, EquipType.TOP, EquipType.BOTTOM,
+                      EquipType.SHOE, EquipType.CAPE, EquipType.SHOULDER,
+                      EquipType.BELT):
+        return _ARMOR_LINES
+    return _ACCESSORY_LINES
+
+
+def _contribution(stat: Optional[Stat], target: Stat, value: float) -> float:
+    """How much a line adds to a target, with IED in -log(1 - IED) so that it
+    adds up like other stats.
+    """
+    if stat == target or (stat == Stat.PCT_ALL and target in _MAIN_STATS):
+        return -np.log1p(-value) if target == Stat.IED else value
+    return 0.0
+
+
+class _Tables(NamedTuple):
+    """Line tables laid out for the simulation, with T target stats."""
+    cumulative: np.ndarray
+    """Cumulative probabilities of the options."""
+    prime: np.ndarray
+    """(options x T) contribution of every option at the prime tier."""
+    lower: np.ndarray
+    restricted: np.ndarray
+    """(options x restricted stats) which restricted stat every option
+    rolls."""
+    minimums: np.ndarray
+    prime_rates: Tuple[float, float, float]
+
+
+def _tables(equip_type: EquipType, cube_type: CubeType,
+            target: Dict[Stat, float]) -> _Tables:
+    lines = _line_table(equip_type, cube_type)
+    weights = np.array([weight for *_, weight in lines])
+    prime = np.array([[_contribution(stat, target_stat, prime_value)
+                       for target_stat in target]
+                      for stat, prime_value, _, _ in lines])
+    lower = np.array([[_contribution(stat, target_stat, lower_value)
+                       for target_stat in target]
+                      for stat, _, lower_value, _ in lines])
+    minimums = np.array([_contribution(stat, stat, value)
+                         for stat, value in target.items()])
+    return _Tables(
+        cumulative=np.cumsum(weights) / weights.sum(),
+        prime=prime.reshape(len(lines), len(target)),
+        lower=lower.reshape(len(lines), len(target)),
+        restricted=np.array([[stat == restricted_stat
+                              for restricted_stat in _RESTRICTED_STATS]
+                             for stat, *_ in lines], dtype=np.int8),
+        minimums=minimums,
+        prime_rates=PRIME_LINE_RATES[cube_type])
+
+
+def _simulate_batch(tables: _Tables, trials: int,
+                    seed: np.random.SeedSequence) -> Tuple[int, int]:
+    """Number of successful and of valid cubes among `trials` cubes."""
+    rng = np.random.default_rng(seed)
+    num_options = len(tables.cumulative)
+    # Prime rows follow the non-prime rows, so the tier offsets the index.
+    contributions = np.vstack([tables.lower, tables.prime])
+    restricted_rows = np.vstack([tables.restricted, tables.restricted])
+
+    totals = np.zeros((trials, len(tables.minimums)))
+    restricted = np.zeros((trials, len(_RESTRICTED_STATS)), dtype=np.int8)
+    for rate in tables.prime_rates:
+        rows = np.minimum(np.searchsorted(
+            tables.cumulative, rng.random(trials), side='right'),
+            num_options - 1)
+        rows += num_options * (rng.random(trials) < rate)
+        totals += contributions[rows]
+        restricted += restricted_rows[rows]
+
+    # Rolls breaking the line restriction are rerolled in game, which is
+    # approximated by discarding them.
+    valid = np.all(restricted <= 2, axis=1)
+    # Slack absorbs rounding of the IED transform.
+    success = valid & np.all(totals >= tables.minimums - 1e-9, axis=1)
+    return int(success.sum()), int(valid.sum())
+
+
+class CubingEstimate(NamedTuple):
+    """Estimated cubes and mesos to reach a target."""
+    success_rate: float
+    """Chance of one cube to hit the target."""
+    standard_error: float
+    """Standard error of `success_rate`."""
+    cube_cost: int
+    trials: int
+
+    @property
+    def expected_cubes(self) -> float:
+        return 1 / self.success_rate if self.success_rate else np.inf
+
+    @property
+    def expected_cost(self) -> float:
+        return self.expected_cubes * self.cube_cost
+
+    def cubes_quantile(self, quantile: Union[float, Sequence[float]]
+                       ) -> np.ndarray:
+        """Cubes needed to hit the target with probability `quantile`."""
+        quantile = np.asarray(quantile, dtype=float)
+        if self.success_rate <= 0:
+            return np.full(quantile.shape, np.inf)
+        if self.success_rate >= 1:
+            return np.ones(quantile.shape)
+        return np.maximum(1, np.ceil(
+            np.log1p(-quantile) / np.log1p(-self.success_rate)))
+
+    def cost_quantile(self, quantile: Union[float, Sequence[float]]
+                      ) -> np.ndarray:
+        """Mesos needed to hit the target with probability `quantile`."""
+        return self.cubes_quantile(quantile) * self.cube_cost
+
+
+def simulate_cubing(
+        equip: Equip,
+        target: Dict[Union[Stat, str], float],
+        cube_type: Union[CubeType, str] = CubeType.RED,
+        trials: int = 10_000_000,
+        batch_size: int = 1_000_000,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        cube_cost: Optional[int] = None,
+) -> CubingEstimate:
+    """Estimate the cubes and mesos needed to roll `target` on `equip`.
+
+    Batches use independent random streams spawned from `seed`, so a seed
+    gives the same estimate for any number of workers.
+
+    Args:
+        equip: Equip to cube. Its equip type decides the possible lines.
+        target: Minimum total of every stat over the three lines, e.g.
+            `{Stat.BOSS: 30, Stat.CRIT_DMG: 8}`. All stat % lines count
+            towards % STR, DEX, INT and LUK, and IED combines multiplicatively.
+        cube_type: BONUS rolls bonus potential, the others potential.
+        trials: Number of simulated cubes.
+        batch_size: Cubes simulated at once by one worker.
+        workers: Number of processes. 1 simulates in this process, None uses
+            one process per CPU.
+        seed: Seed of the random streams.
+        cube_cost: Mesos per cube. Defaults to `CUBE_COSTS`.
+    """
+    cube_type = CubeType.maybe_parse(cube_type)
+    target = {Stat.maybe_parse(stat): value for stat, value in target.items()}
+    cube_cost = cube_cost if cube_cost is not None else CUBE_COSTS[cube_type]
+    tables = _tables(equip.equip_type, cube_type, target)
+
+    num_batches = -(-trials // batch_size)
+    sizes = [min(batch_size, trials - idx * batch_size)
+             for idx in range(num_batches)]
+    seeds = np.random.SeedSequence(seed).spawn(num_batches)
+
+    if workers == 1:
+        results = list(map(_simulate_batch, [tables] * num_batches, sizes,
+                           seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                _simulate_batch, [tables] * num_batches, sizes, seeds))
+
+    successes = sum(success for success, _ in results)
+    valid = sum(count for _, count in results)
+    rate = successes / valid if valid else 0.0
+    error = np.sqrt(rate * (1 - rate) / valid) if valid else 0.0
+    return CubingEstimate(
+        success_rate=rate, standard_error=float(error), cube_cost=cube_cost,
+        trials=valid)
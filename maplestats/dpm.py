@@ -0,0 +1,259 @@
+"""Event-driven boss fight simulation, reporting damage per minute.
+
+A rotation is a priority list of skills. The fight is simulated on a heap of
+events (the character is free to act again, a cooldown ends, a buff ends), so
+time jumps from event to event instead of stepping through ticks. Whenever the
+character is free, it casts the first skill of the rotation which is ready.
+Burst skills with the longest cooldown among them are held until all of them
+are ready, and then cast in a row, so that their buffs line up. Burst skills
+with a shorter cooldown are cast whenever ready, since holding them for the
+window would lose casts.
+
+The timeline only depends on the rotation and on buff duration. Every cast is
+recorded with the set of buffs active at the time, and casts are reduced to
+the total skill damage dealt under each distinct set of buffs. Gear variants
+with the same buff duration share one timeline, and their damage is one
+`evaluate_builds` call over (variants x buff sets) rows:
+
+    skills = rotation_of(Class.BUCCANEER)
+    evaluation = batch_dpm(stats, Class.BUCCANEER, 250)
+    evaluation.dpm, evaluation.burst_damage
+"""
+import heapq
+from itertools import count as counter
+from typing import (
+    Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple, Union)
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.classes import rotation_of
+from maplestats.enums import Class, Stat, World
+from maplestats.evaluation import evaluate_builds
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.stat_vector import (
+    NUM_STATS, STAT_INDEX, StatVector, combine_rows)
+
+DEFAULT_FIGHT_LENGTH = 180.0
+"""Seconds."""
+
+_EXPIRE, _READY, _FREE = range(3)
+"""Event kinds, in the order events at the same time are handled: buffs end
+and cooldowns finish before the next skill is chosen."""
+
+
+class Buff(NamedTuple):
+    """Stats granted for some time after a skill is cast."""
+    name: str
+    duration: float
+    """Seconds, before `Stat.BUFF_DURATION`."""
+    stats: Dict[Stat, float]
+    extended_by_buff_duration: bool = True
+
+
+class Skill(NamedTuple):
+    name: str
+    damage: float
+    """Total damage of one cast in % of the damage range, over all lines and
+    hits."""
+    cast_time: float
+    """Seconds before the next skill can be cast."""
+    cooldown: float = 0.0
+    buff: Optional[Buff] = None
+    burst: bool = False
+    """Held until every burst skill of the rotation with the longest cooldown
+    is ready, unless its own cooldown is shorter."""
+
+
+class Timeline(NamedTuple):
+    """Outcome of a rotation over one fight."""
+    casts: List[Tuple[float, str]]
+    """Time and skill of every cast."""
+    buff_sets: List[FrozenSet[str]]
+    """Every distinct set of buffs active during a cast."""
+    weights: np.ndarray
+    """Total skill damage in % dealt under each buff set."""
+    uptime: Dict[str, float]
+    """Fraction of the fight every buff was active."""
+    fight_length: float
+
+
+class DPMEvaluation(NamedTuple):
+    """Damage of N gear variants, one value per variant."""
+    dpm: np.ndarray
+    burst_damage: np.ndarray
+    """Damage dealt while every buff of the burst skills was active."""
+
+
+def simulate_timeline(skills: Sequence[Skill],
+                      fight_length: float = DEFAULT_FIGHT_LENGTH,
+                      buff_duration: float = 0) -> Timeline:
+    """Cast `skills` by priority for `fight_length` seconds.
+
+    Args:
+        skills: Rotation, by priority. Skills without cooldown are fillers.
+        fight_length: Seconds.
+        buff_duration: `Stat.BUFF_DURATION` in %.
+    """
+    assert skills, 'A rotation needs at least one skill'
+    assert all(skill.cast_time > 0 for skill in skills), (
+        'Skills must take time to cast')
+    events: List[Tuple[float, int, int, int]] = []
+    sequence = counter()
+    ready_at = [0.0] * len(skills)
+    buff_ends: Dict[str, float] = {}
+    uptime: Dict[str, float] = {
+        skill.buff.name: 0.0 for skill in skills if skill.buff}
+    window = max((skill.cooldown for skill in skills if skill.burst),
+                 default=0.0)
+    burst = [idx for idx, skill in enumerate(skills)
+             if skill.burst and skill.cooldown >= window]
+    # Burst skills not cast yet in the current burst window.
+    pending_burst = set()
+    casts: List[Tuple[float, str]] = []
+    weights: Dict[FrozenSet[str], float] = {}
+
+    def _schedule(time: float, kind: int, idx: int) -> None:
+        heapq.heappush(events, (time, kind, next(sequence), idx))
+
+    def _choose(time: float) -> Optional[int]:
+        if not pending_burst and all(ready_at[idx] <= time for idx in burst):
+            pending_burst.update(burst)
+        for idx, skill in enumerate(skills):
+            if ready_at[idx] <= time and (
+                    idx not in burst or idx in pending_burst):
+                return idx
+        return None
+
+    _schedule(0.0, _FREE, -1)
+    free = True
+    while events:
+        time, kind, _, idx = heapq.heappop(events)
+        if time >= fight_length:
+            break
+        if kind == _EXPIRE:
+            name = skills[idx].buff.name
+            if buff_ends.get(name) == time:
+                del buff_ends[name]
+            continue
+        if kind == _FREE:
+            free = True
+        if not free:
+            continue
+
+        choice = _choose(time)
+        if choice is None:
+            # Waits for the next cooldown, which comes with a READY event.
+            continue
+        skill = skills[choice]
+        free = False
+        pending_burst.discard(choice)
+        if skill.buff:
+            buff = skill.buff
+            duration = buff.duration * (
+                1 + buff_duration / 100
+                if buff.extended_by_buff_duration else 1)
+            start = max(time, buff_ends.get(buff.name, time))
+            uptime[buff.name] += max(
+                min(time + duration, fight_length) -
+                min(start, fight_length), 0.0)
+            buff_ends[buff.name] = max(
+                buff_ends.get(buff.name, 0.0), time + duration)
+            _schedule(buff_ends[buff.name], _EXPIRE, choice)
+        active = frozenset(buff_ends)
+        if skill.damage:
+            weights[active] = weights.get(active, 0.0) + skill.damage
+        casts.append((time, skill.name))
+        if skill.cooldown:
+            ready_at[choice] = time + skill.cooldown
+            _schedule(ready_at[choice], _READY, choice)
+        _schedule(time + skill.cast_time, _FREE, -1)
+
+    buff_sets = list(weights)
+    return Timeline(
+        casts, buff_sets, np.array([weights[buffs] for buffs in buff_sets]),
+        {name: total / fight_length for name, total in uptime.items()},
+        fight_length)
+
+
+def _buff_rows(skills: Sequence[Skill], buff_sets: List[FrozenSet[str]]
+               ) -> np.ndarray:
+    """(buff sets x NUM_STATS) stats granted by every set of buffs."""
+    vectors = {skill.buff.name: StatVector.from_stats(skill.buff.stats).values
+               for skill in skills if skill.buff}
+    rows = np.zeros((len(buff_sets), NUM_STATS))
+    for idx, buffs in enumerate(buff_sets):
+        if buffs:
+            rows[idx] = combine_rows(np.stack([vectors[name]
+                                               for name in buffs]))
+    return rows
+
+
+def batch_dpm(
+        stats: np.ndarray,
+        char_class: Union[Class, str],
+        level: Union[int, np.ndarray],
+        world: Optional[World] = None,
+        skills: Optional[Sequence[Skill]] = None,
+        fight_length: float = DEFAULT_FIGHT_LENGTH,
+        boss_pdr: float = DEFAULT_BOSS_PDR,
+        by: str = 'ied_damage',
+) -> DPMEvaluation:
+    """Damage per minute of many gear variants of one class.
+
+    Args:
+        stats: (N x NUM_STATS) stats from gear and link skills, laid out like
+            `StatVector`. Variants with the same buff duration share one
+            simulated timeline.
+        char_class: Class of every variant.
+        level: Level of every variant, or one level per variant.
+        world: World of every variant.
+        skills: Rotation. Defaults to the rotation of `char_class`.
+        fight_length: Seconds.
+        boss_pdr: Boss defense used for `ied_damage`.
+        by: Field of `BuildEvaluation` dealt per 100% of skill damage.
+    """
+    char_class = Class.maybe_parse(char_class)
+    skills = skills if skills is not None else rotation_of(char_class)
+    assert skills, f'No rotation known for {char_class.name}'
+    stats = np.atleast_2d(stats)
+    levels = np.broadcast_to(level, len(stats))
+    burst_buffs = frozenset(skill.buff.name for skill in skills
+                            if skill.burst and skill.buff)
+
+    dpm = np.zeros(len(stats))
+    burst_damage = np.zeros(len(stats))
+    durations = stats[:, STAT_INDEX[Stat.BUFF_DURATION]]
+    for duration in np.unique(durations):
+        members = np.flatnonzero(durations == duration)
+        timeline = simulate_timeline(skills, fight_length, float(duration))
+        if not timeline.buff_sets:
+            continue
+        buff_rows = _buff_rows(skills, timeline.buff_sets)
+        # (members x buff sets x NUM_STATS), combined with the buffs' stats.
+        rows = combine_rows(np.stack(np.broadcast_arrays(
+            stats[members, None, :], buff_rows[None, :, :])))
+        damage = getattr(evaluate_builds(
+            rows.reshape(-1, NUM_STATS), char_class,
+            np.repeat(levels[members], len(buff_rows)), world=world,
+            boss_pdr=boss_pdr), by).reshape(len(members), len(buff_rows))
+        damage = damage * timeline.weights / 100
+        dpm[members] = damage.sum(axis=1) * 60 / fight_length
+        in_burst = np.array([burst_buffs <= buffs
+                             for buffs in timeline.buff_sets])
+        if burst_buffs:
+            burst_damage[members] = damage[:, in_burst].sum(axis=1)
+    return DPMEvaluation(dpm, burst_damage)
+
+
+def character_dpm(character: Character,
+                  skills: Optional[Sequence[Skill]] = None,
+                  fight_length: float = DEFAULT_FIGHT_LENGTH,
+                  boss_pdr: float = DEFAULT_BOSS_PDR,
+                  by: str = 'ied_damage') -> Tuple[float, float]:
+    """Damage per minute and burst damage of `character`."""
+    evaluation = batch_dpm(
+        character.stat_vector.values, character.char_class, character.level,
+        world=character.world, skills=skills, fight_length=fight_length,
+        boss_pdr=boss_pdr, by=by)
+    return float(evaluation.dpm[0]), float(evaluation.burst_damage[0])
@@ -1,5 +1,5 @@
 from enum import Enum, auto
-from typing import Any, Dict, Set
+from typing import Any, Dict, Set, Tuple
 
 
 class MapleStatsEnum(Enum):
@@ -68,6 +68,11 @@ class Stat(MapleStatsEnum):
             return 0.0
         return 0
 
+    @property
+    def percent(self) -> 'Stat':
+        """The percent variant of a flat stat, e.g. PCT_STR for STR."""
+        return Stat[f'PCT_{self.name}']
+
 
 FLOAT_VALUED_STATS: Set[Stat] = {
     Stat.IED,
@@ -157,12 +162,55 @@ class Class(MapleStatsEnum):
             return Stat.STR
         return Stat.DEX
 
+    @property
+    def attack_stat(self) -> Stat:
+        if self.branch == JobBranch.MAGICIAN:
+            return Stat.MATT
+        return Stat.ATT
+
 
 CLASS_TO_BRANCH: Dict[Class, JobBranch] = {
     Class.BEGINNER: JobBranch.BEGINNER,
+    Class.ARAN: JobBranch.WARRIOR,
+    Class.EVAN: JobBranch.MAGICIAN,
+    Class.MERCEDES: JobBranch.BOWMAN,
+    Class.PHANTOM: JobBranch.THIEF,
+    Class.SHADE: JobBranch.PIRATE,
+    Class.LUMINOUS: JobBranch.MAGICIAN,
+    Class.IL_ARCHMAGE: JobBranch.MAGICIAN,
+    Class.FP_ARCHMAGE: JobBranch.MAGICIAN,
+    Class.BISHOP: JobBranch.MAGICIAN,
+    Class.BOWMASTER: JobBranch.BOWMAN,
+    Class.MARKSMAN: JobBranch.BOWMAN,
     Class.PATHFINDER: JobBranch.BOWMAN,
+    Class.NIGHT_LORD: JobBranch.THIEF,
+    Class.SHADOWER: JobBranch.THIEF,
+    Class.DUAL_BLADE: JobBranch.THIEF,
     Class.BUCCANEER: JobBranch.PIRATE,
+    Class.CORSAIR: JobBranch.PIRATE,
+    Class.CANNON_MASTER: JobBranch.PIRATE,
+    Class.JETT: JobBranch.PIRATE,
+    Class.BEAST_TAMER: JobBranch.MAGICIAN,
+    Class.DAWN_WARRIOR: JobBranch.WARRIOR,
+    Class.BLAZE_WIZARD: JobBranch.MAGICIAN,
+    Class.WIND_ARCHER: JobBranch.BOWMAN,
+    Class.NIGHT_WALKER: JobBranch.THIEF,
+    Class.THUNDER_BREAKER: JobBranch.PIRATE,
+    Class.WILD_HUNTER: JobBranch.BOWMAN,
+    Class.MECHANIC: JobBranch.PIRATE,
+    Class.BATTLE_MAGE: JobBranch.MAGICIAN,
+    Class.BLASTER: JobBranch.WARRIOR,
+    Class.DEMON_SLAYER: JobBranch.WARRIOR,
+    Class.DEMON_AVENGER: JobBranch.WARRIOR,
     Class.KAISER: JobBranch.WARRIOR,
+    Class.ANGELIC_BUSTER: JobBranch.PIRATE,
+    Class.ARK: JobBranch.PIRATE,
+    Class.ILIUM: JobBranch.MAGICIAN,
+    Class.ADELE: JobBranch.WARRIOR,
+    Class.CADENA: JobBranch.THIEF,
+    Class.KINESIS: JobBranch.MAGICIAN,
+    Class.KANNA: JobBranch.MAGICIAN,
+    Class.HAYATO: JobBranch.WARRIOR,
 }
 
 STR_PIRATES: Set[Class] = {
@@ -176,6 +224,7 @@ STR_PIRATES: Set[Class] = {
 DEX_PIRATES: Set[Class] = {
     Class.CORSAIR,
     Class.JETT,
+    Class.MECHANIC,
     Class.ANGELIC_BUSTER,
 }
 
@@ -233,6 +282,21 @@ WSE: Set[EquipType] = {
 }
 
 
+def _generate_slot_families() -> Dict[EquipType, Tuple[EquipType, ...]]:
+    """Groups numbered slots such as RING_1 to RING_4 into one family."""
+    families: Dict[str, Tuple[EquipType, ...]] = {}
+    for equip_type in EquipType:
+        family = equip_type.name.rstrip('0123456789').rstrip('_')
+        families[family] = families.get(family, ()) + (equip_type,)
+    return {equip_type: family_slots for family_slots in families.values()
+            for equip_type in family_slots}
+
+
+SLOT_FAMILIES: Dict[EquipType, Tuple[EquipType, ...]] = (
+    _generate_slot_families())
+"""Every slot an item of a given equip type can be equipped in."""
+
+
 class WeaponType(MapleStatsEnum):
 
     SWORD_2H = auto()
@@ -1,11 +1,82 @@
-from typing import Any, Dict, List, Tuple, Union
+import hashlib
+import json
+from functools import lru_cache
+from itertools import chain
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union)
 
-from maplestats.enums import Stat, EquipType
-from maplestats.utils import STATS_TYPING, combine_stats, jsonify
+from maplestats.enums import Stat, EquipType, FLOAT_VALUED_STATS
+from maplestats.instrumentation import instrumented
+from maplestats.utils import STATS_TYPING, jsonify
+
+if TYPE_CHECKING:
+    from maplestats.stat_vector import StatVector
+
+LINES_TYPING = Tuple[Tuple[Stat, Any], ...]
+
+_EMPTY_STATS: Mapping[Stat, Any] = MappingProxyType({})
+
+_SHARED_STATS_MAXSIZE = 4096
+_SHARED_LINES_MAXSIZE = 4096
+"""Distinct stats and lines kept for sharing. Rarer ones are evicted, so
+long-running processes do not keep every item they have seen."""
+
+
+def _normalize(stat: Stat, value: Any) -> Any:
+    """`value` as a float for float-valued stats, and as an int for other
+    stats when whole, so that equal values share one entry of one type.
+    """
+    value = float(value)
+    if stat in FLOAT_VALUED_STATS or not value.is_integer():
+        return value
+    return int(value)
+
+
+@lru_cache(maxsize=_SHARED_STATS_MAXSIZE)
+def _shared_stats(items: LINES_TYPING) -> Mapping[Stat, Any]:
+    """Read-only stats shared by equips with the same stats, e.g. the base
+    stats of every copy of an item."""
+    return MappingProxyType(dict(items))
+
+
+@lru_cache(maxsize=_SHARED_LINES_MAXSIZE)
+def _shared_line(stat: Stat, value: Any) -> Tuple[Stat, Any]:
+    """Potential or bonus stat line shared by equips."""
+    return stat, value
+
+
+def _intern_stats(stats: Optional[Mapping[Any, Any]]) -> Mapping[Stat, Any]:
+    if not stats:
+        return _EMPTY_STATS
+    if isinstance(stats, MappingProxyType):
+        return stats
+    items = []
+    for stat, value in stats.items():
+        stat = Stat.maybe_parse(stat)
+        items.append((stat, _normalize(stat, value)))
+    items.sort(key=lambda item: item[0].value)
+    return _shared_stats(tuple(items))
+
+
+def _intern_lines(lines: Optional[Sequence[Tuple[Any, Any]]]
+                  ) -> LINES_TYPING:
+    if not lines:
+        return ()
+    interned = []
+    for stat, value in lines:
+        stat = Stat.maybe_parse(stat)
+        interned.append(_shared_line(stat, _normalize(stat, value)))
+    return tuple(interned)
 
 
 class Equip:
 
+    __slots__ = ('name', '_equip_type', '_base_stats', '_scroll_stats',
+                 '_potential', '_bonus_potential', '_bonus_stats', '_stats',
+                 '_fingerprint')
+
+    @instrumented()
     def __init__(
             self,
             name: str,
@@ -16,14 +87,20 @@ class Equip:
             bonus_potential: List[Tuple[Stat, Any]] = None,
             bonus_stats: List[Tuple[Stat, Any]] = None,
     ):
-        """Note: Stats from star force counts as scroll stats."""
+        """Note: Stats from star force counts as scroll stats.
+
+        Stats and lines are stored read-only and shared between equips with
+        identical values, e.g. the base stats of every copy of an item. Whole
+        values of integer stats are stored as ints, and values of
+        float-valued stats as floats.
+        """
         self.name = name
-        self._equip_type = equip_type
-        self._base_stats = base_stats if base_stats else {}
-        self._scroll_stats = scroll_stats if scroll_stats else {}
-        self._potential = potential if potential else []
-        self._bonus_potential = bonus_potential if bonus_potential else []
-        self._bonus_stats = bonus_stats if bonus_stats else []
+        self._equip_type = EquipType.maybe_parse(equip_type)
+        self._base_stats = _intern_stats(base_stats)
+        self._scroll_stats = _intern_stats(scroll_stats)
+        self._potential = _intern_lines(potential)
+        self._bonus_potential = _intern_lines(bonus_potential)
+        self._bonus_stats = _intern_lines(bonus_stats)
 
         assert len(self._potential) <= 3, (
             'Equip can only have up to 3 lines of potential')
@@ -32,26 +109,74 @@ class Equip:
         assert len(self._bonus_stats) <= 4, (
             'Equip can only have up to 4 lines of bonus stats')
 
-        self._stats = self._get_stats()
+        self._stats: Optional['StatVector'] = None
+        self._fingerprint: Optional[str] = None
 
     @property
     def equip_type(self) -> EquipType:
         return self._equip_type
 
-    def _get_stats(self) -> STATS_TYPING:
-        all_lines = self._potential + self._bonus_potential + self._bonus_stats
-        return combine_stats([self._base_stats, self._scroll_stats] + [
-            {stat: value} for stat, value in all_lines])
+    @property
+    def base_stats(self) -> Mapping[Stat, Any]:
+        return self._base_stats
+
+    @property
+    def scroll_stats(self) -> Mapping[Stat, Any]:
+        return self._scroll_stats
+
+    @property
+    def potential(self) -> LINES_TYPING:
+        return self._potential
+
+    @property
+    def bonus_potential(self) -> LINES_TYPING:
+        return self._bonus_potential
+
+    @property
+    def bonus_stats(self) -> LINES_TYPING:
+        return self._bonus_stats
+
+    def _get_stats(self) -> 'StatVector':
+        # Imported on first use, so that loading equips does not need NumPy.
+        from maplestats.stat_vector import StatVector
+
+        stats = StatVector.from_items(chain(
+            self._base_stats.items(), self._scroll_stats.items(),
+            self._potential, self._bonus_potential, self._bonus_stats))
+        stats.values.flags.writeable = False
+        return stats
 
     @property
     def stats(self) -> STATS_TYPING:
+        return self.stat_vector.to_stats()
+
+    @property
+    def stat_vector(self) -> 'StatVector':
+        """Total stats of this equip, computed on first use. Read-only."""
+        if self._stats is None:
+            self._stats = self._get_stats()
         return self._stats
 
+    @property
+    def fingerprint(self) -> str:
+        """Hash of this equip's type and stats, stable across processes.
+        Equips with the same stats have the same fingerprint whatever their
+        name, which can change after the fingerprint is cached.
+        """
+        if self._fingerprint is None:
+            content = self.to_json()
+            del content['name']
+            self._fingerprint = hashlib.blake2b(
+                json.dumps(content, sort_keys=True).encode(),
+                digest_size=16).hexdigest()
+        return self._fingerprint
+
     def to_json(self) -> Dict[str, Any]:
         return jsonify({
             'name': self.name,
             'equip_type': self._equip_type,
             'base_stats': self._base_stats,
+            'scroll_stats': self._scroll_stats,
             'potential': self._potential,
             'bonus_potential': self._bonus_potential,
             'bonus_stats': self._bonus_stats,
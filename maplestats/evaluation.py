@@ -0,0 +1,163 @@
+from typing import Dict, NamedTuple, Optional, Union
+
+import numpy as np
+
+from maplestats import formulas
+from maplestats.classes import weapon_type_of
+from maplestats.enums import Class, Stat, WeaponType, World
+from maplestats.stat_vector import (
+    MULTIPLICATIVE_MASK, NUM_STATS, STAT_INDEX, combine_rows)
+
+REBOOT_DAMAGE = 50
+
+STAT_UNITS: np.ndarray = np.where(MULTIPLICATIVE_MASK, 0.01, 1.0)
+"""One unit of every stat, e.g. 1 point of DMG or 1% IED."""
+
+
+class BuildEvaluation(NamedTuple):
+    """Damage of N builds, one value per build."""
+    stat_range: np.ndarray
+    boss_damage: np.ndarray
+    ied_damage: np.ndarray
+
+
+def weapon_multiplier(char_class: Class,
+                      weapon_type: Optional[WeaponType] = None) -> float:
+    weapon_type = weapon_type if weapon_type else weapon_type_of(char_class)
+    return formulas.WEAPON_MULTIPLIERS.get(
+        weapon_type, formulas.DEFAULT_WEAPON_MULTIPLIER)
+
+
+def evaluate_builds(
+        stats: np.ndarray,
+        char_class: Union[Class, str],
+        level: Union[int, np.ndarray],
+        world: Optional[World] = None,
+        weapon_type: Optional[WeaponType] = None,
+        boss_pdr: float = formulas.DEFAULT_BOSS_PDR,
+) -> BuildEvaluation:
+    """Evaluate many builds of one class in a single vectorized pass.
+
+    Args:
+        stats: (N x NUM_STATS) matrix laid out like `StatVector`, holding the
+            stats from gear and link skills. Pure stats from leveling are added
+            from `level`. A single row of NUM_STATS values is also accepted.
+        char_class: Class of every build.
+        level: Level of every build, or one level per build.
+        world: World of every build. Reboot worlds get bonus damage.
+        weapon_type: Overrides the weapon of `char_class`.
+        boss_pdr: Boss defense used for `ied_damage`.
+    """
+    char_class = Class.maybe_parse(char_class)
+    stats = np.atleast_2d(stats)
+    assert stats.shape[1] == NUM_STATS, (
+        f'Builds must have exactly {NUM_STATS} stats')
+
+    def _col(stat: Stat) -> np.ndarray:
+        return stats[:, STAT_INDEX[stat]]
+
+    main, secondary = char_class.main_stat, char_class.secondary_stat
+    attack = char_class.attack_stat
+    flat_all, pct_all = _col(Stat.ALL), _col(Stat.PCT_ALL)
+
+    main_total = formulas.total_stat(
+        formulas.pure_main_stat(level), _col(main) + flat_all,
+        _col(main.percent) + pct_all)
+    secondary_total = formulas.total_stat(
+        4, _col(secondary) + flat_all, _col(secondary.percent) + pct_all)
+    attack_total = _col(attack) * (1 + _col(attack.percent) / 100)
+
+    damage = _col(Stat.DMG)
+    if world and world.is_reboot:
+        damage = damage + REBOOT_DAMAGE
+
+    multiplier = weapon_multiplier(char_class, weapon_type)
+    stat = formulas.stat_value(main_total, secondary_total)
+    stat_range = formulas.upper_stat_range(
+        multiplier, stat, attack_total, damage)
+    boss_damage = formulas.upper_stat_range(
+        multiplier, stat, attack_total, damage + _col(Stat.BOSS)
+    ) * formulas.crit_multiplier(_col(Stat.CRIT), _col(Stat.CRIT_DMG))
+    ied_damage = boss_damage * formulas.ied_multiplier(
+        _col(Stat.IED), boss_pdr)
+
+    return BuildEvaluation(stat_range, boss_damage, ied_damage)
+
+
+def stat_equivalences(
+        stats: np.ndarray,
+        char_class: Union[Class, str],
+        level: int,
+        world: Optional[World] = None,
+        weapon_type: Optional[WeaponType] = None,
+        boss_pdr: float = formulas.DEFAULT_BOSS_PDR,
+        reference: Optional[Stat] = None,
+) -> Dict[Stat, float]:
+    """Damage gained from one unit of every stat, measured in units of
+    `reference`. For example with the default reference of % main stat,
+    `{Stat.BOSS: 1.2}` means 1% boss is worth 1.2% main stat.
+
+    All stats are evaluated together in one batch of finite differences.
+
+    Args:
+        stats: NUM_STATS values laid out like `StatVector`.
+        char_class: Class of the build.
+        level: Level of the build.
+        world: World of the build.
+        weapon_type: Overrides the weapon of `char_class`.
+        boss_pdr: Boss defense used for IED-adjusted damage.
+        reference: Stat to measure in. Defaults to % main stat.
+
+    Raises:
+        ValueError: If the build gains no damage from `reference`, e.g.
+            from IED while `boss_pdr` is at or above what IED can reduce.
+    """
+    char_class = Class.maybe_parse(char_class)
+    reference = reference if reference else char_class.main_stat.percent
+    equivalences = batch_stat_equivalences(
+        stats, char_class, level, world=world, weapon_type=weapon_type,
+        boss_pdr=boss_pdr, reference=reference)[0]
+    # A useful reference is worth exactly one of itself.
+    if equivalences[STAT_INDEX[reference]] == 0:
+        raise ValueError(
+            f'{reference} adds no damage to this build against '
+            f'{boss_pdr:.0%} boss defense, so it cannot be a reference')
+    return {stat: float(equivalences[idx]) for stat, idx in STAT_INDEX.items()}
+
+
+def batch_stat_equivalences(
+        stats: np.ndarray,
+        char_class: Union[Class, str],
+        level: Union[int, np.ndarray],
+        world: Optional[World] = None,
+        weapon_type: Optional[WeaponType] = None,
+        boss_pdr: float = formulas.DEFAULT_BOSS_PDR,
+        reference: Optional[Stat] = None,
+) -> np.ndarray:
+    """`stat_equivalences` of N builds of one class in one batch, as an
+    (N x NUM_STATS) matrix laid out like `StatVector`. Builds which gain
+    nothing from `reference` get zeros.
+    """
+    char_class = Class.maybe_parse(char_class)
+    reference = reference if reference else char_class.main_stat.percent
+    stats = np.atleast_2d(stats)
+    num_builds = len(stats)
+
+    # Every build followed by one step of every stat.
+    builds = np.broadcast_to(stats[:, None], (num_builds, NUM_STATS + 1,
+                                              NUM_STATS))
+    steps = np.zeros((NUM_STATS + 1, NUM_STATS))
+    steps[1:] = np.diag(STAT_UNITS)
+    steps = np.broadcast_to(steps, builds.shape)
+    rows = combine_rows(np.stack([builds, steps])).reshape(-1, NUM_STATS)
+    levels = np.repeat(np.broadcast_to(level, num_builds), NUM_STATS + 1)
+    damage = evaluate_builds(
+        rows, char_class, levels, world=world, weapon_type=weapon_type,
+        boss_pdr=boss_pdr).ied_damage.reshape(num_builds, NUM_STATS + 1)
+
+    gains = damage[:, 1:] - damage[:, :1]
+    reference_gain = gains[:, STAT_INDEX[reference]]
+    useful = reference_gain > 0
+    equivalences = np.zeros_like(gains)
+    equivalences[useful] = gains[useful] / reference_gain[useful, None]
+    return equivalences
@@ -0,0 +1,284 @@
+"""Flame (bonus stats) scoring and reroll expectations for armor.
+
+A flame rerolls 4 distinct lines out of the 19 armor flame types, each at a
+random tier. All C(19, 4) x 4^4 outcomes of a flame are enumerated once per
+level bracket and flame type, reduced to the distinct stat totals with their
+probabilities, and kept in memory. Tables are also cached on disk in
+`cache_dir`, or in the directory of the `MAPLESTATS_CACHE_DIR` environment
+variable, if either is set. Scores are in main stat equivalents, so the
+chance to beat a score is a binary search over the sorted scores of a class.
+
+Rates follow GMS flames of boss equips, which always roll 4 lines. Weapon
+flames scale with the weapon's base attack and are not modelled.
+"""
+import os
+from enum import auto
+from functools import lru_cache
+from itertools import combinations, product
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from maplestats.enums import Class, MapleStatsEnum, Stat, WSE
+from maplestats.equipment import Equip
+
+CACHE_DIR: Optional[str] = os.environ.get('MAPLESTATS_CACHE_DIR') or None
+"""Default directory of flame tables on disk. Tables are only kept in memory
+if None."""
+_CACHE_VERSION = 1
+
+
+class FlameType(MapleStatsEnum):
+    POWERFUL = auto()
+    ETERNAL = auto()
+
+
+FLAME_TIER_RATES: Dict[FlameType, Dict[int, float]] = {
+    FlameType.POWERFUL: {3: 0.2, 4: 0.3, 5: 0.36, 6: 0.14},
+    FlameType.ETERNAL: {4: 0.29, 5: 0.45, 6: 0.25, 7: 0.01},
+}
+"""Chance of every tier of a line."""
+
+FLAME_COSTS: Dict[FlameType, int] = {
+    FlameType.POWERFUL: 10_000_000,
+    FlameType.ETERNAL: 30_000_000,
+}
+"""Approximate meso cost of one flame."""
+
+FLAME_LINES = 4
+
+SECONDARY_STAT_WEIGHT = 0.1
+ATTACK_WEIGHT = 4.0
+PCT_ALL_WEIGHT = 10.0
+
+_SCORE_DECIMALS = 6
+"""Scores are rounded so that equal scores compare equal."""
+
+_FEATURES: Tuple[Stat, ...] = (
+    Stat.STR, Stat.DEX, Stat.INT, Stat.LUK, Stat.ATT, Stat.MATT, Stat.PCT_ALL)
+"""Stats of flame outcomes which can be scored."""
+
+_SINGLE_STATS = (Stat.STR, Stat.DEX, Stat.INT, Stat.LUK)
+_UNSCORED_FLAME_TYPES = 6
+"""Max HP, max MP, level reduction, defense, speed and jump."""
+
+
+def _flame_line_table(level: int) -> np.ndarray:
+    """(flame types x tiers x features) stats of every line, for tiers 1 to
+    7. Tiers which a flame cannot roll get probability 0 later.
+    """
+    single = level // 20 + 1
+    combined = level // 40 + 1
+    lines: List[Dict[Stat, int]] = [{stat: single} for stat in _SINGLE_STATS]
+    lines += [{first: combined, second: combined}
+              for first, second in combinations(_SINGLE_STATS, 2)]
+    lines += [{Stat.ATT: 1}, {Stat.MATT: 1}, {Stat.PCT_ALL: 1}]
+    lines += [{}] * _UNSCORED_FLAME_TYPES
+
+    per_tier = np.array([[line.get(stat, 0) for stat in _FEATURES]
+                         for line in lines], dtype=np.int32)
+    tiers = np.arange(1, 8, dtype=np.int32)
+    return per_tier[:, None, :] * tiers[None, :, None]
+
+
+class FlameTable(NamedTuple):
+    """Distinct stat totals of a flame and their probabilities."""
+    features: np.ndarray
+    """(n x features) totals laid out like `_FEATURES`."""
+    probabilities: np.ndarray
+
+
+def _level_bracket(level: int) -> int:
+    """Flame stats only change every 20 levels."""
+    return level // 20 * 20
+
+
+def _enumerate_flames(level: int, flame_type: FlameType) -> FlameTable:
+    lines = _flame_line_table(level)
+    tier_rates = FLAME_TIER_RATES[flame_type]
+    tiers = np.array(sorted(tier_rates))
+    rates = np.array([tier_rates[tier] for tier in tiers])
+
+    type_sets = np.array(list(combinations(range(len(lines)), FLAME_LINES)))
+    tier_sets = np.array(list(product(range(len(tiers)), repeat=FLAME_LINES)))
+    # (type sets x tier sets x features)
+    features = lines[type_sets[:, None, :],
+                     tiers[tier_sets][None, :, :] - 1].sum(axis=2)
+    probabilities = np.broadcast_to(
+        rates[tier_sets].prod(axis=1) / len(type_sets),
+        features.shape[:2])
+
+    distinct, inverse = np.unique(features.reshape(-1, len(_FEATURES)),
+                                  axis=0, return_inverse=True)
+    return FlameTable(distinct, np.bincount(
+        inverse.ravel(), weights=probabilities.ravel()))
+
+
+def flame_table(level: int, flame_type: Union[FlameType, str],
+                cache_dir: Optional[str] = None) -> FlameTable:
+    """Exact distribution of the outcomes of one flame, enumerated once per
+    level bracket and then kept in memory.
+
+    Args:
+        level: Level of the equip.
+        flame_type: Flame used.
+        cache_dir: Directory where tables are also saved and read from, so
+            that other processes do not enumerate them again. Defaults to
+            `CACHE_DIR`.
+    """
+    cache_dir = cache_dir if cache_dir is not None else CACHE_DIR
+    return _flame_table(_level_bracket(level),
+                        FlameType.maybe_parse(flame_type), cache_dir)
+
+
+@lru_cache(maxsize=None)
+def _flame_table(bracket: int, flame_type: FlameType,
+                 cache_dir: Optional[str]) -> FlameTable:
+    path = os.path.join(
+        cache_dir,
+        f'flames_v{_CACHE_VERSION}_{flame_type.name.lower()}_{bracket}.npz'
+    ) if cache_dir else None
+
+    if path and os.path.isfile(path):
+        with np.load(path) as data:
+            table = FlameTable(data['features'], data['probabilities'])
+    else:
+        table = _enumerate_flames(bracket, flame_type)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Written under a temporary name so readers never see partial
+            # files.
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                np.savez(f, features=table.features,
+                         probabilities=table.probabilities)
+            os.replace(temp_path, path)
+
+    for array in table:
+        array.flags.writeable = False
+    return table
+
+
+def _feature_weights(char_class: Class,
+                     weights: Optional[Dict[Stat, float]]) -> np.ndarray:
+    if weights is None:
+        weights = {
+            char_class.main_stat: 1.0,
+            char_class.secondary_stat: SECONDARY_STAT_WEIGHT,
+            char_class.attack_stat: ATTACK_WEIGHT,
+            Stat.PCT_ALL: PCT_ALL_WEIGHT,
+        }
+    return np.array([weights.get(stat, 0.0) for stat in _FEATURES])
+
+
+def flame_score(
+        bonus_stats: List[Tuple[Union[Stat, str], float]],
+        char_class: Union[Class, str],
+        weights: Optional[Dict[Stat, float]] = None) -> float:
+    """Score of bonus stat lines in main stat equivalents.
+
+    Args:
+        bonus_stats: Lines as in `Equip.bonus_stats`. Flat all stat lines
+            count towards every stat.
+        char_class: Class whose main stat, secondary stat and attack count.
+        weights: Main stat equivalent of one point of every stat. Defaults to
+            1 for main stat, `SECONDARY_STAT_WEIGHT` for secondary stat,
+            `ATTACK_WEIGHT` for attack and `PCT_ALL_WEIGHT` for % all stat.
+    """
+    char_class = Class.maybe_parse(char_class)
+    feature_weights = dict(zip(
+        _FEATURES, _feature_weights(char_class, weights)))
+    score = 0.0
+    for stat, value in bonus_stats:
+        stat = Stat.maybe_parse(stat)
+        if stat == Stat.ALL:
+            score += value * sum(feature_weights[single]
+                                 for single in _SINGLE_STATS)
+        else:
+            score += value * feature_weights.get(stat, 0.0)
+    return score
+
+
+@lru_cache(maxsize=None)
+def _score_survival(level: int, flame_type: FlameType, char_class: Class,
+                    weights: Optional[Tuple[Tuple[Stat, float], ...]],
+                    cache_dir: Optional[str]
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct scores, and the chance to score at least each of them
+    followed by 0.
+    """
+    table = flame_table(level, flame_type, cache_dir)
+    scores = np.round(table.features @ _feature_weights(
+        char_class, dict(weights) if weights else None), _SCORE_DECIMALS)
+    distinct, inverse = np.unique(scores, return_inverse=True)
+    mass = np.bincount(inverse, weights=table.probabilities)
+    # Summed from the top so that the chance above the best score is exactly 0.
+    survival = np.concatenate([mass[::-1].cumsum()[::-1], [0.0]])
+    for array in (distinct, survival):
+        array.flags.writeable = False
+    return distinct, survival
+
+
+def _survival(level: int, char_class: Union[Class, str],
+              flame_type: Union[FlameType, str],
+              weights: Optional[Dict[Stat, float]],
+              cache_dir: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+    return _score_survival(
+        _level_bracket(level), FlameType.maybe_parse(flame_type),
+        Class.maybe_parse(char_class),
+        tuple(sorted(weights.items(), key=lambda item: item[0].value))
+        if weights else None,
+        cache_dir)
+
+
+def beat_probability(
+        score: Union[float, np.ndarray],
+        level: int,
+        char_class: Union[Class, str],
+        flame_type: Union[FlameType, str] = FlameType.POWERFUL,
+        weights: Optional[Dict[Stat, float]] = None,
+        cache_dir: Optional[str] = None) -> np.ndarray:
+    """Chance of one flame to score strictly more than `score`, for one score
+    or an array of scores.
+    """
+    distinct, survival = _survival(
+        level, char_class, flame_type, weights, cache_dir)
+    return survival[np.searchsorted(
+        distinct, np.round(score, _SCORE_DECIMALS), side='right')]
+
+
+def expected_rerolls(
+        equip: Equip,
+        level: int,
+        char_class: Union[Class, str],
+        flame_type: Union[FlameType, str] = FlameType.POWERFUL,
+        weights: Optional[Dict[Stat, float]] = None,
+        cache_dir: Optional[str] = None) -> float:
+    """Expected flames until `equip` rolls a better score than its current
+    bonus stats. Infinite if no flame can beat them.
+    """
+    assert equip.equip_type not in WSE, 'Weapon flames are not modelled'
+    current = flame_score(equip.bonus_stats, char_class, weights)
+    probability = float(beat_probability(
+        current, level, char_class, flame_type, weights, cache_dir))
+    return 1 / probability if probability > 0 else np.inf
+
+
+def expected_improved_score(
+        score: float,
+        level: int,
+        char_class: Union[Class, str],
+        flame_type: Union[FlameType, str] = FlameType.POWERFUL,
+        weights: Optional[Dict[Stat, float]] = None,
+        cache_dir: Optional[str] = None) -> float:
+    """Expected score kept after flaming until a flame scores strictly more
+    than `score`. `score` itself if no flame can.
+    """
+    distinct, survival = _survival(
+        level, char_class, flame_type, weights, cache_dir)
+    idx = np.searchsorted(distinct, np.round(score, _SCORE_DECIMALS),
+                          side='right')
+    if survival[idx] <= 0:
+        return score
+    mass = survival[idx:-1] - survival[idx + 1:]
+    return float(distinct[idx:] @ mass / survival[idx])
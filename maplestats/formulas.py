@@ -1,8 +1,80 @@
-from typing import Dict
+"""Damage formulas.
+
+All functions accept either scalars or NumPy arrays so the same formula serves a
+single character and a batch of builds. Percent stats (DMG, BOSS, CRIT,
+CRIT_DMG, ...) are in percentage points, except IED which is a fraction in
+[0, 1] because it combines multiplicatively.
+"""
+from typing import Dict, List, Union
+
+import numpy as np
 
 from maplestats.enums import WeaponType
 
+JOB_ADVANCEMENT_LEVEL_REQUIREMENTS: List[int] = [10, 30, 60, 100, 200]
 
-WEAPON_MULTIPLIERS: Dict[WeaponType, float] ={
+WEAPON_MULTIPLIERS: Dict[WeaponType, float] = {
+    WeaponType.SWORD_2H: 1.34,
+    WeaponType.DAGGER: 1.3,
     WeaponType.KNUCKLE: 1.7,
+    WeaponType.ANCIENT_BOW: 1.3,
+    WeaponType.TUNER: 1.3,
 }
+
+DEFAULT_WEAPON_MULTIPLIER = 1.0
+"""Used when the weapon of a class is unknown."""
+
+DEFAULT_BOSS_PDR = 0.8
+"""Boss defense (PDR) used for IED-adjusted damage, 80% by default. It is below
+100% so that IED-adjusted damage is positive at any IED. Pass the defense of a
+specific boss, e.g. 3.0 for 300%, to rank gear against it."""
+
+ARRAY_LIKE = Union[float, np.ndarray]
+"""A scalar, or an array of values of a batch of builds."""
+
+BASE_CRIT_RATE = 5
+BASE_CRIT_DMG = 35
+"""Crits deal 120% to 150% damage before crit damage stats."""
+
+
+def job(level: ARRAY_LIKE) -> ARRAY_LIKE:
+    """Job of a character at `level` (1 for beginners, up to 5)."""
+    return np.minimum(np.searchsorted(
+        JOB_ADVANCEMENT_LEVEL_REQUIREMENTS, level, side='right') + 1,
+        len(JOB_ADVANCEMENT_LEVEL_REQUIREMENTS))
+
+
+def pure_main_stat(level: ARRAY_LIKE) -> ARRAY_LIKE:
+    """Pure main stat from leveling up."""
+    current_job = job(level)
+    bonus = np.where(current_job >= 4, 10, np.where(current_job == 3, 5, 0))
+    return 5 * np.asarray(level) + 4 + bonus
+
+
+def total_stat(pure: ARRAY_LIKE, flat: ARRAY_LIKE, pct: ARRAY_LIKE
+               ) -> ARRAY_LIKE:
+    """Main or secondary stat after percent stats are applied."""
+    return (pure + flat) * (1 + pct / 100)
+
+
+def stat_value(main: ARRAY_LIKE, secondary: ARRAY_LIKE) -> ARRAY_LIKE:
+    return 4 * main + secondary
+
+
+def upper_stat_range(weapon_multiplier: ARRAY_LIKE, stat: ARRAY_LIKE,
+                     attack: ARRAY_LIKE, damage: ARRAY_LIKE) -> ARRAY_LIKE:
+    """Upper stat range as shown in the stat window."""
+    return weapon_multiplier * stat * attack / 100 * (1 + damage / 100)
+
+
+def crit_multiplier(crit_rate: ARRAY_LIKE, crit_damage: ARRAY_LIKE
+                    ) -> ARRAY_LIKE:
+    """Expected damage multiplier from critical hits."""
+    rate = np.clip((BASE_CRIT_RATE + crit_rate) / 100, 0, 1)
+    return 1 + rate * (BASE_CRIT_DMG + crit_damage) / 100
+
+
+def ied_multiplier(ied: ARRAY_LIKE, boss_pdr: ARRAY_LIKE = DEFAULT_BOSS_PDR
+                   ) -> ARRAY_LIKE:
+    """Fraction of damage dealt through a boss's defense."""
+    return np.maximum(0, 1 - boss_pdr * (1 - ied))
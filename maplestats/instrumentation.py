@@ -0,0 +1,238 @@
+"""Opt-in counters, timers and memory accounting.
+
+Instrumented functions only check one flag while instrumentation is disabled.
+Enable it around the code of interest:
+
+    with instrumentation(memory=True) as report:
+        me = Character.from_file('Somi.json')
+        me.stats
+    report.dump()
+
+With `memory=True`, tracemalloc also records the memory kept by every
+instrumented call (e.g. building an `Equip` or a `Character` and its equips),
+the peak traced memory and the lines of MapleStats allocating the most.
+"""
+import functools
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import (
+    Any, Callable, ContextManager, Dict, Iterator, List, Optional, TextIO,
+    Tuple)
+
+_TOP_ALLOCATIONS = 10
+
+
+class _Stat:
+    """Totals of one instrumented name."""
+
+    __slots__ = ('calls', 'seconds', 'bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+
+
+class _State:
+    enabled = False
+    memory = False
+    started_tracing = False
+    stats: Dict[str, _Stat] = {}
+    counters: Dict[str, int] = {}
+
+
+def _stat(name: str) -> _Stat:
+    stat = _State.stats.get(name)
+    if stat is None:
+        stat = _State.stats[name] = _Stat()
+    return stat
+
+
+def is_enabled() -> bool:
+    """Whether instrumentation is collecting, e.g. to skip preparing
+    counter values while it is not.
+    """
+    return _State.enabled
+
+
+def enable(memory: bool = False) -> None:
+    """Start collecting, e.g. for a long-running process. Prefer the
+    `instrumentation` context manager.
+    """
+    _State.enabled = True
+    _State.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _State.started_tracing = True
+
+
+def disable() -> None:
+    _State.enabled = False
+    _State.memory = False
+    if _State.started_tracing:
+        tracemalloc.stop()
+        _State.started_tracing = False
+
+
+def reset() -> None:
+    _State.stats = {}
+    _State.counters = {}
+    if _State.memory:
+        tracemalloc.reset_peak()
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Increment a counter while instrumentation is enabled."""
+    if _State.enabled:
+        _State.counters[name] = _State.counters.get(name, 0) + amount
+
+
+_NOT_TIMED = nullcontext()
+"""Shared no-op context manager returned by `timed` while disabled."""
+
+
+def timed(name: str) -> ContextManager[None]:
+    """Time a block while instrumentation is enabled."""
+    if not _State.enabled:
+        return _NOT_TIMED
+    return _timed(name)
+
+
+@contextmanager
+def _timed(name: str) -> Iterator[None]:
+    memory = _State.memory
+    start_bytes = tracemalloc.get_traced_memory()[0] if memory else 0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stat = _stat(name)
+        stat.calls += 1
+        stat.seconds += time.perf_counter() - start
+        if memory:
+            stat.bytes += tracemalloc.get_traced_memory()[0] - start_bytes
+
+
+def instrumented(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator timing every call of a function while instrumentation is
+    enabled. `name` defaults to the function's qualified name.
+    """
+
+    def _decorator(func: Callable) -> Callable:
+        stat_name = name if name else func.__qualname__
+
+        @functools.wraps(func)
+        def _wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            with _timed(stat_name):
+                return func(*args, **kwargs)
+
+        return _wrapper
+
+    return _decorator
+
+
+class Report:
+    """Collected timers, counters and memory."""
+
+    def __init__(self):
+        self.timers: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+        self.peak_bytes: Optional[int] = None
+        self.top_allocations: List[Tuple[str, int]] = []
+
+    def _collect(self, memory: bool) -> None:
+        self.timers = {
+            name: {'calls': stat.calls, 'seconds': stat.seconds,
+                   'bytes': stat.bytes}
+            for name, stat in _State.stats.items()}
+        self.counters = dict(_State.counters)
+        if memory:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            statistics = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(True, '*maplestats*')]
+            ).statistics('lineno')
+            self.top_allocations = [
+                (str(stat.traceback[0]), stat.size)
+                for stat in statistics[:_TOP_ALLOCATIONS]]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'timers': self.timers,
+            'counters': self.counters,
+            'peak_bytes': self.peak_bytes,
+            'top_allocations': self.top_allocations,
+        }
+
+    def dump(self, file: Optional[TextIO] = None) -> None:
+        """Write a readable report, slowest timers first."""
+        file = file if file else sys.stdout
+        print(f'{"name":40} {"calls":>10} {"seconds":>10} {"KiB":>10}',
+              file=file)
+        for name, timer in sorted(self.timers.items(),
+                                  key=lambda item: -item[1]['seconds']):
+            print(f'{name:40} {timer["calls"]:>10} {timer["seconds"]:>10.4f} '
+                  f'{timer["bytes"] / 1024:>10.1f}', file=file)
+        for name, value in sorted(self.counters.items()):
+            print(f'{name:40} {value:>10}', file=file)
+        if self.peak_bytes is not None:
+            print(f'peak traced memory: {self.peak_bytes / 1024:.1f} KiB',
+                  file=file)
+            for location, size in self.top_allocations:
+                print(f'  {size / 1024:>10.1f} KiB  {location}', file=file)
+
+    def dump_json(self, file_path: str) -> None:
+        with open(file_path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+
+@contextmanager
+def instrumentation(memory: bool = False) -> Iterator[Report]:
+    """Collect timers and counters within a block. The yielded report is
+    filled in when the block exits.
+
+    Blocks may nest. An inner block reports only what ran within it, and
+    what it collected is also added to the report of the outer block.
+
+    Args:
+        memory: Also account memory with tracemalloc, which slows down all
+            allocations while active.
+    """
+    outer_enabled, outer_memory = _State.enabled, _State.memory
+    outer_stats, outer_counters = _State.stats, _State.counters
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif memory and not outer_memory:
+        tracemalloc.reset_peak()
+    _State.enabled = True
+    _State.memory = memory or outer_memory
+    _State.stats = {}
+    _State.counters = {}
+    report = Report()
+    try:
+        yield report
+    finally:
+        report._collect(memory)
+        if started_tracing:
+            tracemalloc.stop()
+        stats, counters = _State.stats, _State.counters
+        _State.enabled, _State.memory = outer_enabled, outer_memory
+        _State.stats, _State.counters = outer_stats, outer_counters
+        if outer_enabled:
+            _merge(stats, counters)
+
+
+def _merge(stats: Dict[str, _Stat], counters: Dict[str, int]) -> None:
+    """Add the totals of a nested block to the enclosing ones."""
+    for name, stat in stats.items():
+        total = _stat(name)
+        total.calls += stat.calls
+        total.seconds += stat.seconds
+        total.bytes += stat.bytes
+    for name, value in counters.items():
+        _State.counters[name] = _State.counters.get(name, 0) + value
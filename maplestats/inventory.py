@@ -0,0 +1,177 @@
+"""Inventories of equips with indexes for stat threshold queries.
+
+Items are bucketed by equip type. Sorted indexes of one stat (or of the flame
+score for one class) over one bucket, or over the whole inventory, are built
+the first time a query needs them and kept up to date as items are added or
+removed. A query binary searches the index of each of its thresholds, walks the
+most selective one and checks the other thresholds on the items it matches:
+
+    inventory = Inventory(storage_equips)
+    inventory.query(EquipType.GLOVE, {Stat.CRIT_DMG: 8},
+                    min_flame_score=100, char_class=Class.BUCCANEER)
+    inventory.top_k(Stat.BOSS, 5, EquipType.RING_1)
+"""
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.flames import flame_score
+from maplestats.stat_vector import STAT_INDEX
+
+FLAME_SCORE = 'flame_score'
+"""Index key of flame scores, see `flames.flame_score`."""
+
+_INDEX_KEY = Tuple[Optional[EquipType], Union[Stat, str], Optional[Class]]
+
+
+class _SortedIndex:
+    """Item keys sorted by one value, in two parallel lists so that binary
+    searches compare plain floats.
+    """
+
+    __slots__ = ('values', 'keys')
+
+    def __init__(self, pairs: Iterable[Tuple[float, int]]):
+        pairs = sorted(pairs)
+        self.values: List[float] = [value for value, _ in pairs]
+        self.keys: List[int] = [key for _, key in pairs]
+
+    def add(self, value: float, key: int) -> None:
+        idx = bisect_right(self.values, value)
+        self.values.insert(idx, value)
+        self.keys.insert(idx, key)
+
+    def remove(self, value: float, key: int) -> None:
+        start = bisect_left(self.values, value)
+        idx = self.keys.index(key, start, bisect_right(self.values, value))
+        del self.values[idx]
+        del self.keys[idx]
+
+    def at_least(self, minimum: float) -> int:
+        """Position of the first value which is at least `minimum`."""
+        return bisect_left(self.values, minimum)
+
+
+class Inventory:
+    """Equips, queryable by equip type and stat thresholds."""
+
+    def __init__(self, equips: Iterable[Equip] = ()):
+        self._equips: Dict[int, Equip] = {}
+        self._keys: Dict[Equip, int] = {}
+        self._buckets: Dict[EquipType, Dict[int, None]] = {}
+        self._indexes: Dict[_INDEX_KEY, _SortedIndex] = {}
+        self._next_key = 0
+        self.extend(equips)
+
+    def __len__(self) -> int:
+        return len(self._equips)
+
+    def __iter__(self) -> Iterator[Equip]:
+        return iter(self._equips.values())
+
+    def __contains__(self, equip: Equip) -> bool:
+        return equip in self._keys
+
+    def _value(self, key: int, index_key: _INDEX_KEY) -> float:
+        equip = self._equips[key]
+        _, stat, char_class = index_key
+        if stat == FLAME_SCORE:
+            return flame_score(equip.bonus_stats, char_class)
+        return float(equip.stat_vector.values[STAT_INDEX[stat]])
+
+    def _members(self, equip_type: Optional[EquipType]) -> Iterable[int]:
+        if equip_type is None:
+            return self._equips.keys()
+        return self._buckets.get(equip_type, {}).keys()
+
+    def _index(self, equip_type: Optional[EquipType], stat: Union[Stat, str],
+               char_class: Optional[Class] = None) -> _SortedIndex:
+        index_key = (equip_type, stat, char_class)
+        index = self._indexes.get(index_key)
+        if index is None:
+            index = self._indexes[index_key] = _SortedIndex(
+                (self._value(key, index_key), key)
+                for key in self._members(equip_type))
+        return index
+
+    def add(self, equip: Equip) -> None:
+        """Add an item. Adding an item twice has no effect."""
+        if equip in self._keys:
+            return
+        key = self._next_key
+        self._next_key += 1
+        self._equips[key] = equip
+        self._keys[equip] = key
+        self._buckets.setdefault(equip.equip_type, {})[key] = None
+        for index_key, index in self._indexes.items():
+            if index_key[0] in (None, equip.equip_type):
+                index.add(self._value(key, index_key), key)
+
+    def extend(self, equips: Iterable[Equip]) -> None:
+        for equip in equips:
+            self.add(equip)
+
+    def remove(self, equip: Equip) -> None:
+        key = self._keys.pop(equip)
+        for index_key, index in self._indexes.items():
+            if index_key[0] in (None, equip.equip_type):
+                index.remove(self._value(key, index_key), key)
+        del self._buckets[equip.equip_type][key]
+        del self._equips[key]
+
+    def query(self, equip_type: Optional[Union[EquipType, str]] = None,
+              minimums: Optional[Dict[Union[Stat, str], float]] = None,
+              min_flame_score: Optional[float] = None,
+              char_class: Optional[Union[Class, str]] = None) -> List[Equip]:
+        """Items meeting every threshold, in the order they were added.
+
+        Args:
+            equip_type: Only items of this type. All items by default.
+            minimums: Minimum total of every stat of an item, in the units of
+                `Equip.stats`.
+            min_flame_score: Minimum flame score for `char_class`.
+            char_class: Class whose flame score is used.
+        """
+        equip_type = EquipType.maybe_parse(equip_type) if equip_type else None
+        thresholds = [(Stat.maybe_parse(stat), None, minimum)
+                      for stat, minimum in (minimums or {}).items()]
+        if min_flame_score is not None:
+            assert char_class, 'Flame scores depend on the class'
+            thresholds.append(
+                (FLAME_SCORE, Class.maybe_parse(char_class), min_flame_score))
+        if not thresholds:
+            return list(map(self._equips.get, sorted(
+                self._members(equip_type))))
+
+        # Walk the index with the fewest matches, check the others by value.
+        matches = []
+        for stat, stat_class, minimum in thresholds:
+            index = self._index(equip_type, stat, stat_class)
+            matches.append((len(index.values) - index.at_least(minimum),
+                            index, (equip_type, stat, stat_class), minimum))
+        matches.sort(key=lambda match: match[0])
+        _, index, _, minimum = matches[0]
+        keys = sorted(index.keys[index.at_least(minimum):])
+        for _, _, index_key, minimum in matches[1:]:
+            keys = [key for key in keys
+                    if self._value(key, index_key) >= minimum]
+        return [self._equips[key] for key in keys]
+
+    def top_k(self, stat: Union[Stat, str], k: int,
+              equip_type: Optional[Union[EquipType, str]] = None,
+              char_class: Optional[Union[Class, str]] = None
+              ) -> List[Tuple[Equip, float]]:
+        """Best `k` items by one stat, or by flame score for `char_class`
+        with `stat=FLAME_SCORE`, with their values.
+        """
+        equip_type = EquipType.maybe_parse(equip_type) if equip_type else None
+        if stat == FLAME_SCORE:
+            assert char_class, 'Flame scores depend on the class'
+            index = self._index(equip_type, FLAME_SCORE,
+                                Class.maybe_parse(char_class))
+        else:
+            index = self._index(equip_type, Stat.maybe_parse(stat))
+        start = max(len(index.keys) - k, 0)
+        return [(self._equips[key], value) for key, value in zip(
+            reversed(index.keys[start:]), reversed(index.values[start:]))]
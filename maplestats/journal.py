@@ -0,0 +1,323 @@
+"""Append-only journal of the changes of a character.
+
+Instead of saving the whole character after every edit, a journal appends one
+small JSON line per mutation:
+
+    journal = Journal('Somi.journal')
+    journal.attach(me)
+    me.level = 251          # Appends {"time": ..., "change": "level", ...}
+    journal.state_at(datetime(2026, 1, 1)).stats
+    journal.progression().boss_damage
+
+Every `snapshot_every` changes the full character is appended as a checkpoint,
+so rebuilding any past state only replays the changes since the checkpoint
+before it. `compact` folds old changes into a single snapshot to reclaim disk
+space.
+
+Records are only ever appended. A partial last line left by a crash is
+skipped when reading, and the next record starts on a new line after it.
+"""
+import json
+import os
+import time
+from bisect import bisect_right
+from datetime import datetime
+from typing import (
+    Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union)
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.equipment import Equip
+from maplestats.evaluation import evaluate_builds
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.stat_vector import NUM_STATS
+from maplestats.utils import atomic_write, jsonify
+
+DEFAULT_SNAPSHOT_EVERY = 256
+
+SNAPSHOT = 'snapshot'
+CHECKPOINT = 'checkpoint'
+"""Automatic snapshot, only used as a starting point of replays."""
+_STARTS = (SNAPSHOT, CHECKPOINT)
+
+TIME_TYPING = Union[datetime, float]
+"""A datetime, or seconds since the epoch."""
+
+
+def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+    """The record of a journal line, or None for a partial or corrupt
+    line."""
+    if not line.endswith(b'\n'):
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def _timestamp(when: Optional[TIME_TYPING]) -> float:
+    if when is None:
+        return float('inf')
+    return when.timestamp() if isinstance(when, datetime) else float(when)
+
+
+class Progression(NamedTuple):
+    """States of a character after every journaled change, one row each."""
+    times: np.ndarray
+    """Seconds since the epoch."""
+    levels: np.ndarray
+    stats: np.ndarray
+    """(N x NUM_STATS) stats from equips and link skills."""
+    stat_range: np.ndarray
+    boss_damage: np.ndarray
+    ied_damage: np.ndarray
+
+
+def _apply(character: Character, change: str, value: Any) -> None:
+    """Replay one journaled change."""
+    if change == 'level':
+        character.level = value
+    elif change == 'char_class':
+        character.char_class = value
+    elif change == 'world':
+        character.world = value
+    elif change == 'link_skills':
+        character.link_skills = value
+    elif change == 'link_skill':
+        character.set_link_skill(*value)
+    elif change == 'equips':
+        character.equips = value
+    elif change == 'equip':
+        equip, slot = value
+        character.equip(Equip(**equip), slot)
+    else:
+        raise ValueError(f'Unknown journal change: {change}')
+
+
+class Journal:
+    """Journal of one character, stored as JSON lines in `file_path`."""
+
+    def __init__(self, file_path: str,
+                 snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+                 clock: Callable[[], float] = time.time):
+        """Open the journal in `file_path`. Existing records are kept and new
+        ones are appended after them.
+
+        Args:
+            file_path: Journal file, created when first written.
+            snapshot_every: Changes between two automatic snapshots.
+            clock: Time of new records, in seconds since the epoch.
+        """
+        self.file_path = file_path
+        self.snapshot_every = snapshot_every
+        self._clock = clock
+        # (time, offset) of every snapshot, in order.
+        self._snapshots: List[Tuple[float, int]] = []
+        self._last_time = float('-inf')
+        self._since_snapshot = 0
+        self._partial_tail = False
+        self._file = None
+        self._character: Optional[Character] = None
+        self._index()
+
+    def _index(self) -> None:
+        """Find the snapshots. The file is only read."""
+        self._snapshots = []
+        self._since_snapshot = 0
+        self._partial_tail = False
+        if not os.path.exists(self.file_path):
+            return
+        offset = 0
+        with open(self.file_path, 'rb') as f:
+            for line in f:
+                record = _parse(line)
+                if record is not None:
+                    self._last_time = max(self._last_time, record['time'])
+                    if record['change'] in _STARTS:
+                        self._snapshots.append((record['time'], offset))
+                        self._since_snapshot = 0
+                    else:
+                        self._since_snapshot += 1
+                offset += len(line)
+                self._partial_tail = not line.endswith(b'\n')
+
+    def _read(self, offset: int) -> Iterator[Dict[str, Any]]:
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                record = _parse(line)
+                if record is not None:
+                    yield record
+
+    def _append(self, change: str, value: Any,
+                when: Optional[float] = None) -> None:
+        # Times never go backwards, so that replays can stop at the first
+        # record after the requested time.
+        when = max(self._clock() if when is None else when, self._last_time)
+        self._last_time = when
+        if self._file is None:
+            self._file = open(self.file_path, 'ab')
+            if self._partial_tail:
+                # Ends the partial line, which stays unreadable.
+                self._file.write(b'\n')
+                self._partial_tail = False
+        line = json.dumps(
+            {'time': when, 'change': change, 'value': jsonify(value)},
+            separators=(',', ':')).encode() + b'\n'
+        if change in _STARTS:
+            self._snapshots.append((when, self._file.tell()))
+            self._since_snapshot = 0
+        else:
+            self._since_snapshot += 1
+        self._file.write(line)
+        self._file.flush()
+
+    def snapshot(self, character: Character,
+                 when: Optional[TIME_TYPING] = None) -> None:
+        """Append the full state of `character`."""
+        self._append(SNAPSHOT, character.to_json(),
+                     None if when is None else _timestamp(when))
+
+    def record(self, character: Character, change: str, value: Any) -> None:
+        """Append one change, as reported to `Character` observers."""
+        self._append(change, value)
+        if self._since_snapshot >= self.snapshot_every:
+            # The checkpoint holds the state as of the change just recorded.
+            self._append(CHECKPOINT, character.to_json(), self._last_time)
+
+    def attach(self, character: Character) -> None:
+        """Journal every change of `character` from now on. Starts with a
+        snapshot, so the journal is complete even if it already has records.
+        """
+        assert self._character is None, 'Journal is already attached'
+        self._character = character
+        self.snapshot(character)
+        character.add_observer(self.record)
+
+    def detach(self) -> None:
+        if self._character is not None:
+            self._character.remove_observer(self.record)
+            self._character = None
+
+    def close(self) -> None:
+        self.detach()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'Journal':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _states(self, since: float, until: float
+                ) -> Iterator[Tuple[float, Character]]:
+        """Replays from the last snapshot at or before `since`, yielding the
+        time and the (same, mutated) character after every record up to
+        `until`.
+        """
+        if self._file is not None:
+            self._file.flush()
+        idx = bisect_right(self._snapshots, (since, float('inf'))) - 1
+        if idx < 0:
+            if not self._snapshots or self._snapshots[0][0] > until:
+                return
+            idx = 0
+        character = None
+        for record in self._read(self._snapshots[idx][1]):
+            if record['time'] > until:
+                break
+            if record['change'] == SNAPSHOT or (
+                    record['change'] == CHECKPOINT and character is None):
+                character = Character(**record['value'])
+            elif character is None or record['change'] == CHECKPOINT:
+                continue
+            else:
+                _apply(character, record['change'], record['value'])
+            yield record['time'], character
+
+    def state_at(self, when: Optional[TIME_TYPING] = None
+                 ) -> Optional[Character]:
+        """The character as of `when` (the latest state by default), or None
+        if it was not journaled yet.
+        """
+        when = _timestamp(when)
+        character = None
+        for _, character in self._states(when, when):
+            pass
+        return character
+
+    def replay(self) -> Optional[Character]:
+        """Rebuild the latest state of the character."""
+        return self.state_at()
+
+    def progression(self, since: Optional[TIME_TYPING] = None,
+                    until: Optional[TIME_TYPING] = None,
+                    boss_pdr: float = DEFAULT_BOSS_PDR) -> Progression:
+        """Stats and damage after every change between `since` and `until`,
+        evaluated in batches of the same class and world.
+        """
+        since = _timestamp(since) if since is not None else float('-inf')
+        until = _timestamp(until)
+
+        times, levels, rows, groups = [], [], [], []
+        for when, character in self._states(since, until):
+            if when < since:
+                continue
+            times.append(when)
+            levels.append(character.level)
+            rows.append(character.stat_vector.values)
+            groups.append((character.char_class, character.world))
+
+        times = np.array(times, dtype=float)
+        levels = np.array(levels, dtype=np.int16)
+        stats = np.array(rows).reshape(-1, NUM_STATS)
+        evaluation = np.zeros((3, len(times)))
+        for group in set(groups):
+            members = np.array([idx for idx, other in enumerate(groups)
+                                if other == group])
+            char_class, world = group
+            evaluation[:, members] = evaluate_builds(
+                stats[members], char_class, levels[members], world=world,
+                boss_pdr=boss_pdr)
+        return Progression(times, levels, stats, *evaluation)
+
+    def compact(self, before: Optional[TIME_TYPING] = None) -> None:
+        """Replace all records up to `before` (everything by default) with a
+        single snapshot of the state at that time. History before it is
+        lost.
+        """
+        before = _timestamp(before)
+        state = None
+        kept = []
+        if self._file is not None:
+            self._file.flush()
+        if self._snapshots:
+            for record in self._read(self._snapshots[0][1]):
+                if record['time'] <= before:
+                    if record['change'] in _STARTS:
+                        state = Character(**record['value'])
+                    elif state is not None:
+                        _apply(state, record['change'], record['value'])
+                    snapshot_time = record['time']
+                else:
+                    kept.append(record)
+        if state is None:
+            return
+
+        records = [{'time': snapshot_time, 'change': SNAPSHOT,
+                    'value': state.to_json()}] + kept
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        atomic_write(self.file_path, ''.join(
+            json.dumps(record, separators=(',', ':')) + '\n'
+            for record in records))
+        self._index()
+
+
+def load_character(file_path: str) -> Optional[Character]:
+    """Latest state of the character journaled in `file_path`."""
+    return Journal(file_path).replay()
@@ -0,0 +1,148 @@
+"""EXP tables and leveling projections.
+
+`EXP_TO_NEXT` and `CUMULATIVE_EXP` are built once at import. Every projection
+is a lookup or a binary search in `CUMULATIVE_EXP`, so all functions accept
+NumPy arrays and project a whole roster in one pass:
+
+    weeks = forecast(results.levels, exp, exp_per_hour=5e10,
+                     hours_per_week=10, weeks=12,
+                     bonus_exp=results.stats[:, STAT_INDEX[Stat.BONUS_EXP]])
+
+The table is approximate: it is interpolated geometrically between a few
+levels of GMS, so projections are estimates rather than exact EXP counts.
+"""
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from maplestats.enums import Stat
+from maplestats.stat_vector import STAT_INDEX
+
+if TYPE_CHECKING:
+    from maplestats.roster import RosterResults
+
+MAX_LEVEL = 275
+
+_EXP_ANCHORS: Dict[int, float] = {
+    1: 15, 10: 1_242, 30: 31_000, 60: 300_000, 100: 3_800_000,
+    140: 40_000_000, 160: 130_000_000, 200: 2_207_026_470,
+    210: 1.4e10, 220: 6.8e10, 230: 2.9e11, 240: 6.5e11, 250: 1.31e12,
+    260: 4.7e12, 270: 1.6e13, 274: 2.5e13,
+}
+"""EXP to the next level at some levels. Levels in between grow
+geometrically."""
+
+ARRAY_LIKE = Union[float, np.ndarray]
+
+
+def _exp_to_next() -> np.ndarray:
+    anchors = np.array(sorted(_EXP_ANCHORS))
+    log_exp = np.log([_EXP_ANCHORS[level] for level in anchors])
+    levels = np.arange(1, MAX_LEVEL)
+    table = np.zeros(MAX_LEVEL + 1, dtype=np.int64)
+    table[1:MAX_LEVEL] = np.round(np.exp(np.interp(levels, anchors, log_exp)))
+    return table
+
+
+EXP_TO_NEXT: np.ndarray = _exp_to_next()
+"""EXP from level `i` to `i + 1`, at index `i`. 0 at `MAX_LEVEL`."""
+
+CUMULATIVE_EXP: np.ndarray = np.concatenate(
+    [[0], np.cumsum(EXP_TO_NEXT[:-1])])
+"""Total EXP from level 1 to level `i`, at index `i`."""
+
+for _table in (EXP_TO_NEXT, CUMULATIVE_EXP):
+    _table.flags.writeable = False
+
+
+def _effective_rate(exp_per_hour: ARRAY_LIKE, bonus_exp: ARRAY_LIKE
+                    ) -> np.ndarray:
+    """EXP per hour with bonus EXP (in %) applied."""
+    return np.asarray(exp_per_hour, dtype=float) * (
+        1 + np.asarray(bonus_exp, dtype=float) / 100)
+
+
+def exp_to_level(level: ARRAY_LIKE, target: ARRAY_LIKE, exp: ARRAY_LIKE = 0
+                 ) -> np.ndarray:
+    """EXP still needed to reach `target` from `level` with `exp` EXP into
+    the level. 0 if `target` is already reached.
+    """
+    level = np.asarray(level)
+    return np.maximum(
+        CUMULATIVE_EXP[np.asarray(target)] - CUMULATIVE_EXP[level] - exp, 0)
+
+
+def hours_to_level(level: ARRAY_LIKE, target: ARRAY_LIKE,
+                   exp_per_hour: ARRAY_LIKE, exp: ARRAY_LIKE = 0,
+                   bonus_exp: ARRAY_LIKE = 0) -> np.ndarray:
+    """Hours of training to reach `target`.
+
+    Args:
+        level: Current level.
+        target: Level to reach.
+        exp_per_hour: EXP gained per hour before bonus EXP.
+        exp: EXP into the current level.
+        bonus_exp: Bonus EXP in %, e.g. `Stat.BONUS_EXP` of a character plus
+            any coupons.
+    """
+    return exp_to_level(level, target, exp) / _effective_rate(
+        exp_per_hour, bonus_exp)
+
+
+def project_level(level: ARRAY_LIKE, hours: ARRAY_LIKE,
+                  exp_per_hour: ARRAY_LIKE, exp: ARRAY_LIKE = 0,
+                  bonus_exp: ARRAY_LIKE = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Level and EXP into that level after training for `hours`. Capped at
+    `MAX_LEVEL`.
+    """
+    total = (CUMULATIVE_EXP[np.asarray(level)] + np.asarray(exp, dtype=float)
+             + np.asarray(hours) * _effective_rate(exp_per_hour, bonus_exp))
+    total = np.minimum(total, CUMULATIVE_EXP[MAX_LEVEL])
+    new_level = np.searchsorted(CUMULATIVE_EXP[1:], total, side='right')
+    new_level = np.minimum(new_level, MAX_LEVEL)
+    return new_level, total - CUMULATIVE_EXP[new_level]
+
+
+def forecast(level: ARRAY_LIKE, exp: ARRAY_LIKE, exp_per_hour: ARRAY_LIKE,
+             hours_per_week: ARRAY_LIKE, weeks: int,
+             bonus_exp: ARRAY_LIKE = 0) -> np.ndarray:
+    """(N x weeks) level of N characters at the end of every week.
+
+    Every argument but `weeks` is one value per character, or one value for
+    all of them.
+    """
+    level = np.atleast_1d(level)
+    hours = np.arange(1, weeks + 1) * np.asarray(hours_per_week)[..., None]
+    return project_level(
+        level[:, None], hours, np.asarray(exp_per_hour)[..., None],
+        exp=np.asarray(exp)[..., None],
+        bonus_exp=np.asarray(bonus_exp)[..., None])[0]
+
+
+def roster_forecast(results: 'RosterResults', exp_per_hour: ARRAY_LIKE,
+                    hours_per_week: ARRAY_LIKE, weeks: int,
+                    exp: ARRAY_LIKE = 0,
+                    extra_bonus_exp: ARRAY_LIKE = 0,
+                    target: Optional[int] = None
+                    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Weekly levels of every character of a `roster.RosterResults`, using
+    the bonus EXP of their gear and link skills, and optionally the hours
+    each needs to reach `target`.
+
+    Args:
+        results: Output of `roster.evaluate_roster`.
+        exp_per_hour: EXP per hour before bonus EXP.
+        hours_per_week: Hours trained every week.
+        weeks: Weeks forecast.
+        exp: EXP into the current level.
+        extra_bonus_exp: Bonus EXP in % on top of equips and link skills.
+        target: Level to reach.
+    """
+    bonus_exp = results.stats[:, STAT_INDEX[Stat.BONUS_EXP]] + extra_bonus_exp
+    levels = forecast(results.levels, exp, exp_per_hour, hours_per_week,
+                      weeks, bonus_exp)
+    hours = None
+    if target is not None:
+        hours = hours_to_level(results.levels, target, exp_per_hour, exp,
+                               bonus_exp)
+    return levels, hours
@@ -0,0 +1,140 @@
+"""Chooses which link skills to equip.
+
+Every link skill's stats are tabulated once per level, so the search only adds
+rows of a matrix. Linear targets are solved exactly by taking the best links;
+damage is maximized with a branch-and-bound search whose bound takes the best
+remaining value of every stat.
+"""
+from enum import auto
+from typing import Dict, List, NamedTuple, Optional, Type, Union
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.enums import Class, MapleStatsEnum, Stat
+from maplestats.evaluation import evaluate_builds
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.link_skills import CLASS_TO_LINK, LinkSkill, link_stat_table
+from maplestats.stat_vector import NUM_STATS, STAT_INDEX, combine_rows
+
+
+class LinkTarget(MapleStatsEnum):
+    """What a link skill loadout is optimized for."""
+    BOSSING = auto()
+    CRIT = auto()
+    ALL_STAT = auto()
+
+
+_LINEAR_TARGET_WEIGHTS: Dict[LinkTarget, Dict[Stat, float]] = {
+    LinkTarget.CRIT: {Stat.CRIT: 1.0, Stat.CRIT_DMG: 1.0},
+    LinkTarget.ALL_STAT: {Stat.ALL: 1.0},
+}
+
+
+class LinkLoadout(NamedTuple):
+    """Chosen link skill levels by class and the score they reach."""
+    link_skills: Dict[Class, int]
+    score: float
+
+
+def _candidates(owned: Dict[Union[Class, str], int]) -> Dict[Class, int]:
+    """Best owned level of every link skill, keyed by one class owning it.
+    Classes sharing a link skill only provide it once.
+    """
+    best: Dict[Type[LinkSkill], Class] = {}
+    levels: Dict[Class, int] = {}
+    for char_class, level in owned.items():
+        char_class = Class.maybe_parse(char_class)
+        link = CLASS_TO_LINK.get(char_class)
+        if link is None or not level:
+            continue
+        current = best.get(link)
+        if current is None or level > levels[current]:
+            best[link] = char_class
+            levels[char_class] = level
+    return {char_class: levels[char_class] for char_class in best.values()}
+
+
+def optimize_link_skills(
+        owned: Dict[Union[Class, str], int],
+        slot_limit: int,
+        target: Union[LinkTarget, str] = LinkTarget.BOSSING,
+        character: Optional[Character] = None,
+        boss_pdr: float = DEFAULT_BOSS_PDR,
+) -> LinkLoadout:
+    """Choose at most `slot_limit` link skills from `owned`.
+
+    Args:
+        owned: Link skill levels the player owns, by class.
+        slot_limit: Maximum number of link skills which can be equipped.
+        target: BOSSING maximizes IED-adjusted damage of `character`, CRIT
+            maximizes crit rate plus crit damage and ALL_STAT maximizes flat
+            all stats.
+        character: Required for BOSSING. Its equips are used as the base and
+            its current link skills are ignored.
+        boss_pdr: Boss defense used for BOSSING.
+    """
+    target = LinkTarget.maybe_parse(target)
+    candidates = _candidates(owned)
+    classes = list(candidates)
+    rows = np.array([
+        link_stat_table(CLASS_TO_LINK[char_class])[candidates[char_class]]
+        for char_class in classes]).reshape(len(classes), NUM_STATS)
+
+    if target in _LINEAR_TARGET_WEIGHTS:
+        weights = np.zeros(NUM_STATS)
+        for stat, weight in _LINEAR_TARGET_WEIGHTS[target].items():
+            weights[STAT_INDEX[stat]] = weight
+        scores = rows @ weights
+        chosen = [idx for idx in np.argsort(scores)[::-1][:slot_limit]
+                  if scores[idx] > 0]
+        return LinkLoadout(
+            {classes[idx]: candidates[classes[idx]] for idx in chosen},
+            float(scores[chosen].sum()))
+
+    assert character is not None, 'BOSSING needs a character'
+    base = character.stat_vector_from_equips.values
+    # Links without stats can never improve damage.
+    useful = rows.any(axis=1)
+    rows = rows[useful]
+    classes = [cls for cls, keep in zip(classes, useful) if keep]
+
+    def _score(builds: np.ndarray) -> np.ndarray:
+        return evaluate_builds(
+            builds, character.char_class, character.level,
+            world=character.world, boss_pdr=boss_pdr).ied_damage
+
+    # Links which help most on their own are tried first.
+    alone = _score(combine_rows(np.stack(
+        [np.broadcast_to(base, rows.shape), rows])))
+    order = np.argsort(alone)[::-1]
+    rows = rows[order]
+    classes = [classes[idx] for idx in order]
+    # Each column sorted from best to worst, for the remaining links.
+    suffix_sorted = [-np.sort(-rows[start:], axis=0)
+                     for start in range(len(rows) + 1)]
+
+    best_score = _score(base)[0]
+    best_choice: List[int] = []
+
+    def _search(start: int, partial: np.ndarray, choice: List[int]) -> None:
+        nonlocal best_score, best_choice
+        score = _score(partial)[0]
+        if score > best_score:
+            best_score, best_choice = score, choice
+        slots_left = slot_limit - len(choice)
+        if not slots_left or start == len(rows):
+            return
+
+        top = suffix_sorted[start][:slots_left]
+        bound = _score(combine_rows(np.vstack([partial[None], top])))[0]
+        if bound <= best_score:
+            return
+        for idx in range(start, len(rows)):
+            _search(idx + 1, combine_rows(np.stack([partial, rows[idx]])),
+                    choice + [idx])
+
+    _search(0, base, [])
+    return LinkLoadout(
+        {classes[idx]: candidates[classes[idx]] for idx in best_choice},
+        float(best_score))
@@ -1,28 +1,34 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Set, Type
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Set, Type
 
 from maplestats.enums import Class, Stat
 from maplestats.utils import STATS_TYPING
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from maplestats.stat_vector import StatVector
+
 
 class LinkSkill(ABC):
 
     def __init__(self, level: int):
-        assert 1 <= level <= self._max_level
+        assert 1 <= level <= self._max_level()
         self._level = level
 
+    @classmethod
     @abstractmethod
-    @property
-    def classes(self) -> Set[Class]:
+    def classes(cls) -> Set[Class]:
         raise NotImplementedError
 
     @abstractmethod
     def stats(self) -> STATS_TYPING:
         raise NotImplementedError
 
-    @property
+    @classmethod
     @abstractmethod
-    def _max_level(self) -> int:
+    def _max_level(cls) -> int:
         raise NotImplementedError
 
     @property
@@ -32,10 +38,12 @@ class LinkSkill(ABC):
 
 class MagicianLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.IL_ARCHMAGE, Class.FP_ARCHMAGE, Class.BISHOP}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 6
 
     def stats(self) -> STATS_TYPING:
@@ -44,10 +52,12 @@ class MagicianLink(LinkSkill):
 
 class ThiefLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.NIGHT_LORD, Class.SHADOWER, Class.DUAL_BLADE}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 6
 
     def stats(self) -> STATS_TYPING:
@@ -56,10 +66,12 @@ class ThiefLink(LinkSkill):
 
 class PirateLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.BUCCANEER, Class.CORSAIR, Class.CANNON_MASTER}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 6
 
     def stats(self) -> STATS_TYPING:
@@ -68,11 +80,13 @@ class PirateLink(LinkSkill):
 
 class ResistanceLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {
             Class.WILD_HUNTER, Class.MECHANIC, Class.BATTLE_MAGE, Class.BLASTER}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 8
 
     def stats(self) -> STATS_TYPING:
@@ -81,10 +95,12 @@ class ResistanceLink(LinkSkill):
 
 class DSLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
-        return {Class.DEMON_AVENGER}
+    @classmethod
+    def classes(cls) -> Set[Class]:
+        return {Class.DEMON_SLAYER}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 3
 
     def stats(self) -> STATS_TYPING:
@@ -93,10 +109,12 @@ class DSLink(LinkSkill):
 
 class DALink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.DEMON_AVENGER}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 3
 
     def stats(self) -> STATS_TYPING:
@@ -105,10 +123,12 @@ class DALink(LinkSkill):
 
 class BTLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.BEAST_TAMER}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 3
 
     def stats(self) -> STATS_TYPING:
@@ -118,10 +138,12 @@ class BTLink(LinkSkill):
 
 class ABLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.ANGELIC_BUSTER}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 3
 
     def stats(self) -> STATS_TYPING:
@@ -130,10 +152,12 @@ class ABLink(LinkSkill):
 
 class ArkLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.ARK}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 2
 
     def stats(self) -> STATS_TYPING:
@@ -142,10 +166,12 @@ class ArkLink(LinkSkill):
 
 class CadenaLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.CADENA}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 2
 
     def stats(self) -> STATS_TYPING:
@@ -154,10 +180,12 @@ class CadenaLink(LinkSkill):
 
 class KinesisLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.KINESIS}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 2
 
     def stats(self) -> STATS_TYPING:
@@ -166,10 +194,12 @@ class KinesisLink(LinkSkill):
 
 class KannaLink(LinkSkill):
 
-    def classes(self) -> Set[Class]:
+    @classmethod
+    def classes(cls) -> Set[Class]:
         return {Class.KANNA}
 
-    def _max_level(self) -> int:
+    @classmethod
+    def _max_level(cls) -> int:
         return 2
 
     def stats(self) -> STATS_TYPING:
@@ -195,7 +225,65 @@ _LINK_SKILLS: Set[Type[LinkSkill]] = {
 def _generate_class_to_link(link_skills: Set[Type[LinkSkill]]
                             ) -> Dict[Class, Type[LinkSkill]]:
     """Generates a mapping from Class enum to CharacterClass."""
-    return {cls: link for link in link_skills for cls in link.classes}
+    return {cls: link for link in link_skills for cls in link.classes()}
 
 
 CLASS_TO_LINK = _generate_class_to_link(_LINK_SKILLS)
+
+
+def check_link_level(char_class: Class, level: int) -> None:
+    """Fail unless `level` is a level of the link skill of `char_class`.
+    Classes without a known link skill accept any level.
+    """
+    link = CLASS_TO_LINK.get(char_class)
+    # pylint: disable=protected-access
+    assert link is None or 1 <= level <= link._max_level(), (
+        f'Level of the {char_class.name} link skill must be between 1 and '
+        f'{link._max_level()}')
+
+
+@lru_cache(maxsize=None)
+def link_stat_table(link: Type[LinkSkill]) -> 'np.ndarray':
+    """((max level + 1) x NUM_STATS) stats of a link skill at every level.
+    Row 0 is the link skill not being equipped. The table is read-only.
+    """
+    # Imported on first use, so that loading characters does not need NumPy.
+    import numpy as np
+
+    from maplestats.stat_vector import NUM_STATS, StatVector
+
+    # pylint: disable=protected-access
+    max_level = link._max_level()
+    table = np.zeros((max_level + 1, NUM_STATS))
+    for level in range(1, max_level + 1):
+        table[level] = StatVector.from_stats(link(level).stats()).values
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def link_stat_vector(char_class: Class, level: int) -> 'StatVector':
+    """Stats granted by the link skill of `char_class` at `level`.
+
+    Classes without a known link skill grant no stats. The returned vector is
+    shared and must not be modified in place.
+    """
+    import numpy as np
+
+    from maplestats.stat_vector import NUM_STATS, StatVector
+
+    check_link_level(char_class, level)
+    link = CLASS_TO_LINK.get(char_class)
+    if link is None:
+        values = np.zeros(NUM_STATS)
+        values.flags.writeable = False
+        return StatVector(values)
+    return StatVector(link_stat_table(link)[level])
+
+
+def link_skills_stat_vector(link_skills: Dict[Class, int]) -> 'StatVector':
+    """Combined stats of a `{Class: level}` mapping of link skills."""
+    from maplestats.stat_vector import StatVector
+
+    return StatVector.sum(link_stat_vector(char_class, level)
+                          for char_class, level in link_skills.items())
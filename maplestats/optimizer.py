@@ -0,0 +1,445 @@
+"""Exact equipment-set optimizer.
+
+Items are grouped by slot family (e.g. the four RING slots form one family), and
+each family is filled with up to as many items as it has slots. The items a
+family can hold are its pool items and the items currently equipped in it, so
+equipped items are only replaced by better ones. Weapon, secondary and emblem
+(WSE) slots are families of one slot which always keep an item.
+
+The search walks families depth-first and picks the items of a family one at a
+time in index order, so combinations are expanded lazily and only where the
+bounds cannot rule them out. Items are sorted best first so that good
+combinations are reached early. Two upper bounds prune the search:
+
+- A cheap bound, computed for all candidate items at once, which assumes the
+  rest of the family and every remaining family give their best value in every
+  stat at the same time. It is valid because damage never decreases when a
+  stat goes up.
+- A tight bound, computed before descending into an item. The logarithm of
+  damage is bounded by a sum of concave functions of additive quantities
+  (flat and % main stat, flat and % attack, damage + boss, log(1 - IED), crit
+  damage and flat secondary stat). A tangent plane of a concave function lies
+  above it everywhere, so picking the best items of each remaining family
+  against the tangent's slopes gives an upper bound which accounts for
+  trade-offs between stats.
+"""
+from typing import (
+    Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union)
+
+import numpy as np
+
+from maplestats import formulas
+from maplestats.character import Character
+from maplestats.enums import EquipType, Stat, SLOT_FAMILIES
+from maplestats.equipment import Equip
+from maplestats.evaluation import (
+    REBOOT_DAMAGE, evaluate_builds, weapon_multiplier)
+from maplestats.stat_vector import (
+    MULTIPLICATIVE_MASK, NUM_STATS, STAT_INDEX, combine_rows)
+
+EQUIP_POOL_TYPING = Union[Iterable[Equip], Dict[EquipType, List[Equip]]]
+
+_TANGENT_ITERATIONS = 12
+_NUM_COORDINATES = 8
+
+
+class Loadout(NamedTuple):
+    """Best items by slot and the IED-adjusted damage they reach."""
+    equips: Dict[EquipType, Equip]
+    score: float
+
+
+class _SlotGroup(NamedTuple):
+    slots: Tuple[EquipType, ...]
+    items: List[Equip]
+    vectors: np.ndarray
+    """(N x NUM_STATS) stats of every item, best items first."""
+    size: int
+    """Number of items picked, at most one per slot."""
+    suffix_best: np.ndarray
+    """(N + 1 x size + 1 x NUM_STATS) best value of every stat reachable by
+    picking m more items from item i onwards, at [i, m]."""
+
+
+def relevant_stats(character: Character) -> List[Stat]:
+    """Stats which affect the damage of `character`."""
+    char_class = character.char_class
+    main, secondary = char_class.main_stat, char_class.secondary_stat
+    attack = char_class.attack_stat
+    return [
+        main, main.percent, secondary, secondary.percent, Stat.ALL,
+        Stat.PCT_ALL, attack, attack.percent, Stat.DMG, Stat.BOSS, Stat.IED,
+        Stat.CRIT, Stat.CRIT_DMG,
+    ]
+
+
+def _project(rows: np.ndarray, stats: List[Stat]) -> np.ndarray:
+    """Zero every stat not listed in `stats`."""
+    projected = np.zeros_like(rows)
+    columns = [STAT_INDEX[stat] for stat in stats]
+    projected[..., columns] = rows[..., columns]
+    return projected
+
+
+def _undominated(vectors: np.ndarray, keep: int) -> np.ndarray:
+    """Indices of the items which can be part of an optimal choice of `keep`
+    items. An item dominated by at least `keep` others never needs to be picked.
+    Among identical items the earliest ones win.
+    """
+    n = len(vectors)
+    greater_equal = (vectors[:, None, :] >= vectors[None, :, :]).all(axis=2)
+    greater = (vectors[:, None, :] > vectors[None, :, :]).any(axis=2)
+    earlier = np.arange(n)[:, None] < np.arange(n)[None, :]
+    # dominates[j, i]: item j is at least as good as item i.
+    dominates = greater_equal & (greater | earlier)
+    np.fill_diagonal(dominates, False)
+    return np.flatnonzero(dominates.sum(axis=0) < keep)
+
+
+def _suffix_best(vectors: np.ndarray, size: int) -> np.ndarray:
+    """`_SlotGroup.suffix_best` of items with `vectors`."""
+    best = np.zeros((len(vectors) + 1, size + 1, NUM_STATS))
+    top = np.zeros((0, NUM_STATS))
+    for idx in range(len(vectors) - 1, -1, -1):
+        # The `size` best values of every stat from item idx onwards.
+        top = -np.sort(-np.vstack([top, vectors[idx]]), axis=0)[:size]
+        best[idx, 1:len(top) + 1] = np.where(
+            MULTIPLICATIVE_MASK, 1.0 - np.cumprod(1.0 - top, axis=0),
+            np.cumsum(top, axis=0))
+    return best
+
+
+def _build_group(slots: Tuple[EquipType, ...], items: List[Equip],
+                 stats: List[Stat], base: np.ndarray,
+                 score: Callable[[np.ndarray], np.ndarray]) -> _SlotGroup:
+    vectors = _project(np.stack([item.stat_vector.values for item in items]),
+                       stats)
+    size = min(len(slots), len(items))
+    kept = _undominated(vectors, size)
+    order = kept[np.argsort(-score(combine_rows(np.stack(
+        [np.broadcast_to(base, vectors[kept].shape), vectors[kept]]))),
+        kind='stable')]
+    vectors = vectors[order]
+    return _SlotGroup(slots, [items[idx] for idx in order], vectors, size,
+                      _suffix_best(vectors, size))
+
+
+def _group_pool(pool: EQUIP_POOL_TYPING, character: Character
+                ) -> Dict[Tuple[EquipType, ...], List[Equip]]:
+    """Candidates of every slot family with items in `pool`, including the
+    items `character` has equipped in the family.
+    """
+    if isinstance(pool, dict):
+        pool = [equip for equips in pool.values() for equip in equips]
+    grouped: Dict[Tuple[EquipType, ...], List[Equip]] = {}
+    for equip in pool:
+        grouped.setdefault(SLOT_FAMILIES[equip.equip_type], []).append(equip)
+    for slots, items in grouped.items():
+        candidates = {id(item) for item in items}
+        for slot in slots:
+            equipped = character.equips.get(slot)
+            if equipped is not None and id(equipped) not in candidates:
+                candidates.add(id(equipped))
+                items.append(equipped)
+    return grouped
+
+
+class _TangentBound:
+    """Tight upper bound on the damage reachable from a partial loadout."""
+
+    def __init__(self, character: Character, groups: List[_SlotGroup],
+                 boss_pdr: float):
+        char_class = character.char_class
+        self._main = [STAT_INDEX[char_class.main_stat], STAT_INDEX[Stat.ALL]]
+        self._main_pct = [STAT_INDEX[char_class.main_stat.percent],
+                          STAT_INDEX[Stat.PCT_ALL]]
+        self._secondary = [STAT_INDEX[char_class.secondary_stat],
+                           STAT_INDEX[Stat.ALL]]
+        self._secondary_pct = [STAT_INDEX[char_class.secondary_stat.percent],
+                               STAT_INDEX[Stat.PCT_ALL]]
+        self._attack = STAT_INDEX[char_class.attack_stat]
+        self._attack_pct = STAT_INDEX[char_class.attack_stat.percent]
+        self._damage = [STAT_INDEX[Stat.DMG], STAT_INDEX[Stat.BOSS]]
+        self._ied = STAT_INDEX[Stat.IED]
+        self._crit = STAT_INDEX[Stat.CRIT]
+        self._crit_dmg = STAT_INDEX[Stat.CRIT_DMG]
+
+        world = character.world
+        self._extra_damage = REBOOT_DAMAGE if world and world.is_reboot else 0
+        self._pure = float(formulas.pure_main_stat(character.level))
+        self._boss_pdr = boss_pdr
+        self._log_scale = np.log(4 * weapon_multiplier(char_class) / 100)
+
+        # Items of all groups padded to the same count, so that the best items
+        # of every remaining group are found with one product per iteration.
+        longest = max([len(group.items) for group in groups], default=0)
+        self._coordinates = np.zeros((len(groups), longest, _NUM_COORDINATES))
+        self._valid = np.zeros((len(groups), longest), dtype=bool)
+        for idx, group in enumerate(groups):
+            self._coordinates[idx, :len(group.items)] = self.coordinates(
+                group.vectors)
+            self._valid[idx, :len(group.items)] = True
+        self._sizes = np.array([group.size for group in groups], dtype=int)
+
+    def coordinates(self, rows: np.ndarray) -> np.ndarray:
+        """The additive quantities log-damage is bounded by a concave function
+        of.
+        """
+        coords = np.empty(rows.shape[:-1] + (_NUM_COORDINATES,))
+        coords[..., 0] = rows[..., self._main].sum(axis=-1)
+        coords[..., 1] = rows[..., self._main_pct].sum(axis=-1)
+        coords[..., 2] = rows[..., self._attack]
+        coords[..., 3] = rows[..., self._attack_pct]
+        coords[..., 4] = rows[..., self._damage].sum(axis=-1)
+        coords[..., 5] = np.log1p(-np.minimum(rows[..., self._ied], 1 - 1e-9))
+        coords[..., 6] = rows[..., self._crit_dmg]
+        coords[..., 7] = rows[..., self._secondary].sum(axis=-1)
+        return coords
+
+    def _tangent(self, point: np.ndarray, crit_rate: float,
+                 secondary_scale: float
+                 ) -> Optional[Tuple[float, np.ndarray]]:
+        """Log-damage bound at `point` and its slopes, or None when damage is
+        0 there.
+
+        Args:
+            point: Coordinates to take the tangent at.
+            crit_rate: Best possible crit rate, as a fraction.
+            secondary_scale: Best possible secondary stat % multiplier divided
+                by the lowest possible 4x main stat.
+        """
+        main = self._pure + point[0]
+        main_pct = 1 + point[1] / 100
+        attack = point[2]
+        attack_pct = 1 + point[3] / 100
+        damage = 1 + (point[4] + self._extra_damage) / 100
+        through_defense = self._boss_pdr * np.exp(point[5])
+        ied = 1 - through_defense
+        crit = 1 + crit_rate * (formulas.BASE_CRIT_DMG + point[6]) / 100
+        # log(4M + S) <= log(4M) + log(1 + S / 4M_min)
+        secondary = 1 + (4 + point[7]) * secondary_scale
+        if attack <= 0 or ied <= 0:
+            return None
+
+        value = (np.log(main) + np.log(main_pct) + np.log(attack)
+                 + np.log(attack_pct) + np.log(damage) + np.log(ied)
+                 + np.log(crit) + np.log(secondary))
+        slopes = np.array([
+            1 / main, 1 / (100 * main_pct), 1 / attack,
+            1 / (100 * attack_pct), 1 / (100 * damage),
+            -through_defense / ied, crit_rate / (100 * crit),
+            secondary_scale / secondary])
+        return value, slopes
+
+    def __call__(self, partial: np.ndarray, depth: int, first: int,
+                 needed: int, remaining_max: np.ndarray,
+                 cutoff: float = 0.0) -> float:
+        """Upper bound on damage for `partial` plus `needed` items of group
+        `depth` from item `first` onwards and the items of every later group,
+        whose best stats are `remaining_max`. Stops refining the bound once it
+        is at most `cutoff`.
+        """
+        best = combine_rows(np.stack([partial, remaining_max]))
+        crit_rate = min(
+            1.0, (formulas.BASE_CRIT_RATE + best[self._crit]) / 100)
+        lowest_main = formulas.total_stat(
+            self._pure, partial[self._main].sum(),
+            partial[self._main_pct].sum())
+        secondary_scale = (1 + best[self._secondary_pct].sum() / 100) / (
+            4 * lowest_main)
+
+        coords = self._coordinates[depth:]
+        valid = self._valid[depth:].copy()
+        valid[:1, :first] = False
+        counts = self._sizes[depth:].copy()
+        counts[:1] = needed
+        # The item ranked `ranks[i]` by the slopes in group `rows[i]` is
+        # picked, for every i.
+        rows, ranks = np.nonzero(np.arange(coords.shape[1]) < counts[:, None])
+        most = int(counts.max(initial=0))
+        start = self.coordinates(partial)
+        log_cutoff = (np.log(cutoff) - self._log_scale if cutoff > 0
+                      else -np.inf)
+
+        # The first tangent is taken at the best value of every stat, which
+        # may not be reachable. Later tangents follow Frank-Wolfe steps
+        # towards the point which minimizes the bound.
+        point = self.coordinates(best)
+        log_bound = np.inf
+        for iteration in range(_TANGENT_ITERATIONS):
+            tangent = self._tangent(point, crit_rate, secondary_scale)
+            if tangent is None:
+                if iteration == 0:
+                    # Even the best value of every stat deals no damage.
+                    return 0.0
+                break
+            value, slopes = tangent
+            if not most:
+                log_bound = value
+                break
+
+            scores = np.where(valid, coords @ slopes, -np.inf)
+            ranking = np.argpartition(-scores, np.arange(most), axis=1)
+            items = ranking[rows, ranks]
+            log_bound = min(log_bound, value + slopes @ (start - point)
+                            + scores[rows, items].sum())
+            if log_bound <= log_cutoff:
+                break
+
+            picked = start + coords[rows, items].sum(axis=0)
+            if iteration == 0:
+                point = picked
+            else:
+                point = point + 2 / (iteration + 2) * (picked - point)
+
+        return float(np.exp(self._log_scale + log_bound))
+
+
+def _combine_choice(base: np.ndarray, groups: List[_SlotGroup],
+                    choice: List[Tuple[int, ...]]) -> np.ndarray:
+    return combine_rows(np.vstack(
+        [base[None]] + [group.vectors[list(picked)]
+                        for group, picked in zip(groups, choice)]))
+
+
+def _local_optimum(base: np.ndarray, groups: List[_SlotGroup],
+                   score: Callable[[np.ndarray], np.ndarray]
+                   ) -> List[Tuple[int, ...]]:
+    """Start from the best items of every family and swap one item at a time
+    until no single swap helps. Used as the first incumbent so that the exact
+    search can prune from the start.
+    """
+    choice = [tuple(range(group.size)) for group in groups]
+    improved = True
+    while improved:
+        improved = False
+        for depth, group in enumerate(groups):
+            for position in range(group.size):
+                picked = choice[depth]
+                others = picked[:position] + picked[position + 1:]
+                rest = _combine_choice(
+                    base, groups, choice[:depth] + [others]
+                    + choice[depth + 1:])
+                scores = score(combine_rows(np.stack(
+                    [np.broadcast_to(rest, group.vectors.shape),
+                     group.vectors])))
+                scores[list(others)] = -np.inf
+                best = int(np.argmax(scores))
+                if scores[best] > scores[picked[position]]:
+                    choice[depth] = (picked[:position] + (best,)
+                                     + picked[position + 1:])
+                    improved = True
+    return choice
+
+
+def optimize_equips(
+        character: Character,
+        pool: EQUIP_POOL_TYPING,
+        boss_pdr: float = formulas.DEFAULT_BOSS_PDR,
+) -> Loadout:
+    """Find the loadout from `pool` maximizing IED-adjusted damage.
+
+    Slot families with items in `pool` are filled with as many items as they
+    have slots, picked from the pool and the items `character` has equipped in
+    the family. All other slots keep the items `character` currently has
+    equipped.
+
+    Args:
+        character: Character whose level, class, world and link skills are
+            used. It is not modified.
+        pool: Candidate items, either as a flat iterable or grouped by equip
+            type. Items are placed in any slot of their family, e.g. a ring can
+            go in any of the four RING slots.
+        boss_pdr: Boss defense used for IED-adjusted damage. Use 0 to maximize
+            boss damage without defense.
+    """
+    stats = relevant_stats(character)
+    grouped = _group_pool(pool, character)
+
+    optimized_slots = {slot for slots in grouped for slot in slots}
+    fixed = [character.stat_vector_from_link_skills.values] + [
+        equip.stat_vector.values
+        for slot, equip in character.equips.items()
+        if equip is not None and slot not in optimized_slots]
+    base = _project(combine_rows(np.stack(fixed)), stats)
+
+    def _score(rows: np.ndarray) -> np.ndarray:
+        return evaluate_builds(
+            rows, character.char_class, character.level,
+            world=character.world, boss_pdr=boss_pdr).ied_damage
+
+    groups = [_build_group(slots, items, stats, base, _score)
+              for slots, items in grouped.items()]
+
+    # Search the families with the largest possible impact first, as they
+    # tighten the bound the most.
+    best_alone = [_score(combine_rows(np.stack(
+        [base, group.suffix_best[0, group.size]])))[0] for group in groups]
+    groups = [groups[idx] for idx in np.argsort(best_alone)[::-1]]
+    tight_bound = _TangentBound(character, groups, boss_pdr)
+
+    # suffix_max[g]: best value of every stat from groups g onwards.
+    suffix_max = np.zeros((len(groups) + 1, NUM_STATS))
+    for idx, group in reversed(list(enumerate(groups))):
+        suffix_max[idx] = combine_rows(np.stack(
+            [suffix_max[idx + 1], group.suffix_best[0, group.size]]))
+
+    best_choice = _local_optimum(base, groups, _score)
+    best_score = _score(_combine_choice(base, groups, best_choice))[0]
+
+    def _search(depth: int, first: int, needed: int, partial: np.ndarray,
+                choice: List[Tuple[int, ...]]) -> None:
+        """Pick `needed` more items of group `depth` from item `first` onwards,
+        then fill every later group.
+        """
+        nonlocal best_score, best_choice
+        if not needed:
+            if depth + 1 == len(groups):
+                score = _score(partial)[0]
+                if score > best_score:
+                    best_score, best_choice = score, choice
+                return
+            depth += 1
+            first, needed = 0, groups[depth].size
+            choice = choice + [()]
+
+        group = groups[depth]
+        # Later picks need items after this one.
+        last = len(group.items) - needed + 1
+        children = combine_rows(np.stack(
+            [np.broadcast_to(partial, (last - first, NUM_STATS)),
+             group.vectors[first:last]]))
+        rest = combine_rows(np.stack(
+            [group.suffix_best[first + 1:last + 1, needed - 1],
+             np.broadcast_to(suffix_max[depth + 1], children.shape)]))
+        bounds = _score(combine_rows(np.stack([children, rest])))
+        if depth == len(groups) - 1 and needed == 1:
+            # Nothing is left to add, so the bounds are the exact scores.
+            idx = int(np.argmax(bounds))
+            if bounds[idx] > best_score:
+                best_score = bounds[idx]
+                best_choice = choice[:-1] + [choice[-1] + (first + idx,)]
+            return
+
+        for idx in np.argsort(bounds)[::-1]:
+            if bounds[idx] <= best_score:
+                break
+            item = first + int(idx)
+            child = children[idx]
+            remaining_max = combine_rows(np.stack(
+                [group.suffix_best[item + 1, needed - 1],
+                 suffix_max[depth + 1]]))
+            if tight_bound(child, depth, item + 1, needed - 1, remaining_max,
+                           cutoff=best_score) <= best_score:
+                continue
+            _search(depth, item + 1, needed - 1, child,
+                    choice[:-1] + [choice[-1] + (item,)])
+
+    if groups:
+        _search(0, 0, groups[0].size, base, [()])
+
+    equips: Dict[EquipType, Equip] = {}
+    for group, picked in zip(groups, best_choice):
+        for slot, item_idx in zip(group.slots, sorted(picked)):
+            equips[slot] = group.items[item_idx]
+    return Loadout(equips, float(best_score))
@@ -0,0 +1,250 @@
+"""What-if overlays over a character.
+
+An overlay records hypothetical changes to a base `Character` without copying
+it. Its stats are the base's cached aggregate with the stats of the changed
+equips and link skills swapped out and in:
+
+    what_if = CharacterOverlay(me)
+    what_if.equip(new_ring, EquipType.RING_3)
+    what_if.gain_levels(5)
+    what_if.evaluate().ied_damage
+
+The base is read, never modified. Overlays follow later changes of the base
+too, except in the slots and link skills they override.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.evaluation import (
+    BuildEvaluation, evaluate_builds, stat_equivalences)
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.link_skills import link_stat_vector
+from maplestats.stat_vector import (
+    NUM_STATS, StatVector, apply_deltas, combine_rows)
+from maplestats.utils import STATS_TYPING
+
+_ZEROS = np.zeros(NUM_STATS)
+_ZEROS.flags.writeable = False
+
+
+class CharacterOverlay:
+    """Hypothetical changes over a base character, which is left untouched.
+
+    Supports the reading side of `Character` (stats, evaluation, equips and
+    link skills) and the edits `equip`, `unequip`, `set_link_skill` and
+    `level`.
+    """
+
+    __slots__ = ('base', '_equips', '_link_skills', '_level', '_delta',
+                 '_stat_vector', '_base_vector')
+
+    def __init__(self, base: Character):
+        self.base = base
+        self._equips: Dict[EquipType, Optional[Equip]] = {}
+        self._link_skills: Dict[Class, Optional[int]] = {}
+        self._level: Optional[int] = None
+        # Cached until the overlay or the base changes.
+        self._delta: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._stat_vector: Optional[StatVector] = None
+        self._base_vector: Optional[StatVector] = None
+
+    def _changed(self) -> None:
+        self._delta = None
+        self._stat_vector = None
+
+    @property
+    def name(self) -> str:
+        return self.base.name
+
+    @property
+    def char_class(self) -> Class:
+        return self.base.char_class
+
+    @property
+    def world(self) -> Optional[World]:
+        return self.base.world
+
+    @property
+    def level(self) -> int:
+        return self._level if self._level is not None else self.base.level
+
+    @level.setter
+    def level(self, new_level: int):
+        assert 1 <= new_level <= 275, 'Level must be between 1 and 275'
+        self._level = new_level
+
+    def gain_levels(self, levels: int) -> None:
+        self.level = min(self.level + levels, 275)
+
+    @property
+    def equips(self) -> Dict[EquipType, Optional[Equip]]:
+        """Equipped items by slot, with the overlay's items. A new dict."""
+        equips = dict(self.base.equips)
+        equips.update(self._equips)
+        return equips
+
+    @property
+    def link_skills(self) -> Dict[Class, int]:
+        """Link skill levels by class, with the overlay's levels. A new dict.
+        """
+        link_skills = dict(self.base.link_skills)
+        for char_class, level in self._link_skills.items():
+            if level:
+                link_skills[char_class] = level
+            else:
+                link_skills.pop(char_class, None)
+        return link_skills
+
+    def equip(self, equip: Equip, slot: Optional[EquipType] = None
+              ) -> Optional[Equip]:
+        """Equip an item in the overlay and return the unequipped item."""
+        equip_type = EquipType.maybe_parse(slot) if slot else equip.equip_type
+        unequipped = self._equip_in(equip_type)
+        self._equips[equip_type] = equip
+        self._changed()
+        return unequipped
+
+    def unequip(self, slot: Union[EquipType, str]) -> Optional[Equip]:
+        """Empty a slot in the overlay and return the unequipped item."""
+        equip_type = EquipType.maybe_parse(slot)
+        unequipped = self._equip_in(equip_type)
+        self._equips[equip_type] = None
+        self._changed()
+        return unequipped
+
+    def _equip_in(self, equip_type: EquipType) -> Optional[Equip]:
+        if equip_type in self._equips:
+            return self._equips[equip_type]
+        return self.base.equips.get(equip_type)
+
+    def set_link_skill(self, char_class: Union[Class, str],
+                       level: Optional[int]) -> None:
+        """Set the level of a single link skill, or remove it if `level` is
+        None or 0.
+        """
+        self._link_skills[Class.maybe_parse(char_class)] = level
+        self._changed()
+
+    def _get_delta(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Stats added by the overlay and stats of the base it takes out."""
+        # The base's derived stat vector is replaced whenever it changes.
+        base_vector = self.base.stat_vector
+        if self._base_vector is not base_vector:
+            self._changed()
+            self._base_vector = base_vector
+        if self._delta is None:
+            added: List[np.ndarray] = []
+            removed: List[np.ndarray] = []
+            base_equips = self.base.equips
+            for slot, equip in self._equips.items():
+                if equip is not None:
+                    added.append(equip.stat_vector.values)
+                if base_equips.get(slot) is not None:
+                    removed.append(base_equips[slot].stat_vector.values)
+            base_links = self.base.link_skills
+            for char_class, level in self._link_skills.items():
+                if level:
+                    added.append(link_stat_vector(char_class, level).values)
+                if base_links.get(char_class):
+                    removed.append(link_stat_vector(
+                        char_class, base_links[char_class]).values)
+            self._delta = (
+                combine_rows(np.stack(added)) if added else _ZEROS,
+                combine_rows(np.stack(removed)) if removed else _ZEROS)
+        return self._delta
+
+    @property
+    def stat_vector(self) -> StatVector:
+        """Stats from all sources: equips and link skills."""
+        added, removed = self._get_delta()
+        if self._stat_vector is None:
+            self._stat_vector = StatVector(apply_deltas(
+                self._base_vector.values, added, removed))
+        return self._stat_vector
+
+    @property
+    def stats(self) -> STATS_TYPING:
+        return self.stat_vector.to_stats(sparse=False)
+
+    def evaluate(self, boss_pdr: float = DEFAULT_BOSS_PDR) -> BuildEvaluation:
+        """Stat range and boss damage with the overlay's changes."""
+        evaluation = evaluate_builds(
+            self.stat_vector.values, self.char_class, self.level,
+            world=self.world, boss_pdr=boss_pdr)
+        return BuildEvaluation(*(float(values[0]) for values in evaluation))
+
+    def stat_equivalences(self, boss_pdr: float = DEFAULT_BOSS_PDR,
+                          reference: Optional[Stat] = None
+                          ) -> Dict[Stat, float]:
+        """See `Character.stat_equivalences`."""
+        return stat_equivalences(
+            self.stat_vector.values, self.char_class, self.level,
+            world=self.world, boss_pdr=boss_pdr, reference=reference)
+
+    def to_character(self) -> Character:
+        """A new character with the overlay's changes applied. Equips are
+        shared with the base, as they are never modified.
+        """
+        return Character(
+            self.name, level=self.level,
+            character_class=self.base.char_class, world=self.base.world,
+            link_skills=self.link_skills, equips=self.equips)
+
+
+def evaluate_overlays(overlays: Sequence[CharacterOverlay],
+                      boss_pdr: float = DEFAULT_BOSS_PDR) -> BuildEvaluation:
+    """Evaluate many overlays in batches of the same class and world, one
+    value per overlay in every array.
+    """
+    count = len(overlays)
+    rows = np.zeros((count, NUM_STATS))
+    added = np.zeros((count, NUM_STATS))
+    removed = np.zeros((count, NUM_STATS))
+    levels = np.zeros(count, dtype=np.int16)
+    groups: Dict[Tuple[Class, Optional[World]], List[int]] = {}
+    for idx, overlay in enumerate(overlays):
+        rows[idx] = overlay.base.stat_vector.values
+        added[idx], removed[idx] = overlay._get_delta()
+        levels[idx] = overlay.level
+        groups.setdefault((overlay.char_class, overlay.world), []).append(idx)
+    stats = apply_deltas(rows, added, removed)
+
+    evaluation = np.zeros((3, count))
+    for (char_class, world), members in groups.items():
+        evaluation[:, members] = evaluate_builds(
+            stats[members], char_class, levels[members], world=world,
+            boss_pdr=boss_pdr)
+    return BuildEvaluation(*evaluation)
+
+
+def evaluate_swaps(character: Character, candidates: Iterable[Equip],
+                   slot: Optional[Union[EquipType, str]] = None,
+                   boss_pdr: float = DEFAULT_BOSS_PDR) -> BuildEvaluation:
+    """Evaluate `character` with each candidate equipped in turn, in one
+    vectorized pass and without building overlays.
+
+    Args:
+        character: Base character.
+        candidates: Items to try.
+        slot: Slot every candidate goes into. Defaults to each candidate's
+            own equip type.
+        boss_pdr: Boss defense used for `ied_damage`.
+    """
+    slot = EquipType.maybe_parse(slot) if slot else None
+    equips = character.equips
+    added, removed = [], []
+    for equip in candidates:
+        current = equips.get(slot if slot else equip.equip_type)
+        added.append(equip.stat_vector.values)
+        removed.append(current.stat_vector.values if current else _ZEROS)
+    if not added:
+        return BuildEvaluation(*(np.zeros(0) for _ in range(3)))
+    stats = apply_deltas(character.stat_vector.values, np.stack(added),
+                         np.stack(removed))
+    return BuildEvaluation(*evaluate_builds(
+        stats, character.char_class, character.level, world=character.world,
+        boss_pdr=boss_pdr))
@@ -0,0 +1,197 @@
+"""Write-behind saving of characters.
+
+Editors saving on every change should schedule saves instead:
+
+    saver = WriteBehindSaver(delay=0.5)
+    me.level = 250
+    saver.schedule(me)
+    me.world = World.SCANIA
+    saver.schedule(me)  # Coalesced with the previous save.
+    saver.flush()
+
+A file is written once its character has not been scheduled again for `delay`
+seconds, or at the latest `max_delay` seconds after its first pending save.
+Characters are serialized when scheduled, by the thread editing them, so the
+background thread only writes bytes and never reads a character mid-edit.
+Paths are resolved when scheduled, so changing the working directory does not
+move pending saves. Writes are atomic, one failed write does not prevent the
+others, and pending saves are flushed when the interpreter exits.
+"""
+import atexit
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Union
+
+from maplestats.character import (
+    Character, LAST_MODIFIED_FILE_NAME, _write_last_modified)
+from maplestats.instrumentation import count, timed
+from maplestats.utils import atomic_write
+
+DEFAULT_DELAY = 0.5
+DEFAULT_MAX_DELAY = 5.0
+
+
+class _PendingSave(NamedTuple):
+    data: Union[bytes, str]
+    last_modified_path: str
+    first_scheduled: float
+    last_scheduled: float
+
+
+class WriteBehindSaver:
+    """Coalesces saves of characters and writes them from a background
+    thread.
+
+    Errors of background writes are raised by the next `flush` or `close`.
+    """
+
+    def __init__(self, delay: float = DEFAULT_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        assert 0 <= delay <= max_delay, 'Expected 0 <= delay <= max_delay'
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending: Dict[str, _PendingSave] = {}
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name='maplestats-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def schedule(self, character: Character, file_path: Optional[str] = None,
+                 binary: bool = False) -> None:
+        """Save `character` later, replacing any pending save of the same
+        file. Same arguments as `Character.save`.
+        """
+        extension = 'mstb' if binary else 'json'
+        file_path = os.path.abspath(
+            file_path if file_path else f'{character.name}.{extension}')
+        data = character.serialize(binary)
+        last_modified_path = os.path.abspath(LAST_MODIFIED_FILE_NAME)
+        now = time.monotonic()
+        with self._condition:
+            assert not self._closed, 'Saver is closed'
+            pending = self._pending.get(file_path)
+            if pending is not None:
+                count('WriteBehindSaver.coalesced')
+            self._pending[file_path] = _PendingSave(
+                data, last_modified_path,
+                pending.first_scheduled if pending else now, now)
+            self._condition.notify()
+
+    @property
+    def pending(self) -> int:
+        """Number of files waiting to be written."""
+        with self._condition:
+            return len(self._pending)
+
+    def _deadline(self, pending: _PendingSave) -> float:
+        return min(pending.last_scheduled + self.delay,
+                   pending.first_scheduled + self.max_delay)
+
+    def _take(self, due_only: bool) -> Dict[str, _PendingSave]:
+        now = time.monotonic()
+        taken = {path: pending for path, pending in self._pending.items()
+                 if not due_only or self._deadline(pending) <= now}
+        for path in taken:
+            del self._pending[path]
+        return taken
+
+    def _write(self, due_only: bool) -> None:
+        """Take pending saves and write each on its own. The first error is
+        raised after every other save is written.
+        """
+        error = None
+        written = None
+        # Saves are taken under the write lock, so a save taken later never
+        # lands before an older save of the same file. This also waits for a
+        # background write in progress, so that every save scheduled before a
+        # flush is on disk once it returns.
+        with self._write_lock:
+            with self._condition:
+                saves = self._take(due_only)
+            for file_path, pending in saves.items():
+                try:
+                    with timed('WriteBehindSaver.write'):
+                        atomic_write(file_path, pending.data)
+                except Exception as e:
+                    error = error if error else e
+                else:
+                    written = file_path, pending.last_modified_path
+            if written:
+                _write_last_modified(*written)
+        if error:
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    deadline = min((self._deadline(pending)
+                                    for pending in self._pending.values()),
+                                   default=None)
+                    now = time.monotonic()
+                    if deadline is not None and deadline <= now:
+                        break
+                    self._condition.wait(
+                        None if deadline is None else deadline - now)
+            try:
+                self._write(due_only=True)
+            except BaseException as e:
+                with self._condition:
+                    self._error = self._error if self._error else e
+
+    def _raise_error(self) -> None:
+        with self._condition:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def flush(self) -> None:
+        """Write every pending save now."""
+        self._write(due_only=False)
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flush and stop the background thread. Idempotent."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        atexit.unregister(self.close)
+        self._write(due_only=False)
+        self._raise_error()
+
+    def __enter__(self) -> 'WriteBehindSaver':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+_DEFAULT_SAVER: Optional[WriteBehindSaver] = None
+_DEFAULT_SAVER_LOCK = threading.Lock()
+
+
+def default_saver() -> WriteBehindSaver:
+    """Saver used by `Character.save(write_behind=True)`, started on first
+    use.
+    """
+    global _DEFAULT_SAVER
+    with _DEFAULT_SAVER_LOCK:
+        if _DEFAULT_SAVER is None or _DEFAULT_SAVER._closed:
+            _DEFAULT_SAVER = WriteBehindSaver()
+        return _DEFAULT_SAVER
+
+
+def flush() -> None:
+    """Write every pending save of the default saver."""
+    if _DEFAULT_SAVER is not None:
+        _DEFAULT_SAVER.flush()
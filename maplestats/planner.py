@@ -0,0 +1,361 @@
+"""Upgrade roadmap ranked by expected damage gained per meso.
+
+Every slot of a character offers one next step of each upgrade kind: star
+force to the next milestone, cubing potential or bonus potential to the next
+tier of its best stat, and flaming until the bonus stats improve. Each step
+has an expected cost from `star_force`, `cubing` and `flames`, and a damage
+gain from `evaluate_builds` on the character's stats with the step applied.
+
+Steps wait in a priority queue by gain per meso. Accepting a step changes the
+stats every other gain was computed against, but instead of recomputing all
+of them, a gain is only recomputed when its step reaches the top of the queue
+(lazy greedy). Only the accepted slot gets a new step. Damage is not strictly
+submodular in stats, so the order is a close approximation of the exact greedy
+order.
+
+Equips do not record their level or stars: pass them with `item_levels` and
+`stars`, or `DEFAULT_ITEM_LEVEL` and 0 stars are assumed.
+"""
+import heapq
+from enum import auto
+from functools import lru_cache
+from itertools import count as counter
+from typing import (
+    Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union)
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.cubing import CubeType, simulate_cubing
+from maplestats.enums import EquipType, MapleStatsEnum, Stat, WSE
+from maplestats.equipment import Equip
+from maplestats.evaluation import evaluate_builds
+from maplestats.flames import (
+    FLAME_COSTS, FlameType, beat_probability, expected_improved_score,
+    flame_score)
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.stat_vector import (
+    NUM_STATS, STAT_INDEX, StatVector, apply_deltas)
+from maplestats.star_force import (
+    max_stars, star_force_estimate, star_force_stats)
+
+DEFAULT_ITEM_LEVEL = 150
+
+DEFAULT_CUBING_TRIALS = 200_000
+"""Simulated cubes per cubing estimate. Targets too rare to be hit once are
+left out of the plan."""
+
+STAR_TARGETS: Tuple[int, ...] = (10, 15, 17, 18, 19, 20, 21, 22)
+"""Stars a star force step aims for."""
+
+POTENTIAL_TARGETS: Tuple[int, ...] = (21, 24, 27, 30, 33)
+"""Total % of the best stat a cubing step aims for."""
+
+BONUS_POTENTIAL_TARGETS: Tuple[int, ...] = (9, 12, 15, 18, 21)
+
+_POTENTIAL_SLOTS = (
+    EquipType.WEAPON, EquipType.SECONDARY, EquipType.EMBLEM, EquipType.HAT,
+    EquipType.TOP, EquipType.BOTTOM, EquipType.SHOE, EquipType.GLOVE,
+    EquipType.CAPE, EquipType.SHOULDER, EquipType.RING_1, EquipType.RING_2,
+    EquipType.RING_3, EquipType.RING_4, EquipType.PENDANT_1,
+    EquipType.PENDANT_2, EquipType.BELT, EquipType.EARRING, EquipType.FACE,
+    EquipType.EYE)
+_STAR_FORCE_SLOTS = tuple(slot for slot in _POTENTIAL_SLOTS
+                          if slot not in (EquipType.SECONDARY,
+                                          EquipType.EMBLEM))
+_FLAME_SLOTS = (
+    EquipType.HAT, EquipType.TOP, EquipType.BOTTOM, EquipType.SHOE,
+    EquipType.GLOVE, EquipType.CAPE, EquipType.BELT, EquipType.PENDANT_1,
+    EquipType.PENDANT_2, EquipType.EARRING, EquipType.FACE, EquipType.EYE,
+    EquipType.POCKET)
+
+_MAIN_STATS = (Stat.PCT_STR, Stat.PCT_DEX, Stat.PCT_INT, Stat.PCT_LUK)
+"""Stats which % all stat lines count towards."""
+
+
+class UpgradeKind(MapleStatsEnum):
+    STAR_FORCE = auto()
+    CUBING = auto()
+    BONUS_CUBING = auto()
+    FLAMES = auto()
+
+
+class Upgrade(NamedTuple):
+    """One step of the roadmap."""
+    slot: EquipType
+    kind: UpgradeKind
+    target: Any
+    """Stars for star force, `{Stat: total}` for cubing and the expected
+    flame score (see `flames.flame_score`) for flames."""
+    expected_cost: float
+    damage_gain: float
+    """Expected increase of the ranked damage value, given every previous
+    step of the plan."""
+
+    @property
+    def gain_per_meso(self) -> float:
+        return self.damage_gain / self.expected_cost
+
+
+class _Step(NamedTuple):
+    slot: EquipType
+    kind: UpgradeKind
+    target: Any
+    cost: float
+    added: np.ndarray
+    removed: np.ndarray
+
+
+@lru_cache(maxsize=None)
+def _cubing_cost(equip_type: EquipType, cube_type: CubeType, stat: Stat,
+                 total: float, trials: int, seed: int) -> float:
+    return simulate_cubing(
+        Equip('', equip_type), {stat: total}, cube_type, trials=trials,
+        workers=1, seed=seed).expected_cost
+
+
+def _vector(items: Iterable[Tuple[Stat, Any]]) -> np.ndarray:
+    return StatVector.from_items(items).values
+
+
+class _SlotState:
+    """What the plan has done to a slot so far."""
+
+    __slots__ = ('equip', 'level', 'stars', 'potential', 'bonus_potential',
+                 'flame_score')
+
+    def __init__(self, equip: Equip, level: int, stars: int,
+                 flame_score: float):
+        self.equip = equip
+        self.level = level
+        self.stars = stars
+        self.potential: Iterable[Tuple[Stat, Any]] = equip.potential
+        self.bonus_potential: Iterable[Tuple[Stat, Any]] = (
+            equip.bonus_potential)
+        self.flame_score = flame_score
+
+
+class _Planner:
+
+    def __init__(self, character: Character, item_levels: Dict[EquipType, int],
+                 stars: Dict[EquipType, int], flame_type: FlameType, by: str,
+                 boss_pdr: float, replacement_cost: float,
+                 cubing_trials: int, seed: int, cache_dir: Optional[str]):
+        self.character = character
+        self.flame_type = flame_type
+        self.by = by
+        self.boss_pdr = boss_pdr
+        self.replacement_cost = replacement_cost
+        self.cubing_trials = cubing_trials
+        self.seed = seed
+        self.cache_dir = cache_dir
+        char_class = character.char_class
+        self.main_percent = char_class.main_stat.percent
+        self.attack_percent = char_class.attack_stat.percent
+
+        self.slots: Dict[EquipType, _SlotState] = {}
+        for slot, equip in character.equips.items():
+            if equip is None:
+                continue
+            level = item_levels.get(slot, DEFAULT_ITEM_LEVEL)
+            self.slots[slot] = _SlotState(
+                equip, level, stars.get(slot, 0),
+                flame_score(equip.bonus_stats, char_class)
+                if slot in _FLAME_SLOTS else 0.0)
+
+        self.stats = character.stat_vector.values.copy()
+        self.value = self._evaluate(self.stats[None])[0]
+        self.version = 0
+        self.steps: Dict[Tuple[EquipType, UpgradeKind], _Step] = {}
+        self.heap: List[Tuple[float, int, _Step, int, float]] = []
+        self.parked: List[_Step] = []
+        self.sequence = counter()
+
+    def _evaluate(self, rows: np.ndarray) -> np.ndarray:
+        return getattr(evaluate_builds(
+            rows, self.character.char_class, self.character.level,
+            world=self.character.world, boss_pdr=self.boss_pdr), self.by)
+
+    def _gains(self, steps: List[_Step]) -> np.ndarray:
+        rows = apply_deltas(self.stats[None],
+                            np.stack([step.added for step in steps]),
+                            np.stack([step.removed for step in steps]))
+        return self._evaluate(rows) - self.value
+
+    def _push(self, step: _Step, gain: float, version: int) -> None:
+        heapq.heappush(self.heap, (-gain / step.cost, next(self.sequence),
+                                   step, version, gain))
+
+    # Next step of every kind, or None if there is none worth planning.
+
+    def _star_force(self, slot: EquipType, state: _SlotState
+                    ) -> Optional[_Step]:
+        limit = min(max_stars(state.level), STAR_TARGETS[-1])
+        target = next((stars for stars in STAR_TARGETS
+                       if state.stars < stars <= limit), None)
+        if target is None:
+            return None
+        cost = star_force_estimate(
+            state.level, state.stars, target,
+            replacement_cost=self.replacement_cost).expected_cost
+        base_attack = state.equip.base_stats.get(
+            self.character.char_class.attack_stat, 0)
+
+        def _gains(stars: int) -> np.ndarray:
+            return _vector(star_force_stats(
+                slot, state.level, stars, base_attack).items())
+
+        return _Step(slot, UpgradeKind.STAR_FORCE, target, cost,
+                     _gains(target), _gains(state.stars))
+
+    def _cubing(self, slot: EquipType, state: _SlotState,
+                kind: UpgradeKind) -> Optional[_Step]:
+        bonus = kind == UpgradeKind.BONUS_CUBING
+        lines = state.bonus_potential if bonus else state.potential
+        stat = self.attack_percent if slot in WSE else self.main_percent
+        current = sum(value for line_stat, value in lines
+                      if line_stat == stat or (
+                          line_stat == Stat.PCT_ALL and stat in _MAIN_STATS))
+        targets = BONUS_POTENTIAL_TARGETS if bonus else POTENTIAL_TARGETS
+        target = next((total for total in targets if total > current), None)
+        if target is None:
+            return None
+        cost = _cubing_cost(
+            slot, CubeType.BONUS if bonus else CubeType.RED, stat, target,
+            self.cubing_trials, self.seed)
+        if not np.isfinite(cost):
+            return None
+        # Cubing rerolls every line, so the step is valued as exactly the
+        # target replacing all current lines.
+        return _Step(slot, kind, {stat: target}, cost,
+                     _vector([(stat, target)]), _vector(lines))
+
+    def _flames(self, slot: EquipType, state: _SlotState) -> Optional[_Step]:
+        improved = expected_improved_score(
+            state.flame_score, state.level, self.character.char_class,
+            self.flame_type, cache_dir=self.cache_dir)
+        gain = improved - state.flame_score
+        if gain <= 0:
+            return None
+        added = np.zeros(NUM_STATS)
+        # Scores are in main stat equivalents.
+        added[STAT_INDEX[self.character.char_class.main_stat]] = gain
+        rerolls = 1 / float(beat_probability(
+            state.flame_score, state.level, self.character.char_class,
+            self.flame_type, cache_dir=self.cache_dir))
+        return _Step(slot, UpgradeKind.FLAMES, improved,
+                     rerolls * FLAME_COSTS[self.flame_type], added,
+                     np.zeros(NUM_STATS))
+
+    def _next_step(self, slot: EquipType, kind: UpgradeKind
+                   ) -> Optional[_Step]:
+        state = self.slots[slot]
+        if kind == UpgradeKind.STAR_FORCE:
+            return self._star_force(slot, state)
+        if kind == UpgradeKind.FLAMES:
+            return self._flames(slot, state)
+        return self._cubing(slot, state, kind)
+
+    def _kinds(self, slot: EquipType) -> List[UpgradeKind]:
+        kinds = []
+        if slot in _STAR_FORCE_SLOTS:
+            kinds.append(UpgradeKind.STAR_FORCE)
+        if slot in _POTENTIAL_SLOTS:
+            kinds += [UpgradeKind.CUBING, UpgradeKind.BONUS_CUBING]
+        if slot in _FLAME_SLOTS:
+            kinds.append(UpgradeKind.FLAMES)
+        return kinds
+
+    def _accept(self, step: _Step) -> None:
+        state = self.slots[step.slot]
+        if step.kind == UpgradeKind.STAR_FORCE:
+            state.stars = step.target
+        elif step.kind == UpgradeKind.CUBING:
+            state.potential = list(step.target.items())
+        elif step.kind == UpgradeKind.BONUS_CUBING:
+            state.bonus_potential = list(step.target.items())
+        else:
+            state.flame_score = step.target
+
+        self.stats = apply_deltas(self.stats, step.added, step.removed)
+        self.value = self._evaluate(self.stats[None])[0]
+        self.version += 1
+
+        next_step = self._next_step(step.slot, step.kind)
+        if next_step is not None:
+            self.steps[step.slot, step.kind] = next_step
+            self._push(next_step, self._gains([next_step])[0], self.version)
+        else:
+            del self.steps[step.slot, step.kind]
+        # Steps without gain may gain now that the stats changed.
+        for parked in self.parked:
+            self._push(parked, 0.0, -1)
+        self.parked = []
+
+    def plan(self, count: int) -> List[Upgrade]:
+        for slot in self.slots:
+            for kind in self._kinds(slot):
+                step = self._next_step(slot, kind)
+                if step is not None:
+                    self.steps[slot, kind] = step
+        steps = list(self.steps.values())
+        if steps:
+            for step, gain in zip(steps, self._gains(steps)):
+                self._push(step, gain, self.version)
+
+        upgrades = []
+        while self.heap and len(upgrades) < count:
+            _, _, step, version, gain = heapq.heappop(self.heap)
+            if self.steps.get((step.slot, step.kind)) is not step:
+                continue
+            if version != self.version:
+                self._push(step, self._gains([step])[0], self.version)
+                continue
+            if gain <= 0:
+                self.parked.append(step)
+                continue
+            upgrades.append(Upgrade(step.slot, step.kind, step.target,
+                                    step.cost, float(gain)))
+            self._accept(step)
+        return upgrades
+
+
+def plan_upgrades(
+        character: Character,
+        count: int = 10,
+        item_levels: Optional[Dict[Union[EquipType, str], int]] = None,
+        stars: Optional[Dict[Union[EquipType, str], int]] = None,
+        flame_type: Union[FlameType, str] = FlameType.POWERFUL,
+        by: str = 'ied_damage',
+        boss_pdr: float = DEFAULT_BOSS_PDR,
+        replacement_cost: float = 0,
+        cubing_trials: int = DEFAULT_CUBING_TRIALS,
+        seed: int = 0,
+        cache_dir: Optional[str] = None,
+) -> List[Upgrade]:
+    """Next `count` upgrades of `character`, best expected gain per meso
+    first. Each upgrade assumes the previous ones were done.
+
+    Args:
+        character: Character to upgrade. It is not modified.
+        count: Number of upgrades planned.
+        item_levels: Level of the equip in every slot.
+        stars: Current stars of the equip in every slot.
+        flame_type: Flames used on armor.
+        by: Field of `BuildEvaluation` gained, e.g. 'boss_damage'.
+        boss_pdr: Boss defense used for `ied_damage`.
+        replacement_cost: Mesos spent to replace an equip destroyed by star
+            force.
+        cubing_trials: Simulated cubes per cubing estimate.
+        seed: Seed of the cubing simulations.
+        cache_dir: Directory of flame tables on disk, see
+            `flames.flame_table`.
+    """
+    return _Planner(
+        character,
+        {EquipType.maybe_parse(slot): level
+         for slot, level in (item_levels or {}).items()},
+        {EquipType.maybe_parse(slot): value
+         for slot, value in (stars or {}).items()},
+        FlameType.maybe_parse(flame_type), by, boss_pdr, replacement_cost,
+        cubing_trials, seed, cache_dir).plan(count)
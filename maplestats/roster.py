@@ -0,0 +1,190 @@
+"""Evaluation of a whole roster of saved characters across processes.
+
+Characters are read by the workers themselves, from a directory of saved files
+or from a `RosterStore`, in chunks. Each chunk is evaluated in batches of
+builds of the same class and world, and comes back as a few NumPy arrays
+instead of pickled characters.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import (
+    Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union)
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.enums import Class, World
+from maplestats.evaluation import batch_stat_equivalences, evaluate_builds
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.roster_store import RosterStore
+from maplestats.stat_vector import NUM_STATS
+
+DEFAULT_CHUNK_SIZE = 256
+
+SAVED_CHARACTER_EXTENSIONS = ('.json', '.mstb')
+
+PROGRESS_TYPING = Callable[[int, int], None]
+"""Called with the number of characters done and the total."""
+
+_NO_WORLD = 0
+
+
+class RosterResults(NamedTuple):
+    """Evaluation of N characters, one row per character."""
+    names: List[str]
+    classes: np.ndarray
+    """`Class` values."""
+    worlds: np.ndarray
+    """`World` values, or 0 for characters without a world."""
+    levels: np.ndarray
+    stats: np.ndarray
+    """(N x NUM_STATS) stats from equips and link skills."""
+    stat_range: np.ndarray
+    boss_damage: np.ndarray
+    ied_damage: np.ndarray
+    equivalences: np.ndarray
+    """(N x NUM_STATS) value of every stat in % main stat."""
+
+    def top_k(self, k: int, by: str = 'ied_damage',
+              group: str = 'class') -> Dict[Union[Class, World],
+                                            List[Tuple[str, float]]]:
+        """Best `k` characters of every class or world.
+
+        Args:
+            k: Characters kept per group.
+            by: Field ranked on, e.g. 'boss_damage'.
+            group: 'class' or 'world'. Characters without a world are left
+                out of world rankings.
+        """
+        assert group in ('class', 'world'), 'Group by class or world'
+        values = getattr(self, by)
+        keys = self.classes if group == 'class' else self.worlds
+        enum_class = Class if group == 'class' else World
+
+        rankings = {}
+        for key in np.unique(keys):
+            if key == _NO_WORLD and group == 'world':
+                continue
+            members = np.flatnonzero(keys == key)
+            best = members[np.argsort(-values[members], kind='stable')[:k]]
+            rankings[enum_class(int(key))] = [
+                (self.names[idx], float(values[idx])) for idx in best]
+        return rankings
+
+
+def _load_characters(source: str, keys: List[str]) -> Iterable[Character]:
+    if os.path.isdir(source):
+        for file_name in keys:
+            yield Character.from_file(os.path.join(source, file_name))
+    else:
+        with _open_store(source) as store:
+            yield from store.load_many(keys)
+
+
+def _open_store(source: str) -> RosterStore:
+    """The roster store at `source`, which must exist: connecting to a
+    missing database would create an empty one.
+    """
+    if not os.path.exists(source):
+        raise FileNotFoundError(f'No roster directory or store at {source}')
+    return RosterStore(source)
+
+
+def _evaluate_chunk(source: str, keys: List[str], boss_pdr: float
+                    ) -> RosterResults:
+    # Characters removed from a store since its names were listed are left
+    # out, so there may be fewer rows than keys.
+    characters = list(_load_characters(source, keys))
+    count = len(characters)
+    names = []
+    stats = np.zeros((count, NUM_STATS))
+    classes = np.zeros(count, dtype=np.int16)
+    worlds = np.zeros(count, dtype=np.int8)
+    levels = np.zeros(count, dtype=np.int16)
+    for idx, character in enumerate(characters):
+        names.append(character.name)
+        stats[idx] = character.stat_vector.values
+        classes[idx] = character.char_class.value
+        worlds[idx] = character.world.value if character.world else _NO_WORLD
+        levels[idx] = character.level
+
+    evaluation = np.zeros((3, count))
+    equivalences = np.zeros((count, NUM_STATS))
+    groups = np.stack([classes, worlds], axis=1)
+    for char_class, world in np.unique(groups, axis=0):
+        members = np.flatnonzero((classes == char_class) & (worlds == world))
+        kwargs = dict(
+            char_class=Class(int(char_class)),
+            level=levels[members],
+            world=World(int(world)) if world != _NO_WORLD else None,
+            boss_pdr=boss_pdr)
+        evaluation[:, members] = evaluate_builds(stats[members], **kwargs)
+        equivalences[members] = batch_stat_equivalences(
+            stats[members], **kwargs)
+
+    return RosterResults(names, classes, worlds, levels, stats, *evaluation,
+                         equivalences)
+
+
+def _concatenate(results: List[RosterResults]) -> RosterResults:
+    return RosterResults(
+        [name for result in results for name in result.names],
+        *(np.concatenate([getattr(result, field) for result in results])
+          for field in RosterResults._fields[1:]))
+
+
+def roster_keys(source: str) -> List[str]:
+    """Saved character files of a directory, or names in a roster store."""
+    if os.path.isdir(source):
+        return sorted(
+            file_name for file_name in os.listdir(source)
+            if file_name.endswith(SAVED_CHARACTER_EXTENSIONS))
+    with _open_store(source) as store:
+        return store.names()
+
+
+def evaluate_roster(
+        source: str,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        boss_pdr: float = DEFAULT_BOSS_PDR,
+        progress: Optional[PROGRESS_TYPING] = None,
+) -> RosterResults:
+    """Evaluate every character of a roster.
+
+    Args:
+        source: Directory of saved characters (.json or .mstb) or path of a
+            `RosterStore` database.
+        workers: Number of processes. 1 evaluates in this process, None uses
+            one process per CPU.
+        chunk_size: Characters loaded and evaluated together by a worker.
+        boss_pdr: Boss defense used for IED-adjusted damage.
+        progress: Called after every chunk.
+    """
+    keys = roster_keys(source)
+    chunks = [keys[start:start + chunk_size]
+              for start in range(0, len(keys), chunk_size)]
+    if not chunks:
+        return _evaluate_chunk(source, [], boss_pdr)
+    results: List[Optional[RosterResults]] = [None] * len(chunks)
+    done = 0
+
+    def _finish(idx: int, result: RosterResults) -> None:
+        nonlocal done
+        results[idx] = result
+        done += len(chunks[idx])
+        if progress:
+            progress(done, len(keys))
+
+    if workers == 1:
+        for idx, chunk in enumerate(chunks):
+            _finish(idx, _evaluate_chunk(source, chunk, boss_pdr))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_evaluate_chunk, source, chunk, boss_pdr): idx
+                for idx, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                _finish(futures[future], future.result())
+
+    return _concatenate(results)
@@ -0,0 +1,339 @@
+"""Roster of characters stored in a single SQLite database.
+
+Characters, equips and potential lines live in separate tables, and characters
+are indexed by world, class and level so filtered queries do not scan the whole
+roster. Characters are read in pages with their link skills. Equips are
+rehydrated lazily: the first time the equips of a character are needed, those
+of its whole page are read together, a few queries per page rather than per
+character.
+"""
+import sqlite3
+import weakref
+from functools import partial
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union)
+
+from maplestats.character import Character
+from maplestats.enums import (
+    Class, EquipType, Stat, World, FLOAT_VALUED_STATS)
+from maplestats.equipment import Equip
+from maplestats.instrumentation import timed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    level INTEGER NOT NULL,
+    class TEXT NOT NULL,
+    world TEXT
+);
+CREATE INDEX IF NOT EXISTS characters_by_world
+    ON characters (world, class, level);
+CREATE INDEX IF NOT EXISTS characters_by_class ON characters (class, level);
+CREATE INDEX IF NOT EXISTS characters_by_level ON characters (level);
+
+CREATE TABLE IF NOT EXISTS link_skills (
+    character_id INTEGER NOT NULL
+        REFERENCES characters (id) ON DELETE CASCADE,
+    class TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    PRIMARY KEY (character_id, class)
+);
+
+CREATE TABLE IF NOT EXISTS equips (
+    id INTEGER PRIMARY KEY,
+    character_id INTEGER NOT NULL
+        REFERENCES characters (id) ON DELETE CASCADE,
+    slot TEXT NOT NULL,
+    name TEXT NOT NULL,
+    equip_type TEXT NOT NULL,
+    UNIQUE (character_id, slot)
+);
+
+CREATE TABLE IF NOT EXISTS equip_stats (
+    equip_id INTEGER NOT NULL REFERENCES equips (id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (equip_id, source, stat)
+);
+
+CREATE TABLE IF NOT EXISTS potential_lines (
+    equip_id INTEGER NOT NULL REFERENCES equips (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    stat TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (equip_id, kind, position)
+);
+"""
+
+_STAT_SOURCES = ('base_stats', 'scroll_stats')
+_LINE_KINDS = ('potential', 'bonus_potential', 'bonus_stats')
+
+_BATCH_SIZE = 256
+"""Characters read together in one page, well below SQLite's limit of 999
+query parameters."""
+
+_CHARACTER_COLUMNS = 'id, name, level, class, world'
+
+
+def _stat_value(stat: Stat, value: float) -> Any:
+    return value if stat in FLOAT_VALUED_STATS else int(value)
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ', '.join('?' * len(values))
+
+
+class _EquipsPage:
+    """Equips of a page of characters, read together the first time any of
+    them is needed.
+    """
+
+    def __init__(self, store: 'RosterStore', character_ids: List[int]):
+        self._store: Optional[RosterStore] = store
+        self._character_ids = character_ids
+        self._equips: Dict[int, Dict[EquipType, Equip]] = {}
+
+    def load(self) -> None:
+        if self._store is not None:
+            with timed('RosterStore.load_equips'):
+                # pylint: disable=protected-access
+                self._equips = self._store._load_equips(self._character_ids)
+            self._store = None
+
+    def equips(self, character_id: int) -> Dict[EquipType, Equip]:
+        """Loader of the equips of one character, called at most once."""
+        self.load()
+        return self._equips.pop(character_id)
+
+
+class RosterStore:
+    """SQLite-backed roster of characters.
+
+    Example:
+        with RosterStore('roster.db') as store:
+            store.upsert_many(characters)
+            for char in store.query(world=World.REBOOT,
+                                    char_class=Class.BUCCANEER,
+                                    min_level=250):
+                print(char.name, char.level)
+    """
+
+    def __init__(self, path: str = 'roster.db'):
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(_SCHEMA)
+        # Pages whose equips were not read yet, while their characters live.
+        self._pages: 'weakref.WeakSet[_EquipsPage]' = weakref.WeakSet()
+
+    def __enter__(self) -> 'RosterStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database. Equips not read yet are read first, so loaded
+        characters outlive the store.
+        """
+        for page in list(self._pages):
+            page.load()
+        self._connection.close()
+
+    def upsert(self, character: Character) -> None:
+        self.upsert_many([character])
+
+    def upsert_many(self, characters: Iterable[Character]) -> None:
+        """Insert or replace characters by name in a single transaction."""
+        with self._connection:
+            for character in characters:
+                self._upsert(character)
+
+    def _upsert(self, character: Character) -> None:
+        # UPDATE then INSERT rather than an upsert with RETURNING, which
+        # needs SQLite 3.35.
+        fields = (character.level, character.char_class.name,
+                  character.world.name if character.world else None,
+                  character.name)
+        cursor = self._connection.execute(
+            'UPDATE characters SET level = ?, class = ?, world = ? '
+            'WHERE name = ?', fields)
+        if cursor.rowcount:
+            character_id = self._connection.execute(
+                'SELECT id FROM characters WHERE name = ?',
+                (character.name,)).fetchone()[0]
+        else:
+            character_id = self._connection.execute(
+                'INSERT INTO characters (level, class, world, name) '
+                'VALUES (?, ?, ?, ?)', fields).lastrowid
+
+        self._connection.execute(
+            'DELETE FROM link_skills WHERE character_id = ?', (character_id,))
+        self._connection.executemany(
+            'INSERT INTO link_skills (character_id, class, level) '
+            'VALUES (?, ?, ?)',
+            [(character_id, char_class.name, level)
+             for char_class, level in character.link_skills.items()])
+
+        self._connection.execute(
+            'DELETE FROM equips WHERE character_id = ?', (character_id,))
+        for slot, equip in character.equips.items():
+            if equip is not None:
+                self._insert_equip(character_id, slot, equip)
+
+    def _insert_equip(self, character_id: int, slot: EquipType,
+                      equip: Equip) -> None:
+        cursor = self._connection.execute(
+            'INSERT INTO equips (character_id, slot, name, equip_type) '
+            'VALUES (?, ?, ?, ?)',
+            (character_id, slot.name, equip.name, equip.equip_type.name))
+        equip_id = cursor.lastrowid
+
+        self._connection.executemany(
+            'INSERT INTO equip_stats (equip_id, source, stat, value) '
+            'VALUES (?, ?, ?, ?)',
+            [(equip_id, source, Stat.maybe_parse(stat).name, value)
+             for source in _STAT_SOURCES
+             for stat, value in getattr(equip, source).items()])
+        self._connection.executemany(
+            'INSERT INTO potential_lines '
+            '(equip_id, kind, position, stat, value) VALUES (?, ?, ?, ?, ?)',
+            [(equip_id, kind, position, Stat.maybe_parse(stat).name, value)
+             for kind in _LINE_KINDS
+             for position, (stat, value) in enumerate(getattr(equip, kind))])
+
+    def delete(self, name: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                'DELETE FROM characters WHERE name = ?', (name,))
+
+    def _where(self, world: Optional[World], char_class: Optional[Class],
+               min_level: Optional[int], max_level: Optional[int]
+               ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if world:
+            clauses.append('world = ?')
+            params.append(World.maybe_parse(world).name)
+        if char_class:
+            clauses.append('class = ?')
+            params.append(Class.maybe_parse(char_class).name)
+        if min_level is not None:
+            clauses.append('level >= ?')
+            params.append(min_level)
+        if max_level is not None:
+            clauses.append('level <= ?')
+            params.append(max_level)
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        return where, params
+
+    def count(self, world: Union[World, str] = None,
+              char_class: Union[Class, str] = None,
+              min_level: Optional[int] = None,
+              max_level: Optional[int] = None) -> int:
+        where, params = self._where(world, char_class, min_level, max_level)
+        return self._connection.execute(
+            f'SELECT COUNT(*) FROM characters{where}', params).fetchone()[0]
+
+    def names(self, world: Union[World, str] = None,
+              char_class: Union[Class, str] = None,
+              min_level: Optional[int] = None,
+              max_level: Optional[int] = None) -> List[str]:
+        """Names of matching characters, ordered by name."""
+        where, params = self._where(world, char_class, min_level, max_level)
+        return [name for name, in self._connection.execute(
+            f'SELECT name FROM characters{where} ORDER BY name', params)]
+
+    def query(self, world: Union[World, str] = None,
+              char_class: Union[Class, str] = None,
+              min_level: Optional[int] = None,
+              max_level: Optional[int] = None) -> Iterator[Character]:
+        """Yield matching characters ordered by name. They are read in
+        pages, so the roster is never held in memory at once.
+        """
+        where, params = self._where(world, char_class, min_level, max_level)
+        cursor = self._connection.execute(
+            f'SELECT {_CHARACTER_COLUMNS} FROM characters{where} '
+            'ORDER BY name', params)
+        while True:
+            rows = cursor.fetchmany(_BATCH_SIZE)
+            if not rows:
+                return
+            yield from self._characters(rows)
+
+    def load(self, name: str) -> Optional[Character]:
+        row = self._connection.execute(
+            f'SELECT {_CHARACTER_COLUMNS} FROM characters WHERE name = ?',
+            (name,)).fetchone()
+        return self._characters([row])[0] if row else None
+
+    def load_many(self, names: Iterable[str]) -> List[Character]:
+        """Characters of `names` in that order, read in pages. Missing names
+        are left out.
+        """
+        names = list(names)
+        characters = []
+        for start in range(0, len(names), _BATCH_SIZE):
+            page = names[start:start + _BATCH_SIZE]
+            rows = {row[1]: row for row in self._connection.execute(
+                f'SELECT {_CHARACTER_COLUMNS} FROM characters '
+                f'WHERE name IN ({_placeholders(page)})', page)}
+            characters += self._characters(
+                [rows[name] for name in page if name in rows])
+        return characters
+
+    def _characters(self, rows: List[Tuple[int, str, int, str, Optional[str]]]
+                    ) -> List[Character]:
+        """Characters of a page of rows of the characters table. Link skills
+        are read now and equips on first use.
+        """
+        character_ids = [row[0] for row in rows]
+        link_skills: Dict[int, Dict[str, int]] = {row[0]: {} for row in rows}
+        for character_id, char_class, level in self._connection.execute(
+                'SELECT character_id, class, level FROM link_skills '
+                f'WHERE character_id IN ({_placeholders(character_ids)})',
+                character_ids):
+            link_skills[character_id][char_class] = level
+        page = _EquipsPage(self, character_ids)
+        self._pages.add(page)
+        return [Character(
+            name=name, level=level, character_class=char_class, world=world,
+            link_skills=link_skills[character_id],
+            equips=partial(page.equips, character_id))
+            for character_id, name, level, char_class, world in rows]
+
+    def _load_equips(self, character_ids: List[int]
+                     ) -> Dict[int, Dict[EquipType, Equip]]:
+        """Equips by slot of every character of a page."""
+        in_page = f'character_id IN ({_placeholders(character_ids)})'
+        equip_rows = self._connection.execute(
+            'SELECT id, character_id, slot, name, equip_type FROM equips '
+            f'WHERE {in_page}', character_ids).fetchall()
+        fields: Dict[int, Dict[str, Any]] = {
+            equip_id: {
+                'name': name,
+                'equip_type': equip_type,
+                **{source: {} for source in _STAT_SOURCES},
+                **{kind: [] for kind in _LINE_KINDS},
+            } for equip_id, _, _, name, equip_type in equip_rows}
+
+        for equip_id, source, stat, value in self._connection.execute(
+                'SELECT equip_id, source, stat, value FROM equip_stats '
+                f'JOIN equips ON equips.id = equip_id WHERE {in_page}',
+                character_ids):
+            stat = Stat[stat]
+            fields[equip_id][source][stat] = _stat_value(stat, value)
+
+        for equip_id, kind, stat, value in self._connection.execute(
+                'SELECT equip_id, kind, stat, value FROM potential_lines '
+                f'JOIN equips ON equips.id = equip_id WHERE {in_page} '
+                'ORDER BY equip_id, kind, position', character_ids):
+            stat = Stat[stat]
+            fields[equip_id][kind].append((stat, _stat_value(stat, value)))
+
+        equips: Dict[int, Dict[EquipType, Equip]] = {
+            character_id: {} for character_id in character_ids}
+        for equip_id, character_id, slot, _, _ in equip_rows:
+            equips[character_id][EquipType[slot]] = Equip(**fields[equip_id])
+        return equips
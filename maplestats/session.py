@@ -5,14 +5,49 @@ also imported.
 
 This module is intended to be imported into a console with:
     from maplestats.session import *
+
+The character is read from a parsed snapshot while its file is unchanged, and
+heavier modules such as `optimizer` are only imported when first used. The time
+spent here is kept in `startup_seconds`; `measure_startup()` times a fresh
+interpreter.
 """
-from maplestats.session_utils import load_last_modified
+import time
+
+_start = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import importlib.util
+import sys
+from types import ModuleType
+
+from maplestats.session_utils import load_last_modified, measure_startup
 
 # Useful enums
 # pylint: disable=unused-import
 from maplestats.enums import World, Stat, Class, EquipType, WeaponType
 
 
+def _lazy_import(name: str) -> ModuleType:
+    """Module which is only executed on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Useful modules, imported on first use
+link_optimizer = _lazy_import('maplestats.link_optimizer')
+optimizer = _lazy_import('maplestats.optimizer')
+roster_store = _lazy_import('maplestats.roster_store')
+streaming = _lazy_import('maplestats.streaming')
+
+
 me = load_last_modified()
 if me:
     print(f'Welcome, {me.name}!')
+
+startup_seconds = time.perf_counter() - _start
@@ -1,14 +1,88 @@
+import json
 import os
+import sys
 from typing import Optional
 
 from maplestats.character import Character, LAST_MODIFIED_FILE_NAME
 
+SESSION_CACHE_FILE_NAME = ".sessioncache"
+"""Parsed snapshot of the last modified character, in the binary format."""
 
-def load_last_modified() -> Optional[Character]:
+
+def _source_key(file_path: str) -> bytes:
+    """Identifies the current version of a saved character."""
+    status = os.stat(file_path)
+    return json.dumps({
+        'path': os.path.abspath(file_path),
+        'mtime_ns': status.st_mtime_ns,
+        'size': status.st_size,
+    }).encode('utf-8')
+
+
+def _load_snapshot(key: bytes) -> Optional[Character]:
+    if not os.path.isfile(SESSION_CACHE_FILE_NAME):
+        return None
+
+    with open(SESSION_CACHE_FILE_NAME, 'rb') as f:
+        cached_key, _, data = f.read().partition(b'\n')
+    if cached_key != key:
+        return None
+
+    from maplestats import binary
+
+    try:
+        return binary.loads(data)
+    except Exception:  # pylint: disable=broad-except
+        # Truncated, or written by another version: rebuilt by the caller.
+        return None
+
+
+def _write_snapshot(key: bytes, character: Character) -> None:
+    from maplestats import binary
+
+    with open(SESSION_CACHE_FILE_NAME, 'wb') as f:
+        f.write(key + b'\n' + binary.dumps(character))
+
+
+def load_last_modified(use_cache: bool = True) -> Optional[Character]:
+    """Load the last saved character.
+
+    Args:
+        use_cache: If True, the character is read from a snapshot which is
+            rebuilt whenever its file is modified.
+    """
     if not os.path.isfile(LAST_MODIFIED_FILE_NAME):
         return None
 
     with open(LAST_MODIFIED_FILE_NAME, 'r') as f:
         json_file = f.read()
 
-    return Character.from_file(json_file) if os.path.isfile(json_file) else None
+    if not os.path.isfile(json_file):
+        return None
+    if not use_cache:
+        return Character.from_file(json_file)
+
+    key = _source_key(json_file)
+    character = _load_snapshot(key)
+    if character is None:
+        character = Character.from_file(json_file)
+        _write_snapshot(key, character)
+    return character
+
+
+def measure_startup(runs: int = 5) -> float:
+    """Best time in seconds to import `maplestats.session` in a fresh
+    interpreter from the current directory, including loading the character.
+    """
+    import subprocess
+
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [package_root, env.get('PYTHONPATH')]))
+    code = ('import time; start = time.perf_counter(); '
+            'import maplestats.session; '
+            'print(time.perf_counter() - start)')
+    return min(float(subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True,
+        text=True, env=env).stdout.split()[-1]) for _ in range(runs))
@@ -0,0 +1,371 @@
+"""Star force costs, solved exactly as an absorbing Markov chain.
+
+A state is the current star together with the number of consecutive drops
+(chance time: after two drops in a row the next attempt always succeeds).
+Success moves up a star. Failure keeps the star up to 10 stars and at 15 and 20
+stars, and drops a star otherwise. A destroyed equip is replaced and restarts
+at 12 stars.
+
+Expected cost, booms and attempts are found with one linear solve each. The full
+cost distribution is found from the chain's generating function: evaluating it
+at the roots of unity is one batch of linear solves, and an inverse FFT turns
+the values into probabilities. `simulate_star_force` is a Monte Carlo check.
+
+Rates and costs follow GMS without events. Stat gains stop at 22 stars.
+"""
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from maplestats.enums import EquipType, Stat, WSE
+
+SUCCESS_RATES: Tuple[float, ...] = (
+    0.95, 0.9, 0.85, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6, 0.55, 0.5, 0.45, 0.4,
+    0.35, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.03, 0.02, 0.01)
+"""Chance to gain a star, by current star."""
+
+DESTROY_RATES: Dict[int, float] = {
+    15: 0.021, 16: 0.021, 17: 0.021, 18: 0.028, 19: 0.028, 20: 0.07,
+    21: 0.07, 22: 0.194, 23: 0.294, 24: 0.396}
+"""Chance to destroy the equip, by current star."""
+
+SAFETY_STARS = (15, 20)
+"""Stars above 10 which are kept on failure."""
+
+BOOM_STAR = 12
+"""Star of a destroyed equip once it is replaced."""
+
+STAR_CATCH_MULTIPLIER = 1.05
+
+_CHANCE_TIME_DROPS = 2
+
+_MAX_STARS_BY_LEVEL: Tuple[Tuple[int, int], ...] = (
+    (95, 5), (108, 8), (118, 10), (128, 15), (138, 20))
+"""Maximum stars of equips below each level. Higher levels allow 25."""
+
+_STAT_BY_LEVEL: Tuple[Tuple[int, int], ...] = (
+    (128, 0), (138, 7), (148, 9), (158, 11), (198, 13))
+"""Stat gained per star from 16 to 22 stars by equips below each level.
+Higher levels gain 15."""
+
+_ARMOR_ATTACK_BY_LEVEL: Tuple[Tuple[int, Tuple[int, ...]], ...] = (
+    (128, ()),
+    (138, (7, 8, 9, 10, 11)),
+    (148, (8, 9, 10, 11, 12, 13, 15)),
+    (158, (9, 10, 11, 12, 13, 15, 17)),
+    (198, (10, 11, 12, 13, 14, 16, 18)),
+)
+"""Attack gained per star from 16 to 22 stars by armor below each level."""
+_ARMOR_ATTACK_MAX_LEVEL = (12, 13, 14, 15, 16, 17, 19)
+
+_WEAPON_ATTACK_BY_LEVEL: Tuple[Tuple[int, Tuple[int, ...]], ...] = (
+    (128, ()),
+    (138, (6, 7, 7, 8, 9)),
+    (148, (7, 8, 8, 9, 10, 11, 12)),
+    (158, (8, 9, 9, 10, 11, 12, 13)),
+    (198, (9, 9, 10, 11, 12, 13, 14)),
+)
+"""Attack gained per star from 16 to 22 stars by weapons below each level."""
+_WEAPON_ATTACK_MAX_LEVEL = (13, 13, 14, 14, 15, 16, 17)
+
+
+def _by_level(table: Tuple[Tuple[int, Any], ...], level: int, default: Any
+              ) -> Any:
+    for below_level, value in table:
+        if level < below_level:
+            return value
+    return default
+
+
+def max_stars(level: int) -> int:
+    return _by_level(_MAX_STARS_BY_LEVEL, level, 25)
+
+
+def attempt_cost(level: int, star: int) -> int:
+    """Mesos spent on one attempt from `star`, rounded to the nearest 100."""
+    if star < 10:
+        cost = 1000 + level ** 3 * (star + 1) / 25
+    else:
+        divisor = {10: 400, 11: 220, 12: 150, 13: 110, 14: 75}.get(star, 200)
+        cost = 1000 + level ** 3 * (star + 1) ** 2.7 / divisor
+    return int(round(cost, -2))
+
+
+class StarStep(NamedTuple):
+    """Outcomes of one attempt from a star."""
+    cost: int
+    success: float
+    destroy: float
+    fail: float
+    fail_star: int
+    """Star reached on failure."""
+
+
+@lru_cache(maxsize=None)
+def star_step(level: int, star: int, star_catch: bool = False) -> StarStep:
+    """Transition table of one attempt, memoized per level and star."""
+    success = SUCCESS_RATES[star]
+    destroy = DESTROY_RATES.get(star, 0.0)
+    if star_catch:
+        boosted = min(1.0, success * STAR_CATCH_MULTIPLIER)
+        # Failure and destruction shrink in proportion.
+        destroy *= (1 - boosted) / (1 - success)
+        success = boosted
+    keeps = star <= 10 or star in SAFETY_STARS
+    return StarStep(
+        cost=attempt_cost(level, star), success=success, destroy=destroy,
+        fail=1 - success - destroy, fail_star=star if keeps else star - 1)
+
+
+class _Chain(NamedTuple):
+    """Transient states of the chain, with `n` states."""
+    states: Tuple[Tuple[int, int], ...]
+    """(star, consecutive drops) of every state."""
+    moves: np.ndarray
+    """(n x n) probability of moving between states without a boom."""
+    booms: np.ndarray
+    """(n x n) probability of moving between states through a boom."""
+    done: np.ndarray
+    """Probability of reaching the target from every state."""
+    costs: np.ndarray
+    """Cost of an attempt from every state."""
+
+
+@lru_cache(maxsize=None)
+def _chain(level: int, start: int, target: int, star_catch: bool) -> _Chain:
+    assert 0 <= start < target <= max_stars(level), (
+        f'Stars must go up within {max_stars(level)} stars')
+
+    transitions: Dict[Tuple[int, int], Dict[Tuple[Tuple[int, int], bool],
+                                            float]] = {}
+    pending = [(start, 0)]
+    while pending:
+        state = pending.pop()
+        if state in transitions:
+            continue
+        star, drops = state
+        step = star_step(level, star, star_catch)
+        outcomes: Dict[Tuple[Tuple[int, int], bool], float] = {}
+
+        def _add(next_star: int, next_drops: int, boom: bool, p: float
+                 ) -> None:
+            if p <= 0 or next_star >= target:
+                return
+            key = ((next_star, next_drops), boom)
+            outcomes[key] = outcomes.get(key, 0.0) + p
+            pending.append(key[0])
+
+        if drops >= _CHANCE_TIME_DROPS:
+            _add(star + 1, 0, False, 1.0)
+        else:
+            _add(star + 1, 0, False, step.success)
+            dropped = step.fail_star < star
+            _add(step.fail_star, drops + 1 if dropped else 0, False,
+                 step.fail)
+            _add(BOOM_STAR, 0, True, step.destroy)
+        transitions[state] = outcomes
+
+    states = tuple(sorted(transitions))
+    index = {state: idx for idx, state in enumerate(states)}
+    moves = np.zeros((len(states), len(states)))
+    booms = np.zeros((len(states), len(states)))
+    for state, outcomes in transitions.items():
+        for (next_state, boom), p in outcomes.items():
+            (booms if boom else moves)[index[state], index[next_state]] += p
+
+    costs = np.array([star_step(level, star, star_catch).cost
+                      for star, _ in states], dtype=float)
+    done = 1 - moves.sum(axis=1) - booms.sum(axis=1)
+    for array in (moves, booms, done, costs):
+        array.flags.writeable = False
+    return _Chain(states, moves, booms, done, costs)
+
+
+class StarForceEstimate(NamedTuple):
+    """Exact expectations of going from one star to another."""
+    expected_cost: float
+    expected_booms: float
+    expected_attempts: float
+    cost_std: float
+
+
+def star_force_estimate(
+        level: int, start: int, target: int, replacement_cost: float = 0,
+        star_catch: bool = False) -> StarForceEstimate:
+    """Expected mesos, booms and attempts to go from `start` to `target`
+    stars.
+
+    Args:
+        level: Level of the equip.
+        start: Current stars.
+        target: Stars to reach.
+        replacement_cost: Mesos spent to replace a destroyed equip.
+        star_catch: Whether every star catch is hit.
+    """
+    chain = _chain(level, start, target, star_catch)
+    system = np.eye(len(chain.states)) - chain.moves - chain.booms
+    boom_rates = chain.booms.sum(axis=1)
+    step_costs = chain.costs + replacement_cost * boom_rates
+
+    attempts, booms, cost = np.linalg.solve(
+        system, np.stack([np.ones(len(chain.states)), boom_rates, step_costs],
+                         axis=1)).T
+
+    # Second moment of the cost: each step adds its cost c to the rest C, and
+    # E[(c + C)^2] = c^2 + 2 c E[C] + E[C^2].
+    second_terms = chain.done * chain.costs ** 2
+    for moves, extra in ((chain.moves, 0), (chain.booms, replacement_cost)):
+        step = chain.costs[:, None] + extra
+        second_terms += (moves * (step ** 2 + 2 * step * cost[None])).sum(
+            axis=1)
+    second = np.linalg.solve(system, second_terms)
+
+    start_idx = chain.states.index((start, 0))
+    variance = max(0.0, second[start_idx] - cost[start_idx] ** 2)
+    return StarForceEstimate(
+        expected_cost=float(cost[start_idx]),
+        expected_booms=float(booms[start_idx]),
+        expected_attempts=float(attempts[start_idx]),
+        cost_std=float(np.sqrt(variance)))
+
+
+class CostDistribution(NamedTuple):
+    """Probability of the total cost falling in each bin."""
+    bin_edges: np.ndarray
+    """Lower edge of every bin, in mesos."""
+    probabilities: np.ndarray
+
+    def quantile(self, quantile: Union[float, np.ndarray]) -> np.ndarray:
+        """Mesos which are enough with probability `quantile`."""
+        cumulative = np.cumsum(self.probabilities)
+        idx = np.minimum(np.searchsorted(cumulative, quantile),
+                         len(self.bin_edges) - 1)
+        return self.bin_edges[idx] + (self.bin_edges[1] - self.bin_edges[0])
+
+
+def cost_distribution(
+        level: int, start: int, target: int, replacement_cost: float = 0,
+        star_catch: bool = False, bins: int = 4096,
+        max_cost: Optional[float] = None) -> CostDistribution:
+    """Distribution of the total mesos spent going from `start` to `target`.
+
+    Costs are split between neighbouring bins in proportion, so the mean of
+    the distribution is exact.
+
+    Args:
+        bins: Number of cost bins.
+        max_cost: Largest cost covered. Defaults to the mean plus 12 standard
+            deviations. Costs above it wrap around to the first bins.
+    """
+    chain = _chain(level, start, target, star_catch)
+    if max_cost is None:
+        estimate = star_force_estimate(
+            level, start, target, replacement_cost, star_catch)
+        max_cost = estimate.expected_cost + 12 * estimate.cost_std
+    bin_size = max_cost / bins
+
+    # z^cost for every frequency, with each cost split between two bins.
+    z = np.exp(-2j * np.pi * np.arange(bins) / bins)
+
+    def _z_cost(cost: np.ndarray) -> np.ndarray:
+        scaled = np.asarray(cost) / bin_size
+        whole = np.floor(scaled)
+        frac = scaled - whole
+        return z[:, None] ** whole * ((1 - frac) + frac * z[:, None])
+
+    attempt = _z_cost(chain.costs)
+    boom = _z_cost(chain.costs + replacement_cost)
+    system = np.eye(len(chain.states))[None] - (
+        attempt[:, :, None] * chain.moves[None]
+        + boom[:, :, None] * chain.booms[None])
+    generating = np.linalg.solve(system, (attempt * chain.done)[:, :, None])
+
+    start_idx = chain.states.index((start, 0))
+    probabilities = np.maximum(
+        np.fft.ifft(generating[:, start_idx, 0]).real, 0)
+    return CostDistribution(np.arange(bins) * bin_size,
+                            probabilities / probabilities.sum())
+
+
+def simulate_star_force(
+        level: int, start: int, target: int, trials: int = 100_000,
+        replacement_cost: float = 0, star_catch: bool = False,
+        seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Monte Carlo check of the chain: total cost and booms of every trial.
+    All unfinished trials attempt a star together.
+    """
+    rng = np.random.default_rng(seed)
+    steps = [star_step(level, star, star_catch) for star in range(target)]
+    success = np.array([step.success for step in steps])
+    destroy = np.array([step.destroy for step in steps])
+    fail_star = np.array([step.fail_star for step in steps])
+    costs = np.array([step.cost for step in steps], dtype=float)
+
+    stars = np.full(trials, start)
+    drops = np.zeros(trials, dtype=int)
+    total = np.zeros(trials)
+    booms = np.zeros(trials, dtype=int)
+    active = np.arange(trials)
+    while len(active):
+        star = stars[active]
+        total[active] += costs[star]
+        roll = rng.random(len(active))
+        succeeded = (roll < success[star]) | (
+            drops[active] >= _CHANCE_TIME_DROPS)
+        destroyed = ~succeeded & (roll >= 1 - destroy[star])
+        failed = ~succeeded & ~destroyed
+
+        dropped = failed & (fail_star[star] < star)
+        new_star = np.where(succeeded, star + 1,
+                            np.where(destroyed, BOOM_STAR, fail_star[star]))
+        stars[active] = new_star
+        drops[active] = np.where(dropped, drops[active] + 1, 0)
+        booms[active] += destroyed
+        total[active] += destroyed * replacement_cost
+        active = active[new_star < target]
+    return total, booms
+
+
+def star_force_stats(
+        equip_type: Union[EquipType, str], level: int, stars: int,
+        base_attack: int = 0) -> Dict[Stat, int]:
+    """Stats added to `scroll_stats` by `stars` stars.
+
+    Args:
+        equip_type: Type of the equip.
+        level: Level of the equip.
+        stars: Stars of the equip.
+        base_attack: Attack of a weapon before star force, which sets the
+            attack gained per star up to 15 stars.
+    """
+    equip_type = EquipType.maybe_parse(equip_type)
+    assert 0 <= stars <= max_stars(level), (
+        f'Equip can only have up to {max_stars(level)} stars')
+    is_weapon = equip_type in WSE
+    high_stat = _by_level(_STAT_BY_LEVEL, level, 15)
+    attack_table = _by_level(
+        _WEAPON_ATTACK_BY_LEVEL if is_weapon else _ARMOR_ATTACK_BY_LEVEL,
+        level,
+        _WEAPON_ATTACK_MAX_LEVEL if is_weapon else _ARMOR_ATTACK_MAX_LEVEL)
+
+    stat, attack = 0, 0
+    for star in range(1, min(stars, 22) + 1):
+        if star <= 5:
+            stat += 2
+        elif star <= 15:
+            stat += 3
+        else:
+            stat += high_stat
+            if star - 16 < len(attack_table):
+                attack += attack_table[star - 16]
+        if is_weapon and star <= 15:
+            attack += (base_attack + attack) // 50 + 1
+
+    gains = {}
+    if stat:
+        gains[Stat.ALL] = stat
+    if attack:
+        gains[Stat.ATT] = attack
+        gains[Stat.MATT] = attack
+    return gains
@@ -0,0 +1,156 @@
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from maplestats.enums import Stat, FLOAT_VALUED_STATS
+
+NUM_STATS = len(Stat)
+
+STAT_INDEX: Dict[Stat, int] = {stat: idx for idx, stat in enumerate(Stat)}
+"""Position of each stat inside a `StatVector` buffer."""
+
+MULTIPLICATIVE_MASK: np.ndarray = np.array([stat == Stat.IED for stat in Stat])
+"""True for every stat which combines multiplicatively instead of additively."""
+
+_MULTIPLICATIVE_INDICES = frozenset(
+    np.flatnonzero(MULTIPLICATIVE_MASK).tolist())
+
+_FLOAT_TOLERANCE = 1e-9
+"""Float-valued stats closer to 0 than this are left out of sparse dicts."""
+
+
+class StatVector:
+    """Fixed-length bundle of stats indexed by `Stat` ordinal.
+
+    Additive stats are summed while multiplicative stats (IED) are combined with
+    `1 - (1 - a) * (1 - b)`. Values are stored as float64 and converted back to
+    ints for stats which are not in `FLOAT_VALUED_STATS`.
+    """
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values: Optional[np.ndarray] = None):
+        if values is None:
+            values = np.zeros(NUM_STATS)
+        assert values.shape == (NUM_STATS,), (
+            f'StatVector must have exactly {NUM_STATS} values')
+        self._values = values
+
+    @classmethod
+    def from_stats(cls, stats: Optional[Dict[Stat, Any]]) -> 'StatVector':
+        values = np.zeros(NUM_STATS)
+        if stats:
+            for stat, value in stats.items():
+                values[STAT_INDEX[Stat.maybe_parse(stat)]] = value
+        return cls(values)
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[Tuple[Stat, Any]]) -> 'StatVector':
+        """Combine lines of potential or bonus stats."""
+        return cls.from_items(lines)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[Stat, Any]]) -> 'StatVector':
+        """Combine any number of (stat, value) pairs with the same rules as
+        `sum`. Faster than one vector per pair for a handful of pairs.
+        """
+        values = [0.0] * NUM_STATS
+        kept: Dict[int, float] = {}
+        for stat, value in items:
+            idx = STAT_INDEX[Stat.maybe_parse(stat)]
+            if idx in _MULTIPLICATIVE_INDICES:
+                kept[idx] = kept.get(idx, 1.0) * (1.0 - value)
+            else:
+                values[idx] += value
+        for idx, remaining in kept.items():
+            values[idx] = 1.0 - remaining
+        return cls(np.array(values))
+
+    @classmethod
+    def sum(cls, vectors: Iterable['StatVector']) -> 'StatVector':
+        """Combine any number of vectors in a single vectorized call."""
+        rows = [vector._values for vector in vectors]
+        if not rows:
+            return cls()
+        return cls(combine_rows(np.stack(rows)))
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values
+
+    def __getitem__(self, stat: Stat) -> Any:
+        value = self._values[STAT_INDEX[stat]]
+        if stat in FLOAT_VALUED_STATS:
+            return float(value)
+        return int(round(value))
+
+    def __setitem__(self, stat: Stat, value: Any) -> None:
+        self._values[STAT_INDEX[stat]] = value
+
+    def __add__(self, other: 'StatVector') -> 'StatVector':
+        return StatVector(combine_rows(np.stack([self._values, other._values])))
+
+    def __sub__(self, other: 'StatVector') -> 'StatVector':
+        """Remove a source of stats which was previously added.
+
+        Raises:
+            ValueError: If `other` ignores all defense. Multiplying by
+                `1 - IED` cannot be undone then, and the sum must be rebuilt
+                without `other` instead.
+        """
+        if np.any(other._values[MULTIPLICATIVE_MASK] >= 1.0):
+            raise ValueError(
+                'A source ignoring all defense cannot be subtracted')
+        additive = self._values - other._values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            multiplicative = 1.0 - (1.0 - self._values) / (1.0 - other._values)
+        return StatVector(
+            np.where(MULTIPLICATIVE_MASK, multiplicative, additive))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, StatVector):
+            return NotImplemented
+        return bool(np.allclose(self._values, other._values))
+
+    def __repr__(self) -> str:
+        return f'StatVector({self.to_stats()})'
+
+    def copy(self) -> 'StatVector':
+        return StatVector(self._values.copy())
+
+    def to_stats(self, sparse: bool = True) -> Dict[Stat, Any]:
+        """Convert back to a `STATS_TYPING` dict.
+
+        Args:
+            sparse: If True, stats with a value of 0 are omitted. Float noise
+                left by subtraction counts as 0.
+        """
+        stats = {stat: self[stat] for stat in Stat}
+        if not sparse:
+            return stats
+        return {stat: value for stat, value in stats.items()
+                if abs(value) > _FLOAT_TOLERANCE}
+
+
+def combine_rows(rows: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Combine an (N x NUM_STATS) matrix of stats into a single row.
+
+    Higher-dimensional stacks are combined along `axis`, which must not be the
+    last (stat) axis.
+    """
+    additive = rows.sum(axis=axis)
+    multiplicative = 1.0 - np.prod(1.0 - rows, axis=axis)
+    return np.where(MULTIPLICATIVE_MASK, multiplicative, additive)
+
+
+def apply_deltas(rows: np.ndarray, added: np.ndarray, removed: np.ndarray
+                 ) -> np.ndarray:
+    """Rows of stats with the `added` stats added and the `removed` stats,
+    which were previously added, taken out. All arrays broadcast against
+    (N x NUM_STATS). `removed` must not ignore all defense, see
+    `StatVector.__sub__`.
+    """
+    additive = rows + added - removed
+    with np.errstate(divide='ignore', invalid='ignore'):
+        multiplicative = 1.0 - (1.0 - rows) * (1.0 - added) / (1.0 - removed)
+    return np.where(MULTIPLICATIVE_MASK, multiplicative, additive)
@@ -0,0 +1,77 @@
+"""Streaming reader for large multi-character exports.
+
+Supports a JSON array of characters, JSON lines, or concatenated JSON objects.
+Only one character and one read chunk are held in memory at a time.
+"""
+import json
+from typing import Any, Dict, Iterator, TextIO
+
+from maplestats.character import Character
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\r\n'
+
+
+def _iter_json_objects(f: TextIO, chunk_size: int
+                       ) -> Iterator[Dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip separators between objects: whitespace, commas and brackets.
+        while pos < len(buffer) and (
+                buffer[pos] in _WHITESPACE or buffer[pos] == ','
+                or (not started and buffer[pos] == '[')):
+            started = started or buffer[pos] == '['
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        if pos < len(buffer):
+            assert buffer[pos] == '{', (
+                f'Expected a JSON object, found {buffer[pos]!r}')
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Objects always end with '}', so a successful decode can
+                # never be a prefix of a longer value.
+                yield obj
+                started = True
+                buffer, pos = buffer[end:], 0
+                continue
+        elif eof:
+            return
+
+        # Read more, growing the read size with the buffer so that objects
+        # larger than one chunk are not re-parsed once per chunk.
+        chunk = f.read(max(chunk_size, len(buffer) - pos))
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_characters(file_path: str, lazy_equips: bool = False,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE
+                    ) -> Iterator[Character]:
+    """Yield the characters of an export one at a time.
+
+    Args:
+        file_path: JSON array, JSON lines or concatenated JSON objects, each in
+            the format of `Character.to_json()`.
+        lazy_equips: If True, equips are only parsed the first time they are
+            accessed.
+        chunk_size: Number of characters read from the file at once.
+    """
+    with open(file_path, 'r') as f:
+        for json_repr in _iter_json_objects(f, chunk_size):
+            if lazy_equips:
+                equips = json_repr.pop('equips', None)
+                json_repr['equips'] = lambda equips=equips: equips
+            yield Character(**json_repr)
@@ -0,0 +1,17 @@
+from maplestats.benchmarks.suite import compare, run_suite
+
+
+def test_run_and_compare() -> None:
+    report = run_suite('1', repeats=1)
+    assert set(report['results']) == {
+        'equip_construction', 'combine_stats', 'jsonify', 'parse_json',
+        'stats_from_equips', 'save', 'from_file', 'session_startup'}
+    assert compare(report, report) == []
+
+    slower = {'results': {
+        name: {**result, 'seconds_per_op': result['seconds_per_op'] * 2}
+        for name, result in report['results'].items()}}
+    regressions = compare(report, slower, threshold=0.5)
+    assert {regression.name for regression in regressions} == set(
+        report['results'])
+    assert all(regression.ratio == 2 for regression in regressions)
@@ -0,0 +1,41 @@
+from maplestats import binary
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+
+
+def _character(name: str) -> Character:
+    char = Character(name, level=255, character_class=Class.BUCCANEER,
+                     world=World.REBOOT, link_skills={Class.KANNA: 2})
+    char.equip(Equip(
+        'Arcane Umbra Knuckle', EquipType.WEAPON,
+        base_stats={Stat.STR: 100, Stat.ATT: 276},
+        scroll_stats={'ATT': 150},
+        potential=[(Stat.BOSS, 40), (Stat.IED, 0.35), (Stat.PCT_ATT, 12)],
+        bonus_stats=[(Stat.BOSS, 12), ('CRIT_DMG', 0.5)]))
+    char.equip(Equip('Ring', EquipType.RING_1, base_stats={Stat.DMG: 5}),
+               EquipType.RING_3)
+    return char
+
+
+def test_round_trip() -> None:
+    chars = [_character('Somi'), _character('Other'), Character('Empty')]
+    loaded = binary.loads_many(binary.dumps_many(chars))
+    assert [char.to_json() for char in loaded] == [
+        char.to_json() for char in chars]
+
+    equips = [equip for equip in chars[0].equips.values() if equip]
+    assert [equip.to_json() for equip in binary.loads_equips(
+        binary.dumps_equips(equips))] == [equip.to_json() for equip in equips]
+
+
+def test_save_and_load_file(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    char = _character('Somi')
+    char.save(binary=True)
+    loaded = Character.from_file('Somi.mstb')
+    assert loaded.to_json() == char.to_json()
+    assert loaded.stat_vector == char.stat_vector
+
+    char.save('Somi.json')
+    assert Character.from_file('Somi.json').to_json() == char.to_json()
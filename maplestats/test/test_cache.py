@@ -0,0 +1,68 @@
+from maplestats.cache import ResultCache
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.instrumentation import instrumentation
+
+
+def _character(name: str) -> Character:
+    return Character(
+        name, level=250, character_class=Class.BUCCANEER, world=World.REBOOT,
+        link_skills={Class.KANNA: 2},
+        equips={EquipType.WEAPON: Equip(
+            'Knuckle', EquipType.WEAPON,
+            base_stats={Stat.STR: 100, Stat.ATT: 276},
+            potential=[(Stat.IED, 0.4), (Stat.BOSS, 30)])})
+
+
+def test_fingerprint() -> None:
+    char, same = _character('Somi'), _character('Preset')
+    assert char.fingerprint == same.fingerprint
+    fingerprint = char.fingerprint
+    for change in (lambda: setattr(char, 'level', 251),
+                   lambda: char.set_link_skill(Class.KANNA, 1),
+                   lambda: setattr(char, 'world', World.SCANIA),
+                   lambda: char.equip(Equip('Ring', EquipType.RING_1))):
+        change()
+        assert char.fingerprint != fingerprint
+        fingerprint = char.fingerprint
+
+
+def test_lru_and_persistence(tmp_path) -> None:
+    path = str(tmp_path / 'results.cache')
+    cache = ResultCache(maxsize=2, file_path=path)
+    char, same = _character('Somi'), _character('Preset')
+    with instrumentation() as report:
+        evaluation = cache.evaluate(char)
+        assert cache.evaluate(same) is evaluation
+    assert evaluation == char.evaluate()
+    assert report.counters == {'ResultCache.hit': 1, 'ResultCache.miss': 1}
+
+    assert cache.stat_vector(same) == char.stat_vector
+    cache.stat_equivalences(char)
+    assert tuple(cache.info()) == (1, 3, 2, 2)
+    # The evaluation was the least recently used.
+    cache.evaluate(char)
+    assert cache.info().misses == 4
+
+    cache.save()
+    loaded = ResultCache(maxsize=2, file_path=path)
+    assert len(loaded) == 2
+    assert loaded.evaluate(same) == evaluation
+    assert loaded.info().hits == 1
+
+
+def test_results_are_not_shared(tmp_path) -> None:
+    cache = ResultCache()
+    char = _character('Somi')
+    evaluation = cache.evaluate(char)
+    char.equip(Equip('Knuckle', EquipType.WEAPON,
+                     base_stats={Stat.STR: 100, Stat.ATT: 400}))
+    assert cache.evaluate(char) != evaluation
+
+    cache.stat_equivalences(char)[Stat.BOSS] = -1
+    assert cache.stat_equivalences(char) == char.stat_equivalences()
+
+    path = tmp_path / 'corrupt.cache'
+    path.write_bytes(b'\x80\x05truncated')
+    assert len(ResultCache(file_path=str(path))) == 0
@@ -0,0 +1,69 @@
+import pytest
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+
+
+def _ring(dmg: int) -> Equip:
+    return Equip(name='Ring', equip_type=EquipType.RING_1,
+                 base_stats={Stat.DMG: dmg})
+
+
+def test_equip_updates_damage_by_delta() -> None:
+    char = Character('Test', level=200, world=World.REBOOT)
+    assert char.damage == 50
+    char.equip(_ring(10))
+    assert char.damage == 60
+    unequipped = char.equip(_ring(3))
+    assert unequipped.stats[Stat.DMG] == 10
+    assert char.damage == 53
+    assert char.stat_vector_from_equips == Character(
+        'Fresh', equips={EquipType.RING_1: _ring(3)}).stat_vector_from_equips
+
+
+def test_link_skill_edits_update_stats() -> None:
+    char = Character('Test', level=200)
+    char.link_skills = {Class.KANNA: 2}
+    assert char.damage == 10
+    char.set_link_skill(Class.ARK, 2)
+    assert char.damage == 21
+    char.set_link_skill(Class.KANNA, None)
+    assert char.damage == 11
+    assert char.link_skills == {Class.ARK: 2}
+
+
+def test_invalid_link_skill_levels_change_nothing() -> None:
+    char = Character('Test', level=200, link_skills={Class.KANNA: 2})
+    assert char.damage == 10
+    with pytest.raises(AssertionError):
+        char.set_link_skill(Class.KANNA, 9)
+    assert char.link_skills == {Class.KANNA: 2}
+    assert char.damage == 10
+    with pytest.raises(AssertionError):
+        char.link_skills = {Class.KANNA: 9}
+    with pytest.raises(AssertionError):
+        Character('Test', link_skills={Class.KANNA: 9})
+
+
+def test_level_and_world_setters_invalidate_derived() -> None:
+    char = Character('Test', level=50, world=World.SCANIA)
+    assert (char.job, char.pure_main_stat, char.damage) == (3, 259, 0)
+    char.level = 200
+    char.world = World.REBOOT
+    assert (char.job, char.pure_main_stat, char.damage) == (5, 1014, 50)
+
+
+def test_inventories_are_not_shared() -> None:
+    first, second = Character('First'), Character('Second')
+    first.equip(_ring(1))
+    assert second.equips[EquipType.RING_1] is None
+
+
+def test_equips_and_link_skills_are_read_only() -> None:
+    char = Character('Test', level=200, link_skills={Class.KANNA: 2})
+    with pytest.raises(TypeError):
+        char.equips[EquipType.RING_1] = _ring(10)
+    with pytest.raises(TypeError):
+        char.link_skills[Class.ARK] = 2
+    assert char.damage == 10
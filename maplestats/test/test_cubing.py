@@ -0,0 +1,44 @@
+import numpy as np
+
+from maplestats.cubing import (
+    _WEAPON_LINES, PRIME_LINE_RATES, CubeType, simulate_cubing)
+from maplestats.enums import EquipType, Stat
+from maplestats.equipment import Equip
+
+
+def test_matches_exact_rate() -> None:
+    gloves = Equip('Gloves', EquipType.GLOVE)
+    estimate = simulate_cubing(gloves, {Stat.CRIT_DMG: 8}, trials=1_000_000,
+                               workers=1, seed=3)
+    # Crit damage is 1 of 12 weights and only rolls on prime lines.
+    exact = 1 - np.prod([1 - rate / 12
+                         for rate in PRIME_LINE_RATES[CubeType.RED]])
+    assert abs(estimate.success_rate - exact) < 5 * estimate.standard_error
+    assert estimate.expected_cost == estimate.expected_cubes * 12_000_000
+    assert estimate.cubes_quantile(0.5) < estimate.cubes_quantile(0.9)
+
+
+def test_reproducible_across_workers() -> None:
+    weapon = Equip('Weapon', EquipType.WEAPON)
+    target = {'BOSS': 30, Stat.IED: 0.3}
+    single = simulate_cubing(weapon, target, trials=200_000,
+                             batch_size=50_000, workers=1, seed=11)
+    pooled = simulate_cubing(weapon, target, trials=200_000,
+                             batch_size=50_000, workers=2, seed=11)
+    assert single == pooled
+    assert 0 < single.success_rate < 1
+
+
+def test_boss_and_ied_are_restricted_separately() -> None:
+    weapon = Equip('Weapon', EquipType.WEAPON)
+    # Every boss and IED line meets its minimum at any tier, so the target
+    # needs exactly two boss lines and one IED line, in any order.
+    estimate = simulate_cubing(weapon, {Stat.BOSS: 60, Stat.IED: 0.3},
+                               trials=1_000_000, workers=1, seed=5)
+    weights = {Stat.BOSS: 0.0, Stat.IED: 0.0, None: 0.0}
+    for stat, _, _, weight in _WEAPON_LINES:
+        weights[stat if stat in weights else None] += weight
+    total = sum(weights.values())
+    boss, ied = weights[Stat.BOSS] / total, weights[Stat.IED] / total
+    exact = 3 * boss ** 2 * ied / (1 - boss ** 3 - ied ** 3)
+    assert abs(estimate.success_rate - exact) < 5 * estimate.standard_error
@@ -0,0 +1,77 @@
+import numpy as np
+
+from maplestats.classes import rotation_of
+from maplestats.character import Character
+from maplestats.dpm import (
+    Buff, Skill, batch_dpm, character_dpm, simulate_timeline)
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.evaluation import evaluate_builds
+from maplestats.stat_vector import NUM_STATS, STAT_INDEX, StatVector
+
+
+def test_timeline() -> None:
+    buff = Buff('Burst', 10, {Stat.DMG: 50})
+    skills = [Skill('Buff', 0, 1, cooldown=30, buff=buff, burst=True),
+              Skill('Nuke', 500, 1, cooldown=30, burst=True),
+              Skill('Filler', 100, 1)]
+    timeline = simulate_timeline(skills, fight_length=60)
+    # The buff is ready at 30 but waits for the nuke, ready at 31.
+    assert [time for time, name in timeline.casts if name != 'Filler'] == [
+        0, 1, 31, 32]
+    assert np.isclose(timeline.uptime['Burst'], 20 / 60)
+    weights = dict(zip(timeline.buff_sets, timeline.weights))
+    # Buffed: 2 nukes and 8 fillers per window. Unbuffed: the rest.
+    assert weights[frozenset({'Burst'})] == 2 * 500 + 2 * 8 * 100
+    assert weights[frozenset()] == (60 - 4 - 16) * 100
+
+    extended = simulate_timeline(skills, fight_length=60, buff_duration=50)
+    assert np.isclose(extended.uptime['Burst'], 30 / 60)
+
+
+def test_short_burst_cooldowns_are_not_held() -> None:
+    timeline = simulate_timeline(rotation_of(Class.BUCCANEER), 600)
+    cannon = [time for time, name in timeline.casts
+              if name == 'Lightning Cannon']
+    assert len(cannon) == 10
+    assert np.all(np.diff(cannon) < 61)
+
+
+def test_batch_matches_casts() -> None:
+    skills = rotation_of(Class.BUCCANEER)
+    stats = np.zeros((4, NUM_STATS))
+    stats[:, STAT_INDEX[Stat.STR]] = [1000, 2000, 2000, 3000]
+    stats[:, STAT_INDEX[Stat.ATT]] = 1500
+    stats[:, STAT_INDEX[Stat.IED]] = 0.4
+    stats[2, STAT_INDEX[Stat.BUFF_DURATION]] = 40
+    evaluation = batch_dpm(stats, Class.BUCCANEER, 250)
+    assert np.all(np.diff(evaluation.dpm[[0, 1, 3]]) > 0)
+    assert evaluation.dpm[2] > evaluation.dpm[1]
+    assert evaluation.burst_damage[2] > evaluation.burst_damage[1] > 0
+
+    # One evaluation per cast gives the same damage.
+    timeline = simulate_timeline(skills, buff_duration=40)
+    buffs = {skill.buff.name: skill.buff for skill in skills if skill.buff}
+    damage = {skill.name: skill.damage for skill in skills}
+    ends = {}
+    total = 0.0
+    for time, name in timeline.casts:
+        skill = next(skill for skill in skills if skill.name == name)
+        if skill.buff:
+            scale = 1.4 if skill.buff.extended_by_buff_duration else 1
+            ends[name] = time + skill.buff.duration * scale
+        active = [StatVector.from_stats(buffs[buff].stats)
+                  for buff, end in ends.items() if end > time]
+        row = StatVector.sum([StatVector(stats[2].copy())] + active).values
+        total += damage[name] / 100 * evaluate_builds(
+            row, Class.BUCCANEER, 250).ied_damage[0]
+    assert np.isclose(evaluation.dpm[2], total * 60 / timeline.fight_length)
+
+
+def test_character_dpm_at_realistic_ied() -> None:
+    char = Character('Test', level=250, character_class=Class.BUCCANEER)
+    char.equip(Equip('Knuckle', EquipType.WEAPON,
+                     base_stats={Stat.STR: 100, Stat.ATT: 276},
+                     potential=[(Stat.IED, 0.4), (Stat.BOSS, 30)]))
+    dpm, burst_damage = character_dpm(char)
+    assert dpm > 0 and burst_damage > 0
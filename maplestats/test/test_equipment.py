@@ -0,0 +1,28 @@
+from maplestats.enums import EquipType, Stat
+from maplestats.equipment import Equip
+
+
+def test_equal_values_share_one_normalized_entry() -> None:
+    first = Equip('Ring', EquipType.RING_1, base_stats={Stat.STR: 8.0},
+                  potential=[(Stat.CRIT_DMG, 8)])
+    second = Equip('Other Ring', EquipType.RING_2, base_stats={'STR': 8},
+                   potential=[('CRIT_DMG', 8.0)])
+    assert first.base_stats is second.base_stats
+    assert first.potential[0] is second.potential[0]
+    assert type(first.base_stats[Stat.STR]) is int
+    assert type(second.potential[0][1]) is float
+    assert first.potential == second.potential
+
+
+def test_fingerprint_ignores_name() -> None:
+    equip = Equip('Ring', EquipType.RING_1, base_stats={Stat.STR: 8},
+                  potential=[(Stat.CRIT_DMG, 8)])
+    fingerprint = equip.fingerprint
+    equip.name = 'Renamed Ring'
+    assert equip.fingerprint == fingerprint
+    assert Equip('Other Ring', EquipType.RING_1, base_stats={'STR': 8},
+                 potential=[('CRIT_DMG', 8)]).fingerprint == fingerprint
+    assert Equip('Ring', EquipType.RING_1, base_stats={Stat.STR: 9},
+                 potential=[(Stat.CRIT_DMG, 8)]).fingerprint != fingerprint
+    assert Equip('Ring', EquipType.RING_2, base_stats={Stat.STR: 8},
+                 potential=[(Stat.CRIT_DMG, 8)]).fingerprint != fingerprint
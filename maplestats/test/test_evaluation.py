@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.evaluation import evaluate_builds, stat_equivalences
+from maplestats.formulas import job
+from maplestats.stat_vector import StatVector
+
+
+def test_batch_matches_single_character() -> None:
+    builds = [
+        {Stat.STR: 500, Stat.ATT: 300, Stat.BOSS: 30, Stat.IED: 0.4},
+        {Stat.STR: 800, Stat.DEX: 100, Stat.ATT: 250, Stat.DMG: 20},
+        {Stat.PCT_ALL: 30, Stat.ATT: 200, Stat.CRIT_DMG: 16.0},
+    ]
+    matrix = np.stack([StatVector.from_stats(b).values for b in builds])
+    batch = evaluate_builds(matrix, Class.BUCCANEER, 235, world=World.REBOOT)
+
+    for idx, build in enumerate(builds):
+        char = Character('Test', level=235, character_class=Class.BUCCANEER,
+                         world=World.REBOOT)
+        char.equip(Equip('Gear', EquipType.TOP, base_stats=build))
+        single = char.evaluate()
+        assert single.stat_range == pytest.approx(batch.stat_range[idx])
+        assert single.ied_damage == pytest.approx(batch.ied_damage[idx])
+
+
+def test_stat_range_formula() -> None:
+    stats = StatVector.from_stats({Stat.ATT: 100}).values
+    # Level 10 beginner: 5 * 10 + 4 = 54 STR, 4 DEX, dagger multiplier 1.3.
+    evaluation = evaluate_builds(stats, Class.BEGINNER, 10)
+    assert evaluation.stat_range[0] == pytest.approx(1.3 * (4 * 54 + 4))
+
+
+def test_ied_below_boss_defense_deals_no_damage() -> None:
+    stats = StatVector.from_stats({Stat.ATT: 100, Stat.IED: 0.5}).values
+    evaluation = evaluate_builds(stats, Class.BUCCANEER, 200, boss_pdr=3.0)
+    assert evaluation.ied_damage[0] == 0
+
+
+def test_default_boss_defense_rewards_realistic_ied() -> None:
+    stats = np.stack([
+        StatVector.from_stats({Stat.ATT: 300, Stat.IED: ied}).values
+        for ied in (0, 0.4, 0.6)])
+    evaluation = evaluate_builds(stats, Class.BUCCANEER, 250)
+    assert np.all(evaluation.ied_damage > 0)
+    assert np.all(np.diff(evaluation.ied_damage) > 0)
+
+
+def test_stat_equivalences_match_single_steps() -> None:
+    char = Character('Test', level=250, character_class=Class.BUCCANEER)
+    char.equip(Equip('Gear', EquipType.TOP, base_stats={
+        Stat.STR: 3000, Stat.PCT_STR: 200, Stat.ATT: 1500, Stat.BOSS: 200,
+        Stat.DMG: 50, Stat.IED: 0.9}))
+    equivalences = char.stat_equivalences()
+    assert equivalences[Stat.PCT_STR] == pytest.approx(1.0)
+    assert equivalences[Stat.DROP_RATE] == 0.0
+
+    def _gain(stats) -> float:
+        trial = Character('Trial', level=250, character_class=Class.BUCCANEER,
+                          equips=dict(char.equips))
+        trial.equip(Equip('Extra', EquipType.HAT, base_stats=stats))
+        return trial.evaluate().ied_damage - char.evaluate().ied_damage
+
+    for stat, step in [(Stat.BOSS, 1), (Stat.ATT, 1), (Stat.IED, 0.01)]:
+        assert equivalences[stat] == pytest.approx(
+            _gain({stat: step}) / _gain({Stat.PCT_STR: 1}))
+
+
+def test_job_matches_character() -> None:
+    levels = np.array([1, 9, 10, 199, 200, 275])
+    assert list(job(levels)) == [
+        Character('Job', level=int(level)).job for level in levels]
+    assert job(275) == 5
+
+
+def test_stat_equivalences_at_realistic_ied() -> None:
+    stats = StatVector.from_stats({
+        Stat.STR: 3000, Stat.PCT_STR: 200, Stat.ATT: 1500, Stat.BOSS: 200,
+        Stat.IED: 0.4}).values
+    equivalences = stat_equivalences(stats, Class.BUCCANEER, 250)
+    assert equivalences[Stat.PCT_STR] == pytest.approx(1.0)
+    assert equivalences[Stat.BOSS] > 0
+    assert equivalences[Stat.IED] > 0
+
+    with pytest.raises(ValueError, match='no damage'):
+        stat_equivalences(stats, Class.BUCCANEER, 250, boss_pdr=3.0)
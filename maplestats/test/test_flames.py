@@ -0,0 +1,30 @@
+import numpy as np
+
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.flames import (
+    FlameType, beat_probability, expected_rerolls, flame_score, flame_table)
+
+
+def test_flame_table_and_rerolls(tmp_path) -> None:
+    cache_dir = str(tmp_path)
+    table = flame_table(200, FlameType.POWERFUL, cache_dir)
+    assert np.isclose(table.probabilities.sum(), 1)
+    assert len(list(tmp_path.iterdir())) == 1
+    # Tables are kept per level bracket.
+    assert flame_table(219, 'powerful', cache_dir) is table
+    # Most STR comes from the STR line (11 per tier at level 200) and the
+    # three STR+X lines (6 per tier), all at tier 6.
+    assert table.features[:, 0].max() == 11 * 6 + 3 * 6 * 6
+
+    hat = Equip('Hat', EquipType.HAT, bonus_stats=[
+        (Stat.STR, 66), (Stat.ATT, 5), (Stat.PCT_ALL, 6)])
+    score = flame_score(hat.bonus_stats, Class.BUCCANEER)
+    assert score == 66 + 5 * 4 + 6 * 10
+
+    probabilities = beat_probability(
+        [-1, score, 10_000], 200, Class.BUCCANEER, cache_dir=cache_dir)
+    assert np.isclose(probabilities[0], 1) and probabilities[2] == 0
+    assert np.isclose(expected_rerolls(hat, 200, Class.BUCCANEER,
+                                       cache_dir=cache_dir),
+                      1 / probabilities[1])
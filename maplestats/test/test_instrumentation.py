@@ -0,0 +1,55 @@
+import io
+import tracemalloc
+
+from maplestats import instrumentation
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+
+
+def test_instrumentation(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    with instrumentation.instrumentation(memory=True) as report:
+        char = Character('Somi', level=250, character_class=Class.BUCCANEER)
+        char.equip(Equip('Hat', EquipType.HAT, base_stats={Stat.STR: 40}))
+        assert char.damage == char.damage
+        char.save()
+        Character.from_file('Somi.json')
+
+    # Once directly and once when loading the file.
+    assert report.timers['Equip.__init__']['calls'] == 2
+    assert report.timers['Equip.__init__']['bytes'] > 0
+    assert report.timers['Character.damage']['calls'] == 1
+    assert report.counters['Character.damage.cached'] == 1
+    assert report.timers['Character.save.write']['calls'] == 1
+    assert report.timers['Character.from_file.read']['calls'] == 1
+    assert report.timers['jsonify']['calls'] >= 1
+    assert report.peak_bytes > 0
+    assert not instrumentation.is_enabled()
+
+    out = io.StringIO()
+    report.dump(out)
+    assert 'Character.damage' in out.getvalue()
+
+    # Nothing is collected once disabled.
+    with instrumentation.instrumentation() as report:
+        pass
+    Character('Other')
+    assert report.timers == {}
+
+
+def test_nested_instrumentation() -> None:
+    with instrumentation.instrumentation() as outer:
+        Equip('Hat', EquipType.HAT)
+        with instrumentation.instrumentation(memory=True) as inner:
+            Equip('Top', EquipType.TOP)
+            assert tracemalloc.is_tracing()
+        assert not tracemalloc.is_tracing()
+        assert instrumentation.is_enabled()
+        Equip('Shoe', EquipType.SHOE)
+    assert not instrumentation.is_enabled()
+
+    assert inner.timers['Equip.__init__']['calls'] == 1
+    assert inner.peak_bytes > 0
+    assert outer.timers['Equip.__init__']['calls'] == 3
+    assert outer.peak_bytes is None
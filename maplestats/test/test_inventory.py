@@ -0,0 +1,51 @@
+import random
+
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.flames import flame_score
+from maplestats.inventory import FLAME_SCORE, Inventory
+
+
+def _equips(count: int):
+    rng = random.Random(0)
+    for idx in range(count):
+        equip_type = rng.choice(
+            [EquipType.GLOVE, EquipType.RING_1, EquipType.HAT])
+        yield Equip(
+            f'Item {idx}', equip_type,
+            base_stats={Stat.STR: rng.randrange(0, 50)},
+            potential=[(rng.choice([Stat.CRIT_DMG, Stat.BOSS, Stat.PCT_STR]),
+                        rng.choice([3, 6, 8])) for _ in range(3)],
+            bonus_stats=[(Stat.STR, rng.randrange(0, 120)),
+                         (Stat.ATT, rng.randrange(0, 10))])
+
+
+def test_query_matches_scan() -> None:
+    equips = list(_equips(300))
+    inventory = Inventory(equips[:200])
+    # Indexes built before items are added are kept up to date.
+    inventory.query(EquipType.GLOVE, {Stat.CRIT_DMG: 8})
+    inventory.top_k(Stat.BOSS, 5, EquipType.RING_1)
+    inventory.extend(equips[200:])
+    for equip in equips[:50]:
+        inventory.remove(equip)
+    kept = equips[50:]
+    assert len(inventory) == len(kept)
+
+    found = inventory.query(EquipType.GLOVE, {Stat.CRIT_DMG: 8},
+                            min_flame_score=100, char_class=Class.BUCCANEER)
+    assert found == [
+        equip for equip in kept if equip.equip_type == EquipType.GLOVE
+        and equip.stats.get(Stat.CRIT_DMG, 0) >= 8
+        and flame_score(equip.bonus_stats, Class.BUCCANEER) >= 100]
+    assert found
+
+    top = inventory.top_k(Stat.BOSS, 5, 'RING_1')
+    rings = sorted((equip.stats.get(Stat.BOSS, 0) for equip in kept
+                    if equip.equip_type == EquipType.RING_1), reverse=True)
+    assert [value for _, value in top] == rings[:5]
+
+    best = inventory.top_k(FLAME_SCORE, 1, char_class=Class.BUCCANEER)
+    assert best[0][1] == max(flame_score(equip.bonus_stats, Class.BUCCANEER)
+                             for equip in kept)
+    assert inventory.query(EquipType.BADGE) == []
@@ -0,0 +1,89 @@
+import itertools
+
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.journal import Journal, SNAPSHOT
+
+
+def _journal(path, snapshot_every: int = 256) -> Journal:
+    clock = itertools.count(1000)
+    return Journal(str(path), snapshot_every=snapshot_every,
+                   clock=lambda: float(next(clock)))
+
+
+def _character() -> Character:
+    return Character('Somi', level=200, character_class=Class.BUCCANEER,
+                     equips={EquipType.WEAPON: Equip(
+                         'Knuckle', EquipType.WEAPON,
+                         base_stats={Stat.STR: 100, Stat.ATT: 276})})
+
+
+def _edit(char: Character) -> None:
+    char.level = 220                                            # 1001
+    char.equip(Equip('Ring', EquipType.RING_1,
+                     base_stats={Stat.DMG: 5}), EquipType.RING_3)  # 1002
+    char.set_link_skill(Class.KANNA, 2)                         # 1003
+    char.world = World.REBOOT                                   # 1004
+    char.equip(Equip('Badge', EquipType.BADGE,
+                     base_stats={Stat.BOSS: 10}))               # 1005
+
+
+def test_replay_and_history(tmp_path) -> None:
+    char = _character()
+    with _journal(tmp_path / 'Somi.journal', snapshot_every=2) as journal:
+        journal.attach(char)                                    # 1000
+        _edit(char)
+
+    journal = Journal(str(tmp_path / 'Somi.journal'))
+    assert journal.replay().to_json() == char.to_json()
+    assert journal.state_at(999) is None
+    assert journal.state_at(1000).level == 200
+    past = journal.state_at(1003.5)
+    assert past.level == 220 and past.world is None
+    assert past.equips[EquipType.RING_3].name == 'Ring'
+    assert past.link_skills == {Class.KANNA: 2}
+
+    progression = journal.progression(since=1002)
+    assert progression.times.tolist() == [1002, 1003, 1004, 1005]
+    assert np.all(np.diff(progression.boss_damage) >= 0)
+    assert progression.boss_damage[-1] > progression.boss_damage[0]
+
+
+def test_compact(tmp_path) -> None:
+    path = tmp_path / 'Somi.journal'
+    char = _character()
+    journal = _journal(path)
+    journal.attach(char)
+    _edit(char)
+    journal.compact(before=1003)
+    assert [line.count(SNAPSHOT) for line in
+            path.read_text().splitlines()] == [1, 0, 0]
+
+    char.level = 221
+    journal.close()
+    replayed = Journal(str(path)).replay()
+    assert replayed.to_json() == char.to_json()
+    assert Journal(str(path)).state_at(1002) is None
+
+
+def test_partial_last_line(tmp_path) -> None:
+    path = tmp_path / 'Somi.journal'
+    with _journal(path) as journal:
+        journal.attach(Character('Somi', level=200))
+    with open(path, 'a') as f:
+        f.write('{"time": 2000, "change": "lev')
+    before = path.read_text()
+    journal = Journal(str(path))
+    assert journal.replay().level == 200
+    # Opening and reading leave the file as it was.
+    assert path.read_text() == before
+
+    char = journal.replay()
+    journal.attach(char)
+    char.level = 201
+    journal.close()
+    assert path.read_text().startswith(before + '\n')
+    assert Journal(str(path)).replay().level == 201
@@ -0,0 +1,53 @@
+import numpy as np
+
+from maplestats import leveling
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.leveling import (
+    CUMULATIVE_EXP, EXP_TO_NEXT, MAX_LEVEL, forecast, hours_to_level,
+    project_level, roster_forecast)
+from maplestats.roster import evaluate_roster
+
+
+def test_tables() -> None:
+    assert len(CUMULATIVE_EXP) == MAX_LEVEL + 1
+    assert np.all(np.diff(EXP_TO_NEXT[1:MAX_LEVEL]) > 0)
+    assert EXP_TO_NEXT[200] == 2_207_026_470
+    assert CUMULATIVE_EXP[201] - CUMULATIVE_EXP[200] == EXP_TO_NEXT[200]
+
+
+def test_projections() -> None:
+    hours = hours_to_level([200, 250], 260, 1e10, bonus_exp=[0, 100])
+    levels, exp = project_level([200, 250], hours, 1e10, bonus_exp=[0, 100])
+    assert levels.tolist() == [260, 260]
+    assert np.allclose(exp, 0, atol=1)
+
+    assert project_level(274, 1e6, 1e12)[0] == MAX_LEVEL
+    assert hours_to_level(260, 250, 1e10) == 0
+
+    weekly = forecast([200, 250], 0, 1e10, [10, 20], 8, bonus_exp=50)
+    assert weekly.shape == (2, 8)
+    for row, (level, hours) in enumerate([(200, 10), (250, 20)]):
+        for week in range(8):
+            assert weekly[row, week] == project_level(
+                level, hours * (week + 1), 1e10, bonus_exp=50)[0]
+
+
+def test_roster_forecast(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    ring = Equip('Ring', EquipType.RING_1, base_stats={Stat.BONUS_EXP: 20.0})
+    for idx, level in enumerate([210, 230, 250]):
+        char = Character(f'Char{idx}', level=level,
+                         character_class=Class.BUCCANEER)
+        if idx:
+            char.equip(ring)
+        char.save(str(tmp_path / f'Char{idx}.json'))
+    results = evaluate_roster(str(tmp_path), workers=1)
+    levels, hours = roster_forecast(results, 1e10, 10, 4, target=260)
+    order = np.argsort(results.levels)
+    assert np.array_equal(hours[order], [
+        leveling.hours_to_level(210, 260, 1e10),
+        leveling.hours_to_level(230, 260, 1e10, bonus_exp=20),
+        leveling.hours_to_level(250, 260, 1e10, bonus_exp=20)])
+    assert np.all(levels[:, -1] >= results.levels)
@@ -0,0 +1,49 @@
+from itertools import combinations
+
+import pytest
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.link_optimizer import LinkTarget, optimize_link_skills
+from maplestats.link_skills import link_stat_vector
+
+OWNED = {
+    Class.BUCCANEER: 6,
+    Class.CORSAIR: 4,
+    Class.BEAST_TAMER: 2,
+    Class.DEMON_SLAYER: 2,
+    Class.DEMON_AVENGER: 2,
+    Class.ARK: 2,
+    Class.CADENA: 2,
+    Class.KINESIS: 2,
+    Class.KANNA: 2,
+    Class.BISHOP: 6,
+}
+
+
+def test_linear_targets() -> None:
+    crit = optimize_link_skills(OWNED, 1, LinkTarget.CRIT)
+    assert crit.link_skills == {Class.BEAST_TAMER: 2}
+    all_stat = optimize_link_skills(OWNED, 2, 'ALL_STAT')
+    assert all_stat.link_skills == {Class.BUCCANEER: 6}
+
+
+def test_bossing_matches_brute_force() -> None:
+    char = Character('Test', level=250, character_class=Class.BUCCANEER)
+    char.equip(Equip('Weapon', EquipType.WEAPON,
+                     base_stats={Stat.ATT: 300, Stat.IED: 0.9}))
+    loadout = optimize_link_skills(OWNED, 4, character=char)
+
+    best = 0.0
+    for chosen in combinations(OWNED, 4):
+        char.link_skills = {cls: OWNED[cls] for cls in chosen}
+        best = max(best, char.evaluate().ied_damage)
+    assert loadout.score == pytest.approx(best)
+    assert len(loadout.link_skills) == 4
+
+
+@pytest.mark.parametrize('level', [-1, 0, 4])
+def test_link_levels_are_bounded(level: int) -> None:
+    with pytest.raises(AssertionError):
+        link_stat_vector(Class.KANNA, level)
@@ -0,0 +1,78 @@
+import random
+from itertools import combinations, product
+
+import pytest
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, SLOT_FAMILIES
+from maplestats.equipment import Equip
+from maplestats.optimizer import optimize_equips
+
+_STATS = [Stat.STR, Stat.PCT_STR, Stat.ATT, Stat.BOSS, Stat.IED, Stat.DMG]
+
+
+def _random_equip(rng: random.Random, equip_type: EquipType) -> Equip:
+    stats = {stat: rng.randint(0, 40) for stat in rng.sample(_STATS, 3)}
+    if Stat.IED in stats:
+        stats[Stat.IED] = stats[Stat.IED] / 100
+    return Equip('Item', equip_type, base_stats=stats)
+
+
+def test_matches_brute_force() -> None:
+    rng = random.Random(7)
+    char = Character('Test', level=250, character_class=Class.BUCCANEER)
+    char.equip(Equip('Weapon', EquipType.WEAPON,
+                     base_stats={Stat.ATT: 300, Stat.IED: 0.8}))
+    rings = [_random_equip(rng, EquipType.RING_1) for _ in range(6)]
+    pendants = [_random_equip(rng, EquipType.PENDANT_1) for _ in range(4)]
+    hats = [_random_equip(rng, EquipType.HAT) for _ in range(5)]
+
+    loadout = optimize_equips(char, rings + pendants + hats)
+
+    best = 0.0
+    for ring_set, pendant_set, hat in product(
+            combinations(rings, 4), combinations(pendants, 2), hats):
+        trial = Character('Trial', level=250, character_class=Class.BUCCANEER,
+                          equips=dict(char.equips))
+        for slot, equip in zip(
+                [EquipType.RING_1, EquipType.RING_2, EquipType.RING_3,
+                 EquipType.RING_4, EquipType.PENDANT_1, EquipType.PENDANT_2,
+                 EquipType.HAT], ring_set + pendant_set + (hat,)):
+            trial.equip(equip, slot)
+        best = max(best, trial.evaluate().ied_damage)
+
+    assert loadout.score == pytest.approx(best)
+    assert len(loadout.equips) == 7
+    assert loadout.equips[EquipType.HAT] in hats
+
+
+def test_keeps_equipped_items_the_pool_does_not_replace() -> None:
+    char = Character('Test', level=250, character_class=Class.BUCCANEER)
+    equipped = [Equip(f'Old {idx}', EquipType.RING_1,
+                      base_stats={Stat.STR: 10 * idx}) for idx in range(1, 5)]
+    for slot, ring in zip(SLOT_FAMILIES[EquipType.RING_1], equipped):
+        char.equip(ring, slot)
+    pool = [Equip('New', EquipType.RING_1, base_stats={Stat.STR: 25}),
+            Equip('Bad', EquipType.RING_1, base_stats={Stat.STR: 5})]
+
+    loadout = optimize_equips(char, pool)
+    assert {equip.name for equip in loadout.equips.values()} == {
+        'New', 'Old 2', 'Old 3', 'Old 4'}
+
+
+def test_large_pool() -> None:
+    rng = random.Random(3)
+    char = Character('Test', level=250, character_class=Class.BUCCANEER)
+    char.equip(Equip('Weapon', EquipType.WEAPON,
+                     base_stats={Stat.ATT: 300, Stat.IED: 0.4}))
+    pool = [_random_equip(rng, equip_type) for _ in range(200)
+            for equip_type in (EquipType.RING_1, EquipType.PENDANT_1,
+                               EquipType.HAT)]
+
+    loadout = optimize_equips(char, pool)
+    trial = Character('Trial', level=250, character_class=Class.BUCCANEER,
+                      equips=dict(char.equips))
+    for slot, equip in loadout.equips.items():
+        trial.equip(equip, slot)
+    assert len(loadout.equips) == 7
+    assert loadout.score == pytest.approx(trial.evaluate().ied_damage)
@@ -0,0 +1,66 @@
+import numpy as np
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.overlay import (
+    CharacterOverlay, evaluate_overlays, evaluate_swaps)
+
+
+def _character() -> Character:
+    char = Character('Somi', level=250, character_class=Class.BUCCANEER,
+                     world=World.REBOOT, link_skills={Class.KANNA: 2})
+    char.equip(Equip('Knuckle', EquipType.WEAPON,
+                     base_stats={Stat.STR: 100, Stat.ATT: 276},
+                     potential=[(Stat.IED, 0.35), (Stat.BOSS, 30)]))
+    char.equip(Equip('Ring', EquipType.RING_1,
+                     base_stats={Stat.STR: 5, Stat.DMG: 5}))
+    return char
+
+
+def _ring(strength: int) -> Equip:
+    return Equip('Other Ring', EquipType.RING_1,
+                 base_stats={Stat.STR: strength},
+                 potential=[(Stat.IED, 0.3)])
+
+
+def test_overlay_matches_copy() -> None:
+    char = _character()
+    before = char.to_json()
+    overlay = CharacterOverlay(char)
+    assert overlay.equip(_ring(20)).name == 'Ring'
+    overlay.unequip(EquipType.WEAPON)
+    overlay.set_link_skill(Class.KANNA, None)
+    overlay.set_link_skill(Class.CADENA, 2)
+    overlay.gain_levels(30)
+
+    expected = overlay.to_character()
+    assert expected.level == 275 and expected.equips[EquipType.WEAPON] is None
+    assert overlay.stat_vector == expected.stat_vector
+    assert np.isclose(overlay.evaluate().stat_range,
+                      expected.evaluate().stat_range)
+    assert char.to_json() == before
+
+    # Overlays follow changes of the base outside of their own changes.
+    char.equip(Equip('Badge', EquipType.BADGE, base_stats={Stat.BOSS: 10}))
+    assert overlay.stat_vector == overlay.to_character().stat_vector
+    char.equip(Equip('Big Ring', EquipType.RING_1, base_stats={Stat.STR: 50}))
+    assert overlay.stat_vector == overlay.to_character().stat_vector
+
+
+def test_batch_evaluation() -> None:
+    char = _character()
+    rings = [_ring(strength) for strength in range(0, 50, 10)]
+    overlays = []
+    for ring in rings:
+        overlay = CharacterOverlay(char)
+        overlay.equip(ring)
+        overlays.append(overlay)
+
+    batch = evaluate_overlays(overlays)
+    swaps = evaluate_swaps(char, rings)
+    for idx, overlay in enumerate(overlays):
+        single = overlay.to_character().evaluate()
+        assert np.isclose(batch.boss_damage[idx], single.boss_damage)
+        assert np.isclose(swaps.boss_damage[idx], single.boss_damage)
+    assert np.all(np.diff(swaps.boss_damage) > 0)
@@ -0,0 +1,95 @@
+import json
+import os
+import stat
+import time
+
+import pytest
+
+from maplestats import persistence
+from maplestats.character import Character, LAST_MODIFIED_FILE_NAME
+from maplestats.instrumentation import instrumentation
+from maplestats.persistence import WriteBehindSaver
+from maplestats.utils import atomic_write
+
+
+def test_coalesces_saves(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    char = Character('Somi', level=200)
+    with instrumentation() as report:
+        with WriteBehindSaver(delay=60, max_delay=60) as saver:
+            for level in range(200, 220):
+                char.level = level
+                saver.schedule(char)
+            assert saver.pending == 1
+            assert not os.path.exists('Somi.json')
+            saver.flush()
+            assert saver.pending == 0
+
+    assert report.timers['WriteBehindSaver.write']['calls'] == 1
+    assert report.counters['WriteBehindSaver.coalesced'] == 19
+    with open('Somi.json') as f:
+        assert json.load(f)['level'] == 219
+    with open(LAST_MODIFIED_FILE_NAME) as f:
+        assert f.read() == os.path.abspath('Somi.json')
+    # No temporary files are left behind.
+    assert set(os.listdir(tmp_path)) == {'Somi.json', LAST_MODIFIED_FILE_NAME}
+
+
+def test_background_write(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    char = Character('Somi', level=250)
+    with WriteBehindSaver(delay=0, max_delay=0) as saver:
+        saver.schedule(char, binary=True)
+        deadline = time.monotonic() + 5
+        while not os.path.exists('Somi.mstb'):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    assert Character.from_file('Somi.mstb').level == 250
+
+
+def test_paths_are_resolved_when_scheduled(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('elsewhere')
+    char = Character('Somi', level=250)
+    with WriteBehindSaver(delay=60, max_delay=60) as saver:
+        saver.schedule(char)
+        os.chdir('elsewhere')
+    assert os.listdir() == []
+    assert sorted(os.listdir(tmp_path)) == [
+        LAST_MODIFIED_FILE_NAME, 'Somi.json', 'elsewhere']
+
+
+def test_default_saver(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    char = Character('Somi', level=250)
+    char.save(write_behind=True)
+    persistence.flush()
+    assert Character.from_file('Somi.json').level == 250
+    persistence.default_saver().close()
+
+
+def test_failed_write_keeps_other_saves(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    char = Character('Somi', level=250)
+    saver = WriteBehindSaver(delay=60, max_delay=60)
+    saver.schedule(char, os.path.join('missing', 'Somi.json'))
+    saver.schedule(char)
+    # Saves hold the state at scheduling time.
+    char.level = 251
+    with pytest.raises(FileNotFoundError):
+        saver.close()
+    assert Character.from_file('Somi.json').level == 250
+
+
+def test_atomic_write_permissions(tmp_path) -> None:
+    new_path, kept_path = tmp_path / 'new.json', tmp_path / 'kept.json'
+    kept_path.write_text('{}')
+    os.chmod(kept_path, 0o600)
+    atomic_write(str(new_path), '{}')
+    atomic_write(str(kept_path), '[]')
+
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(new_path).st_mode) == 0o666 & ~umask
+    assert stat.S_IMODE(os.stat(kept_path).st_mode) == 0o600
+    assert kept_path.read_text() == '[]'
@@ -0,0 +1,39 @@
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.planner import UpgradeKind, plan_upgrades
+
+
+def _character() -> Character:
+    char = Character('Somi', level=250, character_class=Class.BUCCANEER,
+                     world=World.REBOOT)
+    char.equip(Equip('Knuckle', EquipType.WEAPON,
+                     base_stats={Stat.STR: 100, Stat.ATT: 276},
+                     potential=[(Stat.IED, 0.4), (Stat.BOSS, 30)]))
+    for slot in (EquipType.HAT, EquipType.TOP, EquipType.RING_1):
+        char.equip(Equip(slot.name, slot,
+                         base_stats={Stat.STR: 40, Stat.ATT: 2},
+                         potential=[(Stat.PCT_STR, 12)],
+                         bonus_stats=[(Stat.STR, 30)]))
+    return char
+
+
+def test_plan(tmp_path) -> None:
+    char = _character()
+    before = char.to_json()
+    plan = plan_upgrades(char, 12, item_levels={EquipType.WEAPON: 200},
+                         cubing_trials=20_000, cache_dir=str(tmp_path))
+    assert char.to_json() == before
+    assert len(plan) == 12
+    assert all(upgrade.damage_gain > 0 and upgrade.expected_cost > 0
+               for upgrade in plan)
+    assert (plan[0].slot, plan[0].kind) == (
+        EquipType.WEAPON, UpgradeKind.STAR_FORCE)
+    assert {upgrade.kind for upgrade in plan} >= {
+        UpgradeKind.STAR_FORCE, UpgradeKind.FLAMES}
+
+    # Later steps of a slot build on the earlier ones.
+    weapon_stars = [upgrade.target for upgrade in plan
+                    if upgrade.slot == EquipType.WEAPON
+                    and upgrade.kind == UpgradeKind.STAR_FORCE]
+    assert weapon_stars == sorted(set(weapon_stars))
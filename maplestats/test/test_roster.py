@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from maplestats.benchmarks.generators import generate_characters
+from maplestats.enums import Class
+from maplestats.formulas import DEFAULT_BOSS_PDR
+from maplestats.roster import _evaluate_chunk, evaluate_roster
+from maplestats.roster_store import RosterStore
+from maplestats.stat_vector import STAT_INDEX
+
+
+def test_evaluate_roster(tmp_path, monkeypatch) -> None:
+    characters = list(generate_characters(12, seed=4))
+    monkeypatch.chdir(tmp_path)
+    roster_dir = tmp_path / 'roster'
+    roster_dir.mkdir()
+    for idx, char in enumerate(characters):
+        char.save(str(roster_dir / f'{char.name}.json'), binary=idx % 2 == 1)
+    with RosterStore(str(tmp_path / 'roster.db')) as store:
+        store.upsert_many(characters)
+
+    progress = []
+    from_dir = evaluate_roster(str(roster_dir), workers=1, chunk_size=5,
+                               progress=lambda done, total: progress.append(
+                                   (done, total)))
+    assert progress == [(5, 12), (10, 12), (12, 12)]
+    from_store = evaluate_roster(str(tmp_path / 'roster.db'), workers=2,
+                                 chunk_size=5)
+
+    by_name = {char.name: char for char in characters}
+    for results in (from_dir, from_store):
+        assert sorted(results.names) == sorted(by_name)
+        for idx, name in enumerate(results.names):
+            char = by_name[name]
+            assert np.isclose(results.ied_damage[idx],
+                              char.evaluate().ied_damage)
+            expected = char.stat_equivalences()
+            assert np.isclose(results.equivalences[idx, STAT_INDEX[
+                char.char_class.main_stat.percent]], 1)
+            assert np.allclose(results.equivalences[idx],
+                               [expected[stat] for stat in STAT_INDEX])
+
+    rankings = from_store.top_k(2, group='class')
+    for char_class, ranked in rankings.items():
+        assert len(ranked) <= 2
+        assert all(by_name[name].char_class == char_class
+                   for name, _ in ranked)
+        assert [score for _, score in ranked] == sorted(
+            [score for _, score in ranked], reverse=True)
+    assert sum(map(len, from_store.top_k(100, group='world').values())) <= 12
+    assert isinstance(next(iter(rankings)), Class)
+
+
+def test_missing_roster_is_not_created(tmp_path) -> None:
+    missing = tmp_path / 'no_such_roster'
+    with pytest.raises(FileNotFoundError):
+        evaluate_roster(str(missing), workers=1)
+    assert not missing.exists()
+
+
+def test_missing_names_are_left_out(tmp_path) -> None:
+    characters = list(generate_characters(2, seed=5))
+    with RosterStore(str(tmp_path / 'roster.db')) as store:
+        store.upsert_many(characters)
+
+    # E.g. a character deleted after the names of the store were listed.
+    names = [characters[0].name, 'Nobody', characters[1].name]
+    results = _evaluate_chunk(str(tmp_path / 'roster.db'), names,
+                              DEFAULT_BOSS_PDR)
+    assert results.names == [characters[0].name, characters[1].name]
+    assert len(results.classes) == len(results.ied_damage) == 2
+    assert np.all(results.ied_damage > 0)
+    assert set(results.top_k(1)) == {char.char_class for char in characters}
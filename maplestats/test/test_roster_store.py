@@ -0,0 +1,73 @@
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.instrumentation import instrumentation
+from maplestats.roster_store import RosterStore
+
+
+def _character(name: str, level: int, char_class: Class,
+               world: World) -> Character:
+    char = Character(name, level=level, character_class=char_class,
+                     world=world, link_skills={Class.KANNA: 2})
+    char.equip(Equip(
+        'Arcane Umbra Knuckle', EquipType.WEAPON,
+        base_stats={Stat.STR: 100, Stat.ATT: 276},
+        scroll_stats={Stat.ATT: 150},
+        potential=[(Stat.BOSS, 40), (Stat.IED, 0.35), (Stat.PCT_ATT, 12)],
+        bonus_stats=[(Stat.BOSS, 12)]))
+    char.equip(Equip('Ring', EquipType.RING_1, base_stats={Stat.DMG: 5}),
+               EquipType.RING_3)
+    return char
+
+
+def test_round_trip_and_queries(tmp_path) -> None:
+    with RosterStore(str(tmp_path / 'roster.db')) as store:
+        store.upsert_many([
+            _character('Somi', 255, Class.BUCCANEER, World.REBOOT),
+            _character('Low', 200, Class.BUCCANEER, World.REBOOT),
+            _character('Other', 260, Class.KANNA, World.REBOOT),
+            _character('Elsewhere', 260, Class.BUCCANEER, World.SCANIA),
+        ])
+        # Upserting again replaces instead of duplicating.
+        store.upsert(_character('Somi', 256, Class.BUCCANEER, World.REBOOT))
+
+        found = list(store.query(world=World.REBOOT,
+                                 char_class=Class.BUCCANEER, min_level=250))
+        assert [char.name for char in found] == ['Somi']
+        assert store.count() == 4
+
+        loaded = found[0]
+        original = _character('Somi', 256, Class.BUCCANEER, World.REBOOT)
+        assert loaded.level == 256
+        assert loaded.to_json() == original.to_json()
+        assert loaded.stat_vector == original.stat_vector
+
+        store.delete('Somi')
+        assert store.load('Somi') is None
+
+
+def test_characters_outlive_the_store(tmp_path) -> None:
+    with RosterStore(str(tmp_path / 'roster.db')) as store:
+        store.upsert_many([
+            _character(name, 250, Class.BUCCANEER, World.REBOOT)
+            for name in ('A', 'B', 'C')])
+        loaded = store.load_many(['C', 'Missing', 'A'])
+        queried = list(store.query())
+    assert [char.name for char in loaded] == ['C', 'A']
+    assert [char.name for char in queried] == ['A', 'B', 'C']
+    original = _character('A', 250, Class.BUCCANEER, World.REBOOT)
+    for char in (loaded[1], queried[0]):
+        assert char.to_json() == original.to_json()
+
+
+def test_equips_are_read_per_page_on_first_use(tmp_path) -> None:
+    with RosterStore(str(tmp_path / 'roster.db')) as store:
+        store.upsert_many([
+            _character(name, 250, Class.BUCCANEER, World.REBOOT)
+            for name in ('A', 'B', 'C')])
+        with instrumentation() as report:
+            first, second, _ = store.query()
+            assert 'RosterStore.load_equips' not in report.timers
+            assert first.equips[EquipType.RING_3].name == 'Ring'
+            assert second.equips[EquipType.RING_3].name == 'Ring'
+        assert report.timers['RosterStore.load_equips']['calls'] == 1
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+from maplestats import session_utils
+from maplestats.character import Character
+from maplestats.enums import Class
+
+
+def test_load_last_modified_uses_snapshot(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    assert session_utils.load_last_modified() is None
+
+    Character('Somi', level=250, character_class=Class.BUCCANEER).save()
+    assert session_utils.load_last_modified().level == 250
+    assert os.path.isfile(session_utils.SESSION_CACHE_FILE_NAME)
+
+    # Loaded from the snapshot while the file is unchanged.
+    monkeypatch.setattr(Character, 'from_file', None)
+    assert session_utils.load_last_modified().level == 250
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+
+    # Saving again invalidates the snapshot.
+    Character('Somi', level=251, character_class=Class.BUCCANEER).save()
+    os.utime('Somi.json', ns=(0, 0))
+    assert session_utils.load_last_modified().level == 251
+
+
+def test_unreadable_snapshot_is_rebuilt(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Character('Somi', level=250, character_class=Class.BUCCANEER).save()
+    session_utils.load_last_modified()
+    with open(session_utils.SESSION_CACHE_FILE_NAME, 'rb') as f:
+        data = f.read()
+    key = data.partition(b'\n')[0]
+    with open(session_utils.SESSION_CACHE_FILE_NAME, 'wb') as f:
+        f.write(key + b'\nnot a snapshot')
+    assert session_utils.load_last_modified().level == 250
+    with open(session_utils.SESSION_CACHE_FILE_NAME, 'rb') as f:
+        assert f.read() == data
+
+
+def test_restoring_a_session_does_not_import_numpy(tmp_path,
+                                                   monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Character('Somi', level=250, character_class=Class.BUCCANEER).save()
+    session_utils.load_last_modified()
+    package_dir = os.path.dirname(os.path.dirname(session_utils.__file__))
+    code = ('import sys\n'
+            'from maplestats import session_utils\n'
+            'assert session_utils.load_last_modified().level == 250\n'
+            'print(sorted({"numpy", "subprocess"} & set(sys.modules)))\n')
+    output = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True,
+        text=True, env={**os.environ, 'PYTHONPATH': package_dir}).stdout
+    assert output.strip() == '[]'
@@ -0,0 +1,35 @@
+import numpy as np
+
+from maplestats.enums import EquipType, Stat
+from maplestats.star_force import (
+    cost_distribution, simulate_star_force, star_force_estimate,
+    star_force_stats)
+
+
+def test_chain_matches_simulation() -> None:
+    estimate = star_force_estimate(160, 15, 19, replacement_cost=5e8)
+    costs, booms = simulate_star_force(160, 15, 19, trials=50_000,
+                                       replacement_cost=5e8, seed=5)
+    error = estimate.cost_std / np.sqrt(len(costs))
+    assert abs(costs.mean() - estimate.expected_cost) < 5 * error
+    assert abs(booms.mean() - estimate.expected_booms) < 0.05
+    assert np.isclose(costs.std(), estimate.cost_std, rtol=0.05)
+
+    distribution = cost_distribution(160, 15, 19, replacement_cost=5e8)
+    assert np.isclose(distribution.probabilities.sum(), 1)
+    assert np.isclose(distribution.probabilities @ distribution.bin_edges,
+                      estimate.expected_cost, rtol=1e-3)
+    assert np.allclose(distribution.quantile([0.5, 0.9]),
+                       np.quantile(costs, [0.5, 0.9]), rtol=0.05)
+
+
+def test_no_booms_below_15_stars() -> None:
+    estimate = star_force_estimate(200, 0, 15)
+    assert estimate.expected_booms == 0
+    assert estimate.expected_attempts > 15
+
+
+def test_star_force_stats() -> None:
+    assert star_force_stats(EquipType.HAT, 150, 10) == {Stat.ALL: 25}
+    assert star_force_stats(EquipType.HAT, 200, 17) == {
+        Stat.ALL: 70, Stat.ATT: 25, Stat.MATT: 25}
@@ -0,0 +1,61 @@
+import pytest
+
+from maplestats.character import Character
+from maplestats.enums import EquipType, Stat
+from maplestats.equipment import Equip
+from maplestats.stat_vector import StatVector
+from maplestats.utils import combine_stats
+
+
+def test_sum_is_additive_except_ied() -> None:
+    combined = StatVector.sum([
+        StatVector.from_stats({Stat.STR: 10, Stat.IED: 0.3}),
+        StatVector.from_stats({Stat.STR: 5, Stat.IED: 0.4, Stat.BOSS: 30}),
+    ])
+    assert combined[Stat.STR] == 15
+    assert combined[Stat.BOSS] == 30
+    assert combined[Stat.IED] == pytest.approx(1.0 - 0.7 * 0.6)
+
+
+def test_int_and_float_stats_keep_their_type() -> None:
+    vector = StatVector.from_stats({Stat.DMG: 12, Stat.CRIT_DMG: 8})
+    assert isinstance(vector[Stat.DMG], int)
+    assert isinstance(vector[Stat.CRIT_DMG], float)
+    # Float noise from subtraction rounds to the nearest int.
+    assert StatVector.from_stats({Stat.DMG: 11.9999999})[Stat.DMG] == 12
+
+
+def test_sparse_stats_skip_float_noise() -> None:
+    base = StatVector.from_stats({Stat.ATT: 100, Stat.IED: 0.3})
+    source = StatVector.from_stats({Stat.DMG: 0.1, Stat.IED: 0.7})
+    assert ((base + source) - source).to_stats() == {
+        Stat.ATT: 100, Stat.IED: pytest.approx(0.3)}
+    noise = StatVector.from_stats({Stat.IED: 1e-15, Stat.CRIT_DMG: 1e-12})
+    assert noise.to_stats() == {}
+    assert len(noise.to_stats(sparse=False)) == len(Stat)
+
+
+def test_subtract_undoes_add() -> None:
+    base = StatVector.from_stats({Stat.ATT: 100, Stat.IED: 0.5})
+    source = StatVector.from_stats({Stat.ATT: 20, Stat.IED: 0.4})
+    assert (base + source) - source == base
+
+
+def test_subtract_full_ied_needs_a_rebuild() -> None:
+    base = StatVector.from_stats({Stat.IED: 0.5})
+    source = StatVector.from_stats({Stat.IED: 1.0})
+    with pytest.raises(ValueError):
+        (base + source) - source
+
+    char = Character('Test', level=200)
+    char.equip(Equip('Ring', EquipType.RING_1, potential=[(Stat.IED, 1.0)]))
+    assert char.stat_vector[Stat.IED] == 1.0
+    char.equip(Equip('Ring', EquipType.RING_1, potential=[(Stat.IED, 0.3)]))
+    assert char.stat_vector[Stat.IED] == pytest.approx(0.3)
+
+
+def test_combine_stats_fills_defaults() -> None:
+    combined = combine_stats([{Stat.DMG: 10}, {Stat.DMG: 5}])
+    assert combined[Stat.DMG] == 15
+    assert combined[Stat.IED] == 0.0
+    assert combined[Stat.LUK] == 0
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from maplestats.character import Character
+from maplestats.enums import Class, EquipType, Stat, World
+from maplestats.equipment import Equip
+from maplestats.streaming import iter_characters
+
+
+def _characters():
+    chars = []
+    for idx in range(5):
+        char = Character(f'Char{idx}', level=200 + idx,
+                         character_class=Class.BUCCANEER, world=World.REBOOT)
+        char.equip(Equip('Ring', EquipType.RING_1,
+                         base_stats={Stat.DMG: idx},
+                         potential=[(Stat.IED, 0.3)]))
+        chars.append(char)
+    return chars
+
+
+@pytest.mark.parametrize('layout', ['array', 'lines', 'pretty'])
+@pytest.mark.parametrize('lazy_equips', [False, True])
+def test_iter_characters(tmp_path, layout, lazy_equips) -> None:
+    chars = _characters()
+    reprs = [char.to_json() for char in chars]
+    path = tmp_path / 'export.json'
+    if layout == 'array':
+        path.write_text(json.dumps(reprs, indent=2))
+    elif layout == 'lines':
+        path.write_text('\n'.join(json.dumps(r) for r in reprs) + '\n')
+    else:
+        path.write_text('\n'.join(json.dumps(r, indent=4) for r in reprs))
+
+    # A tiny chunk size forces objects to span many reads.
+    loaded = list(iter_characters(str(path), lazy_equips=lazy_equips,
+                                  chunk_size=7))
+    assert [char.name for char in loaded] == [char.name for char in chars]
+    for original, char in zip(chars, loaded):
+        assert char.to_json() == original.to_json()
+        assert char.stat_vector == original.stat_vector
@@ -1,42 +1,44 @@
-from collections import defaultdict
-from typing import Any, Dict, Iterator, List, Union
+import os
+import stat
+import tempfile
+import threading
+from typing import Any, Dict, Iterator, List, Mapping, Tuple, Union
 
 from maplestats.enums import Stat
+from maplestats.instrumentation import instrumented
 
 
 STATS_TYPING = Dict[Stat, Any]
 
+_UMASK_LOCK = threading.Lock()
 
-def combine_stats(stats_iter: Iterator[STATS_TYPING]) -> STATS_TYPING:
-    """Combine multiple sources of stats into a single source."""
 
-    def _combine_ied(ied_1: float, ied_2: float) -> float:
-        """Combine two sources of IED into a single source."""
-        return 1.0 - (1.0 - ied_1) * (1.0 - ied_2)
+@instrumented()
+def combine_stats(stats_iter: Iterator[STATS_TYPING]) -> STATS_TYPING:
+    """Combine multiple sources of stats into a single source.
 
-    combined_stats = defaultdict(lambda s: s.default)
-    for stats in stats_iter:
-        for stat, value in stats.items():
-            if stat == Stat.IED:
-                combined_stats[stat] = _combine_ied(combined_stats[stat], value)
-            else:
-                combined_stats[stat] += value
+    Every stat is present in the result, using its default when no source
+    provides it.
+    """
+    from maplestats.stat_vector import StatVector
 
-    return combined_stats
+    return StatVector.sum(StatVector.from_stats(stats) for stats in stats_iter
+                          ).to_stats(sparse=False)
 
 
+@instrumented()
 def jsonify(data: Union[Dict, List, str]) -> Union[Dict, List, str]:
     """Converts data to JSON by calling `to_json()` for all nested objects which
     have this attribute.
     """
 
     def _handle_value(val: Any) -> Any:
-        if isinstance(val, Dict):
+        if isinstance(val, Mapping):
             new_val = {}
             for k, v in val.items():
                 new_val[_handle_value(k)] = _handle_value(v)
             return new_val
-        elif isinstance(val, List):
+        elif isinstance(val, (List, Tuple)):
             return [_handle_value(k) for k in val]
 
         return val.to_json() if hasattr(val, "to_json") else val
@@ -44,6 +46,7 @@ def jsonify(data: Union[Dict, List, str]) -> Union[Dict, List, str]:
     return _handle_value(data)
 
 
+@instrumented()
 def parse_json(
         data: Dict, key_class: Any = None, value_class: Any = None) -> Dict:
     """Parse some jsonified data."""
@@ -54,8 +57,52 @@ def parse_json(
         return key_class.maybe_parse(k) if key_class else k
 
     def _parse_value(v: Any) -> Any:
-        if not v:
+        if not v or not value_class or isinstance(v, value_class):
             return v
-        return value_class(**v) if value_class else v
+        return value_class(**v)
 
     return {_parse_key(key): _parse_value(value) for key, value in data.items()}
+
+
+def _umask() -> int:
+    """The umask of this process. os.umask can only read it by setting it, so
+    it is read from /proc where available.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    with _UMASK_LOCK:
+        # Files other threads create meanwhile are private rather than open.
+        umask = os.umask(0o077)
+        os.umask(umask)
+    return umask
+
+
+def atomic_write(file_path: str, data: Union[bytes, str]) -> None:
+    """Replace a file in one step: readers see either the old or the new
+    content, even if the process dies while writing. The permissions of an
+    existing file are kept.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f'.{os.path.basename(file_path)}.',
+        suffix='.tmp')
+    try:
+        # mkstemp creates private files; give the file the usual permissions.
+        try:
+            mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_umask()
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise